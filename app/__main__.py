@@ -1,84 +1,164 @@
 """Module for basic game graphics"""
+import logging
 import sys
+from functools import lru_cache
 import pygame
 # pylint: disable=maybe-no-member
 from game.checkers import Checkers
 from game.config import SizeConstants as const
 from game.config import StoneEnum
 from game.ai import AI
-from game.config import Menu
+from game.worker import AIWorker
 from game.config import Colors
+from game.config import RecordConstants
+from game.config import ViewConstants
+from game.record import GameRecorder
+from game.record import GameWriter
+from view.assets import Menu
+from view.assets import render_text
+from view.frames import FrameTimer
+from view.game_view import GameView
+
+
+AI_MOVE_DELAY = 100  # minimal ms between AI moves so that they can be followed
+
+
+def handle_quit(event) -> bool:
+    """Check if event asks to leave the game, closing window or pressing ESC"""
+    if event.type == pygame.QUIT:
+        return True
+    return event.type == pygame.KEYDOWN and event.key == pygame.K_ESCAPE
+
+
+def ai_turn(checkers, worker, last_move, random_move=False):
+    """Start or finish background AI search, return time of the last move"""
+    if worker.done():
+        if pygame.time.get_ticks() - last_move < AI_MOVE_DELAY:
+            return last_move
+        move = worker.take()
+        checkers.thinking = False
+        checkers.ai_move(move, None if random_move else worker.ai.stats)
+        checkers.update_screen()
+        return pygame.time.get_ticks()
+    if not worker.busy():
+        worker.request(checkers.get_board(), random_move)
+        checkers.thinking = not random_move
+    if checkers.thinking:
+        checkers.update_screen()
+    return last_move
+
+
+def make_recorder(white: str, black: str):
+    """Recorder appending games to RecordConstants.PATH, None when recording is off"""
+    if RecordConstants.PATH is None:
+        return None
+    return GameRecorder(GameWriter(RecordConstants.PATH), RecordConstants.VERBOSITY,
+                        {'Event': 'Checkers', 'White': white, 'Black': black})
+
+
+def finish_game(checkers) -> None:
+    """Write record of finished or abandoned game"""
+    if checkers.recorder is not None:
+        checkers.finish_record()
+        checkers.recorder.close()
 
 
 def ai_vs_ai(screen):
     """Main game loop function for AI"""
-    clock = pygame.time.Clock()
-    checkers = Checkers(screen)
+    frames = FrameTimer()
+    checkers = Checkers(GameView(screen, frames), make_recorder('AI', 'Random'))
     running = True
-    ai_black = AI(StoneEnum.BLACK.value)
-    ai_white = AI(StoneEnum.WHITE.value)
+    worker_black = AIWorker(AI(StoneEnum.BLACK.value))
+    worker_white = AIWorker(AI(StoneEnum.WHITE.value))
+    last_move = 0
     checkers.update_screen()
     while running:
-        clock.tick(40)
-        if checkers.on_turn(ai_white.color):
-            move = ai_white.get_best_move(checkers.get_board())
-            print(move)
-            # print('WHITE')
-            checkers.ai_move(move)
-            checkers.update_screen()
-        if checkers.on_turn(ai_black.color) and not checkers.check_winner(False):
-            move = ai_black.get_random_move(checkers.get_board())
-            print(move)
-            # print('BLACK')
-            checkers.ai_move(move)
-            checkers.update_screen()
+        frames.tick()
+        if checkers.on_turn(worker_white.ai.color):
+            last_move = ai_turn(checkers, worker_white, last_move)
+        elif not checkers.check_winner(False):
+            last_move = ai_turn(checkers, worker_black, last_move, random_move=True)
         for event in pygame.event.get():
-            if event.type == pygame.QUIT:
+            if handle_quit(event):
                 running = False
-        # checkers.update_screen()
         if checkers.check_winner():
             running = False
+    worker_white.close()
+    worker_black.close()
+    frames.report()
+    finish_game(checkers)
 
 
 def play(screen, play_ai=False):
     """Main game loop function"""
-    clock = pygame.time.Clock()
-    checkers = Checkers(screen)
+    frames = FrameTimer()
+    checkers = Checkers(GameView(screen, frames),
+                        make_recorder('Player', 'AI' if play_ai else 'Player'))
     running = True
     if play_ai:
-        ai_black = AI(StoneEnum.BLACK.value)
+        worker_black = AIWorker(AI(StoneEnum.BLACK.value))
+    last_move = 0
     checkers.update_screen()
     while running:
-        clock.tick(40)
-        if play_ai and checkers.on_turn(ai_black.color) and not checkers.check_winner(False):
-            move = ai_black.get_best_move(checkers.get_board())
-            # print(move)
-            # print('BLACK')
-            checkers.ai_move(move)
-            checkers.update_screen()
+        frames.tick()
+        if play_ai and checkers.on_turn(worker_black.ai.color) and \
+                not checkers.check_winner(False):
+            last_move = ai_turn(checkers, worker_black, last_move)
         for event in pygame.event.get():
-            if event.type == pygame.QUIT:
+            if handle_quit(event):
                 running = False
             if event.type == pygame.MOUSEBUTTONDOWN:
                 pos = pygame.mouse.get_pos()
                 checkers.process_input(pos)
                 checkers.update_screen()
-        # checkers.update_screen()
         if checkers.check_winner():
             running = False
+    if play_ai:
+        worker_black.close()
+    frames.report()
+    finish_game(checkers)
 
 
-def menu_loop(screen, menu_items):
-    """Menu shower"""
+@lru_cache(maxsize=None)
+def menu_layout(menu_items: tuple) -> list:
+    """Rendered menu items with their rectangles"""
+    layout = []
+    for i, item in enumerate(menu_items):
+        text = render_text(Menu.menu_font(), item, Colors.WHITE)
+        text_rect = text.get_rect(
+            center=(const.WIDTH / 2, const.HEIGHT / 2 + i * 60))
+        layout.append((item, text, text_rect))
+    return layout
+
+
+def draw_menu(screen, menu_items: tuple) -> None:
+    """Draw menu on the whole screen"""
+    screen.blit(Menu.background(), (0, 0))
+
+    for item, text, text_rect in menu_layout(menu_items):
+        button_rect = pygame.Rect(
+            text_rect.left - 10, text_rect.top - 5, text_rect.width + 20, text_rect.height + 10)
+        if item != 'Exit':
+            pygame.draw.rect(screen, Colors.GRAY, button_rect)
+        screen.blit(text, text_rect)
+
+    title_text = render_text(Menu.title_font(), "Checkers", Colors.WHITE)
+    title_rect = title_text.get_rect(
+        center=(const.WIDTH / 2, const.HEIGHT / 2 - 100))
+    screen.blit(title_text, title_rect)
+
+    pygame.display.update()
+
+
+def menu_loop(screen, menu_items: tuple) -> bool:
+    """Menu event handler, get True when a game was played and menu must be redrawn"""
     for event in pygame.event.get():
         if event.type == pygame.QUIT:
             pygame.quit()
+            sys.exit()
         elif event.type == pygame.MOUSEBUTTONDOWN:
             mouse_pos = pygame.mouse.get_pos()
-            for i, item in enumerate(menu_items):
-                text_rect = Menu.MENU_FONT.render(item, True, Colors.WHITE)
-                text_rect = text_rect.get_rect(
-                    center=(const.WIDTH / 2, const.HEIGHT / 2 + i * 60))
+            for i, (_, _, text_rect) in enumerate(menu_layout(menu_items)):
                 if text_rect.collidepoint(mouse_pos):
                     if i == 0:
                         play(screen)
@@ -89,24 +169,8 @@ def menu_loop(screen, menu_items):
                     elif i == 3:
                         pygame.quit()
                         sys.exit()
-    screen.blit(Menu.BACKGROUND, (0, 0))
-
-    for i, item in enumerate(menu_items):
-        text = Menu.MENU_FONT.render(item, True, Colors.WHITE)
-        text_rect = text.get_rect(
-            center=(const.WIDTH / 2, const.HEIGHT / 2 + i * 60))
-        button_rect = pygame.Rect(
-            text_rect.left - 10, text_rect.top - 5, text_rect.width + 20, text_rect.height + 10)
-        if item != 'Exit':
-            pygame.draw.rect(screen, Colors.GRAY, button_rect)
-        screen.blit(text, text_rect)
-
-    title_text = Menu.TITLE_FONT.render("Checkers", True, Colors.WHITE)
-    title_rect = title_text.get_rect(
-        center=(const.WIDTH / 2, const.HEIGHT / 2 - 100))
-    screen.blit(title_text, title_rect)
-
-    pygame.display.update()
+                    return True
+    return False
 
 
 def main():
@@ -115,10 +179,17 @@ def main():
     pygame.display.set_caption('Checkers')
     screen = pygame.display.set_mode((const.WIDTH, const.WIDTH))
 
-    menu_items = ["Player vs Player", "Player vs AI", "AI vs AI", "Exit"]
+    if ViewConstants.FRAME_REPORT:
+        logging.basicConfig(level=logging.INFO)
+
+    menu_items = ("Player vs Player", "Player vs AI", "AI vs AI", "Exit")
 
+    clock = pygame.time.Clock()
+    draw_menu(screen, menu_items)
     while True:
-        menu_loop(screen, menu_items)
+        clock.tick(ViewConstants.FPS)
+        if menu_loop(screen, menu_items):
+            draw_menu(screen, menu_items)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,4 @@
+"""Benchmarks of the game engine, run from repository root as
+
+PYTHONPATH=app python -m benchmarks.<name>
+"""
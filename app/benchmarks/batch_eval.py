@@ -0,0 +1,57 @@
+"""Benchmark of batch evaluation against scalar evaluation"""
+import math
+import time
+import numpy as np
+from game.ai import AI
+from game.batch import evaluate_bitboards
+from game.batch import evaluate_grids
+from game.board import Board
+from game.playout import random_boards
+
+SIZES = [1, 10, 100, 1000, 10000, 100000]
+POOL = 500
+
+
+def position_pool(seed: int = 0):
+    """Boards visited during random games"""
+    return random_boards(seed, POOL, (0, 80))
+
+
+def timed(function, *args):
+    """Run function and return its duration in seconds"""
+    start = time.perf_counter()
+    function(*args)
+    return time.perf_counter() - start
+
+
+def main():
+    """Print scalar and batch evaluation times for growing N"""
+    pool = position_pool()
+    epic_ai = AI(1)
+    geometry = pool[0].bitboard.geometry
+    print(f'{"N":>7} {"board2":>10} {"grids":>10} {"position":>10} {"bitboards":>10}')
+    for size in SIZES:
+        boards = [pool[i % POOL] for i in range(size)]
+        grids = [board.grid for board in boards]
+        stack = np.stack(grids)
+        masks = ([board.bitboard.white for board in boards],
+                 [board.bitboard.black for board in boards],
+                 [board.bitboard.kings for board in boards])
+        scalar_grid = timed(lambda: [epic_ai.evaluate_board2(grid) for grid in grids])
+        batch_grid = timed(evaluate_grids, stack)
+        scalar_position = timed(lambda: [epic_ai.evaluate_position(board) for board in boards])
+        batch_position = timed(evaluate_bitboards, *masks, geometry)
+        print(f'{size:>7} {scalar_grid:>10.5f} {batch_grid:>10.5f} '
+              f'{scalar_position:>10.5f} {batch_position:>10.5f}')
+
+    print('\nsearch to depth 6, leaves scored one by one vs in batches')
+    for quiescence in (True, False):
+        for batch_leaves in (False, True):
+            epic_ai = AI(1, 0, batch_leaves=batch_leaves, quiescence=quiescence)
+            duration = timed(epic_ai.minimax, Board(8, 8, 0, 0), 6, True, -math.inf, math.inf)
+            print(f'quiescence={quiescence} batch_leaves={batch_leaves}: {duration:.3f} s, '
+                  f'{epic_ai.nodes} nodes')
+
+
+if __name__ == "__main__":
+    main()
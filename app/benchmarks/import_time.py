@@ -0,0 +1,37 @@
+"""Benchmark of engine import time in a fresh interpreter
+
+PYTHONPATH=app python -m benchmarks.import_time [module ...]
+"""
+import os
+import statistics
+import subprocess
+import sys
+
+MODULES = ['game.board', 'game.ai']
+RUNS = 10
+SNIPPET = ('import sys, time; start = time.perf_counter(); import {module}; '
+           'print(time.perf_counter() - start, "pygame" in sys.modules)')
+
+
+def measure(module: str):
+    """Median seconds to import module and whether it pulled in pygame"""
+    app_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    env = dict(os.environ, PYTHONPATH=app_dir)
+    times = []
+    for _ in range(RUNS):
+        output = subprocess.run([sys.executable, '-c', SNIPPET.format(module=module)],
+                                capture_output=True, text=True, env=env, check=True)
+        seconds, pygame_loaded = output.stdout.split()[-2:]
+        times.append(float(seconds))
+    return statistics.median(times), pygame_loaded == 'True'
+
+
+def main():
+    """Print import time of engine modules"""
+    for module in sys.argv[1:] or MODULES:
+        seconds, pygame_loaded = measure(module)
+        print(f'{module:<12} {seconds * 1000:8.1f} ms  pygame imported: {pygame_loaded}')
+
+
+if __name__ == "__main__":
+    main()
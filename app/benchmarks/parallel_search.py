@@ -0,0 +1,43 @@
+"""Benchmark of parallel root search speedup for 1..N workers
+
+PYTHONPATH=app python -m benchmarks.parallel_search [max_workers] [depth]
+"""
+import math
+import os
+import sys
+import time
+from game.ai import AI
+from game.parallel import ParallelAI
+from benchmarks.batch_eval import position_pool
+
+POSITIONS = 8
+
+
+def main():
+    """Print search time and speedup over sequential search per worker count"""
+    max_workers = int(sys.argv[1]) if len(sys.argv) > 1 else os.cpu_count()
+    depth = int(sys.argv[2]) if len(sys.argv) > 2 else 7
+    boards = [board for board in position_pool()[::25]
+              if board.white_count and board.black_count][:POSITIONS]
+
+    start = time.perf_counter()
+    expected = [AI(1).minimax(board, depth, True, -math.inf, math.inf) for board in boards]
+    sequential = time.perf_counter() - start
+    print(f'cpus={os.cpu_count()} depth={depth} positions={len(boards)}')
+    print(f'{"workers":>7} {"seconds":>9} {"speedup":>8}')
+    print(f'{"seq":>7} {sequential:>9.3f} {1:>8.2f}')
+    for workers in range(1, max_workers + 1):
+        with ParallelAI(1, workers=workers) as epic_ai:
+            epic_ai.search_root(boards[0], 1, True)  # workers are started
+            start = time.perf_counter()
+            results = []
+            for board in boards:
+                epic_ai.pv = []
+                results.append(epic_ai.search_root(board, depth, True))
+            duration = time.perf_counter() - start
+        assert results == expected
+        print(f'{workers:>7} {duration:>9.3f} {sequential / duration:>8.2f}')
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+"""Benchmark of memory, copy and pickle cost of Position against Board
+
+PYTHONPATH=app python -m benchmarks.position
+"""
+import pickle
+import time
+import tracemalloc
+from copy import deepcopy
+from game.position import Position
+from benchmarks.batch_eval import position_pool
+
+REPEAT = 5
+
+
+def memory_per_object(make, count: int) -> float:
+    """Average bytes allocated by creating `count` objects with make(index)"""
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    objects = [make(index) for index in range(count)]
+    after = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+    size = sum(stat.size_diff for stat in after.compare_to(before, 'filename'))
+    del objects
+    return size / count
+
+
+def seconds_per_call(function, items) -> float:
+    """Average seconds of function(item) over all items"""
+    start = time.perf_counter()
+    for _ in range(REPEAT):
+        for item in items:
+            function(item)
+    return (time.perf_counter() - start) / (REPEAT * len(items))
+
+
+def main():
+    """Print per object memory, copy and pickle cost of Board and Position"""
+    boards = position_pool()
+    positions = [Position.from_board(board) for board in boards]
+    for board in boards:
+        board.grid  # pylint: disable=pointless-statement
+    print(f'{len(boards)} positions')
+    print(f'{"":<26} {"Board":>12} {"Position":>12}')
+    rows = [
+        ('memory (bytes)',
+         memory_per_object(lambda index: deepcopy(boards[index]), len(boards)),
+         memory_per_object(lambda index: Position(*positions[index].astuple()), len(boards))),
+        ('deepcopy (us)',
+         1e6 * seconds_per_call(deepcopy, boards),
+         1e6 * seconds_per_call(deepcopy, positions)),
+        ('pickle size (bytes)',
+         sum(len(pickle.dumps(board)) for board in boards) / len(boards),
+         sum(len(pickle.dumps(position)) for position in positions) / len(positions)),
+        ('pickle round trip (us)',
+         1e6 * seconds_per_call(lambda board: pickle.loads(pickle.dumps(board)), boards),
+         1e6 * seconds_per_call(lambda pos: pickle.loads(pickle.dumps(pos)), positions)),
+        ('hash (us)', None,
+         1e6 * seconds_per_call(hash, positions)),
+    ]
+    for name, board_value, position_value in rows:
+        board_text = 'identity' if board_value is None else f'{board_value:.1f}'
+        print(f'{name:<26} {board_text:>12} {position_value:>12.1f}')
+    print(f'{"Position -> Board (us)":<26} {"":>12} '
+          f'{1e6 * seconds_per_call(Position.to_board, positions):>12.1f}')
+    print(f'{"Board -> Position (us)":<26} {"":>12} '
+          f'{1e6 * seconds_per_call(Position.from_board, boards):>12.1f}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,62 @@
+"""Benchmark of search variants: plain alpha-beta, PVS and aspiration windows
+
+PYTHONPATH=app python -m benchmarks.search [depth] [positions]
+
+Every variant searches the same positions to fixed depth with a fresh AI;
+the scores must match, only node counts and times may differ.
+"""
+import random
+import sys
+import time
+from game.ai import AI
+from game.config import AIConstants
+from game.playout import random_position
+
+VARIANTS = {'alpha-beta': (False, 0),
+            'pvs': (True, 0),
+            'pvs+aspiration': (True, AIConstants.ASPIRATION_WINDOW or 5)}
+
+
+def suite(count: int, seed: int = 1) -> list:
+    """Positions with side to move from random games, none of them finished"""
+    rng = random.Random(seed)
+    positions = []
+    while len(positions) < count:
+        board, color = random_position(rng, (4, 60))
+        if board.winner is None and board.get_moves(color):
+            positions.append((board, color))
+    return positions
+
+
+def run(positions: list, depth: int, pvs: bool, window: int) -> tuple:
+    """Search all positions, get their scores, total nodes and seconds"""
+    scores, nodes = [], 0
+    start = time.perf_counter()
+    for board, color in positions:
+        epic_ai = AI(color)
+        epic_ai.pvs = pvs
+        epic_ai.aspiration_window = window
+        epic_ai.get_best_move(board, None, depth=depth)
+        scores.append(epic_ai.stats.score)
+        nodes += epic_ai.nodes
+    return scores, nodes, time.perf_counter() - start
+
+
+def main():
+    """Print nodes and time per variant relative to plain alpha-beta"""
+    depth = int(sys.argv[1]) if len(sys.argv) > 1 else 6
+    positions = suite(int(sys.argv[2]) if len(sys.argv) > 2 else 40)
+    print(f'depth={depth} positions={len(positions)}')
+    print(f'{"variant":>15} {"nodes":>10} {"seconds":>8} {"nodes %":>8} {"scores":>7}')
+    expected = base_nodes = None
+    for name, (pvs, window) in VARIANTS.items():
+        scores, nodes, seconds = run(positions, depth, pvs, window)
+        if expected is None:
+            expected, base_nodes = scores, nodes
+        same = 'same' if scores == expected else 'DIFFER'
+        print(f'{name:>15} {nodes:>10} {seconds:>8.3f} {100 * nodes / base_nodes:>7.1f}% '
+              f'{same:>7}')
+
+
+if __name__ == "__main__":
+    main()
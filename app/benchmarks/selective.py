@@ -0,0 +1,59 @@
+"""Benchmark of selective search against full-width search
+
+PYTHONPATH=app python -m benchmarks.selective [depth] [positions]
+
+Every option is searched on the same positions to fixed depth. Besides
+nodes and time it reports how much was pruned and how often the chosen
+move and the score differ from the full-width search.
+"""
+import sys
+import time
+from game.ai import AI
+from benchmarks.search import suite
+
+VARIANTS = {'full-width': (),
+            'lmr': ('lmr',),
+            'futility': ('futility',),
+            'razoring': ('razoring',),
+            'all': ('lmr', 'futility', 'razoring')}
+COUNTERS = ('reductions', 'reduction_researches', 'futility_pruned', 'razored')
+
+
+def run(positions: list, depth: int, options: tuple) -> dict:
+    """Search all positions with given options turned on, the others off"""
+    result = {'moves': [], 'scores': [], 'nodes': 0, **{name: 0 for name in COUNTERS}}
+    start = time.perf_counter()
+    for board, color in positions:
+        epic_ai = AI(color)
+        for option in ('lmr', 'futility', 'razoring'):
+            setattr(epic_ai, option, option in options)
+        result['moves'].append(epic_ai.get_best_move(board, None, depth=depth))
+        result['scores'].append(epic_ai.stats.score)
+        result['nodes'] += epic_ai.nodes
+        for name in COUNTERS:
+            result[name] += getattr(epic_ai, name)
+    result['seconds'] = time.perf_counter() - start
+    return result
+
+
+def main():
+    """Print cost, pruning and move choice differences per option"""
+    depth = int(sys.argv[1]) if len(sys.argv) > 1 else 6
+    positions = suite(int(sys.argv[2]) if len(sys.argv) > 2 else 40)
+    print(f'depth={depth} positions={len(positions)}')
+    print(f'{"variant":>10} {"nodes":>9} {"nodes %":>8} {"seconds":>8} {"reduced":>8} '
+          f'{"re-srch":>8} {"pruned":>8} {"razored":>8} {"same move":>10} {"score diff":>10}')
+    full = None
+    for name, options in VARIANTS.items():
+        result = run(positions, depth, options)
+        full = full or result
+        same = sum(a == b for a, b in zip(result['moves'], full['moves'])) / len(positions)
+        diff = sum(abs(a - b) for a, b in zip(result['scores'], full['scores'])) / len(positions)
+        print(f'{name:>10} {result["nodes"]:>9} {100 * result["nodes"] / full["nodes"]:>7.1f}% '
+              f'{result["seconds"]:>8.3f} {result["reductions"]:>8} '
+              f'{result["reduction_researches"]:>8} {result["futility_pruned"]:>8} '
+              f'{result["razored"]:>8} {100 * same:>9.1f}% {diff:>10.2f}')
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,163 @@
+"""Load generator for game.server: games/second at growing numbers of concurrent games
+
+PYTHONPATH=app python -m benchmarks.server_load [--concurrency 1,2,4,8] [--games N]
+    [--connections K] [--time SECONDS] [--depth D] [--workers W] [--host H --port P]
+
+Without --port a server with W worker processes is started in this process.
+Clients play random legal moves against the AI; moves refused as overloaded
+are sent again after a short pause. For every concurrency level it prints
+finished games per second, client side move latency percentiles and the
+server metrics, saturation is where games/second stops growing.
+"""
+import argparse
+import asyncio
+import itertools
+import json
+import random
+import time
+from game.config import ServerConstants
+from game.server import GameServer
+from game.server import percentile
+
+RETRY_SECONDS = 0.01
+
+
+class Connection:
+    """Client connection matching replies to requests by id"""
+
+    def __init__(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        self.reader = reader
+        self.writer = writer
+        self.ids = itertools.count(1)
+        self.waiting = {}
+        self.receiver = asyncio.get_running_loop().create_task(self.receive())
+
+    @classmethod
+    async def open(cls, host: str, port: int) -> 'Connection':
+        """Connect to server"""
+        return cls(*await asyncio.open_connection(host, port))
+
+    async def receive(self) -> None:
+        """Pass replies to requests waiting for them"""
+        while line := await self.reader.readline():
+            reply = json.loads(line)
+            self.waiting.pop(reply['id']).set_result(reply)
+
+    async def request(self, **request) -> dict:
+        """Send request and wait for its reply"""
+        request['id'] = next(self.ids)
+        future = asyncio.get_running_loop().create_future()
+        self.waiting[request['id']] = future
+        self.writer.write(json.dumps(request).encode() + b'\n')
+        await self.writer.drain()
+        return await future
+
+    async def close(self) -> None:
+        """Close connection"""
+        self.receiver.cancel()
+        self.writer.close()
+        await self.writer.wait_closed()
+
+
+async def play_game(connection: Connection, rng: random.Random, time_budget: float,
+                    depth, latencies: list) -> int:
+    """Play one game of random moves against the AI, get number of retried moves"""
+    # pylint: disable=too-many-arguments
+    retries = 0
+    while True:
+        state = await connection.request(op='new', ai=rng.choice(['white', 'black']),
+                                         time=time_budget, depth=depth)
+        if state['ok']:
+            break
+        retries += 1
+        await asyncio.sleep(RETRY_SECONDS)
+    while state['result'] is None:
+        request = {'op': 'move', 'session': state['session'], 'move': rng.choice(state['legal'])}
+        start = time.perf_counter()
+        reply = await connection.request(**request)
+        if not reply['ok']:
+            if reply['error'] != 'overloaded':
+                raise RuntimeError(reply['error'])
+            retries += 1
+            await asyncio.sleep(RETRY_SECONDS)
+            continue
+        latencies.append(time.perf_counter() - start)
+        state = reply
+    await connection.request(op='close', session=state['session'])
+    return retries
+
+
+async def run_level(host: str, port: int, concurrency: int, games: int, args) -> dict:
+    """Play `games` games with `concurrency` of them at once, get measurements"""
+    connections = [await Connection.open(host, port)
+                   for _ in range(min(args.connections, concurrency))]
+    rng = random.Random(concurrency)
+    queue = asyncio.Queue()
+    for index in range(games):
+        queue.put_nowait(index)
+    latencies, retries = [], []
+
+    async def player(connection):
+        while not queue.empty():
+            queue.get_nowait()
+            retries.append(await play_game(connection, rng, args.time, args.depth, latencies))
+
+    start = time.perf_counter()
+    await asyncio.gather(*(player(connections[index % len(connections)])
+                           for index in range(concurrency)))
+    seconds = time.perf_counter() - start
+    metrics = (await connections[0].request(op='metrics'))['metrics']
+    for connection in connections:
+        await connection.close()
+    return {'concurrency': concurrency, 'games': games, 'seconds': seconds,
+            'games_per_second': games / seconds, 'moves': len(latencies),
+            'retries': sum(retries),
+            'latency_ms': {name: 1000 * percentile(latencies, fraction)
+                           for name, fraction in (('p50', 0.5), ('p90', 0.9), ('p99', 0.99))},
+            'server': metrics}
+
+
+async def run(args) -> None:
+    """Start local server unless one is given and measure every concurrency level"""
+    game_server = None
+    host, port = args.host, args.port
+    if port is None:
+        game_server = GameServer(args.workers, args.queue_limit)
+        server = await game_server.start(host, 0)
+        port = server.sockets[0].getsockname()[1]
+    print(f'{"games at once":>13} {"games/s":>8} {"moves/s":>8} {"p50 ms":>8} {"p90 ms":>8} '
+          f'{"p99 ms":>8} {"retries":>8} {"max queued":>10}')
+    try:
+        for concurrency in args.concurrency:
+            if game_server is not None:
+                game_server.metrics.reset()
+            result = await run_level(host, port, concurrency, max(args.games, concurrency), args)
+            latency = result['latency_ms']
+            print(f'{concurrency:>13} {result["games_per_second"]:>8.2f} '
+                  f'{result["moves"] / result["seconds"]:>8.1f} {latency["p50"]:>8.1f} '
+                  f'{latency["p90"]:>8.1f} {latency["p99"]:>8.1f} {result["retries"]:>8} '
+                  f'{result["server"]["max_queued"]:>10}')
+    finally:
+        if game_server is not None:
+            server.close()
+            game_server.close()
+
+
+def main(argv=None):
+    """Parse command line and run the load"""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--concurrency', default='1,2,4,8,16',
+                        type=lambda text: [int(level) for level in text.split(',')])
+    parser.add_argument('--games', type=int, default=16, help='games per concurrency level')
+    parser.add_argument('--connections', type=int, default=4)
+    parser.add_argument('--time', type=float, default=0.02, help='seconds per AI move')
+    parser.add_argument('--depth', type=int, default=2, help='depth limit of AI moves')
+    parser.add_argument('--host', default=ServerConstants.HOST)
+    parser.add_argument('--port', type=int, default=None)
+    parser.add_argument('--workers', type=int, default=ServerConstants.WORKERS)
+    parser.add_argument('--queue-limit', type=int, default=ServerConstants.QUEUE_LIMIT)
+    asyncio.run(run(parser.parse_args(argv)))
+
+
+if __name__ == "__main__":
+    main()
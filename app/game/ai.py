@@ -1,34 +1,259 @@
 """This module handles AI."""
 import math
-from copy import deepcopy
 import random
+import time
 import numpy as np
 from game.config import StoneEnum
 from game.board import Board
 from game.config import AIConstants
+from game.book import OpeningBook
+from game.book import open_book
+from game.batch import evaluate_bitboards
+from game.config import DrawConstants
+from game.evaluation import DRAW_SCORE
+from game.evaluation import WIN_SCORE
+from game.evaluation import winner_sign
+from game.ordering import MoveOrderer
+from game.stats import NullSink
+from game.stats import Profiler
+from game.stats import SearchStats
+from game.tablebase import Tablebase
+from game.tablebase import open_tablebase
+from game.transposition import Bound
+from game.transposition import TranspositionTable
+
+
+class SearchAborted(Exception):
+    """Raised inside search when its time or node budget runs out"""
 
 
 class AI:
     """Class representing AI"""
+    # pylint: disable=too-many-instance-attributes
+    CHECK_EVERY = 256  # nodes between budget checks
 
-    def __init__(self, color: int) -> None:
+    def __init__(self, color: int, table_size_mb: float = AIConstants.TT_SIZE_MB,
+                 ordering: MoveOrderer = None,
+                 batch_leaves: bool = AIConstants.BATCH_LEAVES,
+                 evaluation=None, seed: int = AIConstants.SEED,
+                 tablebase: Tablebase = None, book: OpeningBook = None,
+                 book_random: bool = AIConstants.BOOK_RANDOM, sink: NullSink = None,
+                 quiescence: bool = AIConstants.QUIESCENCE) -> None:
+        # pylint: disable=too-many-arguments
         self.color = color
+        self.batch_leaves = batch_leaves  # batches only with evaluate_position
+        self.evaluate = evaluation if evaluation is not None else self.evaluate_position
+        self.rng = random.Random(seed)
+        self.table = TranspositionTable(table_size_mb) if table_size_mb > 0 else None
+        self.ordering = ordering if ordering is not None else MoveOrderer()
+        if tablebase is None and AIConstants.TABLEBASE is not None:
+            tablebase = open_tablebase(AIConstants.TABLEBASE)
+        self.tablebase = tablebase
+        if book is None and AIConstants.BOOK is not None:
+            book = open_book(AIConstants.BOOK)
+        self.book = book
+        self.book_random = book_random
+        self.sink = sink if sink is not None else NullSink()
+        self.quiescence = quiescence
+        self.quiescence_nodes = AIConstants.QUIESCENCE_NODES
+        self.pvs = AIConstants.PVS
+        self.aspiration_window = AIConstants.ASPIRATION_WINDOW
+        self.lmr = AIConstants.LMR
+        self.futility = AIConstants.FUTILITY
+        self.razoring = AIConstants.RAZORING
+        self.stats = None
+
+        self.nodes = 0
+        self.qnodes = 0  # nodes of quiescence search, also counted in nodes
+        self.qdepth = 0  # deepest quiescence ply reached
+        self.researches = 0  # principal variation search moves searched again
+        self.aspiration_researches = 0  # root searches repeated outside aspiration window
+        self.reductions = 0  # moves searched with reduced depth by late move reductions
+        self.reduction_researches = 0  # reduced moves failing high, searched at full depth
+        self.futility_pruned = 0  # quiet moves skipped by futility pruning
+        self.razored = 0  # nodes whose moves were searched one ply shallower by razoring
+        self.previous_score = None  # score of the last completed iteration
+        self.deadline = None
+        self.node_limit = None
+        self.stop_event = None  # threading.Event set from outside to stop the search
+        self.root_depth = 0
+        self.depth_reached = 0
+        self.follow_pv = False
+        self.pv = []
+        self.pv_lines = {}
+
+    def get_best_move(self, board: Board, time_budget=AIConstants.TIME_BUDGET,
+                      node_budget=None, depth=None):
+        """Find best move by iterative deepening
 
-    def get_best_move(self, board: Board):
-        """Find best move"""
-        evaluation, best_move = self.minimax(
-            board, AIConstants.DEPTH, self.color == StoneEnum.WHITE.value, -math.inf, math.inf)
-        print(f'EVAL = {evaluation}')
+        Searches depth 1, 2, 3... until time (seconds) or node budget runs
+        out and returns the best move of the deepest completed iteration.
+        Depth 1 is always completed. Without budgets searches to
+        AIConstants.DEPTH, `depth` caps the iterations explicitly.
+        Statistics of the search are left in `stats` and sent to `sink`.
+        """
+        start = time.perf_counter()
+        self.stats = SearchStats(self.color, 'search')
+        profiler = Profiler() if self.sink.enabled else None
+        if profiler is not None:
+            profiler.attach(board, self)
+        try:
+            best_move = self.choose_move(board, time_budget, node_budget, depth)
+        finally:
+            if profiler is not None:
+                profiler.detach(board, self)
+        stats = self.stats
+        stats.seconds = time.perf_counter() - start
+        stats.depth = self.depth_reached
+        stats.pv = [board.move_to_squares(move) for move in self.pv]
+        stats.nodes = self.nodes
+        stats.qnodes = self.qnodes
+        stats.qdepth = self.qdepth
+        stats.researches = self.researches
+        stats.aspiration_researches = self.aspiration_researches
+        stats.reductions = self.reductions
+        stats.reduction_researches = self.reduction_researches
+        stats.futility_pruned = self.futility_pruned
+        stats.razored = self.razored
+        stats.interior = sum(self.ordering.stats.nodes.values())
+        stats.cutoffs = sum(self.ordering.stats.cutoffs.values())
+        if profiler is not None:
+            stats.calls, stats.timings = profiler.calls, profiler.seconds
+        self.sink.record(stats)
+        if not best_move:
+            return None
+        return board.move_to_squares(best_move)
+
+    def choose_move(self, board: Board, time_budget, node_budget, depth):
+        """Get bit move from book, tablebase or search, None without moves"""
+        maximizing = self.color == StoneEnum.WHITE.value
+        self.nodes = 0
+        self.qnodes = 0
+        self.qdepth = 0
+        self.researches = 0
+        self.aspiration_researches = 0
+        self.reductions = 0
+        self.reduction_researches = 0
+        self.futility_pruned = 0
+        self.razored = 0
+        self.previous_score = None
+        self.pv = []
+        self.depth_reached = 0
+        self.ordering.new_search()
+        moves = board.get_moves(self.color)
+        if not moves:
+            return None
+        if self.book is not None:
+            book_move = self.book.choose(board, self.color,
+                                         self.rng if self.book_random else None)
+            if book_move is not None:
+                self.pv = [book_move]
+                self.stats.source = 'book'
+                return book_move
+        if self.tablebase is not None:
+            table_move = self.tablebase.best_move(board, self.color)
+            if table_move is not None:
+                self.pv = [table_move]
+                self.stats.source = 'tablebase'
+                self.stats.score = self.tablebase.score(board, self.color)
+                return table_move
+        if time_budget is None and node_budget is None:
+            max_depth = AIConstants.DEPTH
+        else:
+            max_depth = AIConstants.MAX_DEPTH
+        if depth is not None:
+            max_depth = depth
+        start = time.perf_counter()
+        self.deadline = None
+        self.node_limit = None
+        evaluation, best_move = None, moves[0]
+        for iteration in range(1, max_depth + 1):
+            self.root_depth = iteration
+            self.follow_pv = True
+            try:
+                evaluation, best_move = self.search_root(board, iteration, maximizing)
+            except SearchAborted:
+                break
+            self.pv = self.pv_lines.get(iteration, [])
+            self.depth_reached = iteration
+            self.previous_score = evaluation
+            self.stats.score = evaluation
+            self.stats.iteration_nodes.append(self.nodes - sum(self.stats.iteration_nodes))
+            self.report_iteration(board, start)
+            if len(moves) == 1:
+                break
+            # next iteration costs more than all previous ones together
+            if time_budget is not None:
+                if time.perf_counter() - start >= time_budget / 2:
+                    break
+                self.deadline = start + time_budget
+            if node_budget is not None:
+                if self.nodes >= node_budget:
+                    break
+                self.node_limit = node_budget
         return best_move
 
+    def report_iteration(self, board: Board, start: float) -> None:
+        """Pass stats of the completed iteration to the sink"""
+        stats = self.stats
+        stats.depth = self.depth_reached
+        stats.nodes = self.nodes
+        stats.pv = [board.move_to_squares(move) for move in self.pv]
+        stats.seconds = time.perf_counter() - start
+        self.sink.iteration(stats)
+
+    def search_root(self, board: Board, depth: int, maximizing_player: bool):
+        """Search one iteration of iterative deepening
+
+        When the previous iteration has a score, the search starts in the
+        aspiration window around it and is repeated with the failed side
+        of the window opened when the score falls outside.
+        """
+        previous, delta = self.previous_score, self.aspiration_window
+        if not delta or previous is None or abs(previous) >= WIN_SCORE:
+            return self.minimax(board, depth, maximizing_player, -math.inf, math.inf)
+        alpha, beta = previous - delta, previous + delta
+        while True:
+            score, move = self.minimax(board, depth, maximizing_player, alpha, beta)
+            if score <= alpha and alpha != -math.inf:
+                alpha = -math.inf
+            elif score >= beta and beta != math.inf:
+                beta = math.inf
+            else:
+                return score, move
+            self.aspiration_researches += 1
+            self.follow_pv = True
+
+    def check_budget(self) -> None:
+        """Abort search when its time or node budget is spent or it was stopped"""
+        if self.stop_event is not None and self.stop_event.is_set():
+            raise SearchAborted
+        if self.deadline is not None and time.perf_counter() >= self.deadline:
+            raise SearchAborted
+        if self.node_limit is not None and self.nodes >= self.node_limit:
+            raise SearchAborted
+
     def get_random_move(self, board: Board):
         """Gets random move for given position"""
         all_valid_moves = board.get_valid_moves_all_pieces(self.color)
-        random.seed(AIConstants.SEED)
-        piece = random.choice(list(all_valid_moves))
-        dest, captured_pieces = random.choice(list(all_valid_moves[piece]))
+        piece = self.rng.choice(list(all_valid_moves))
+        dest, captured_pieces = self.rng.choice(list(all_valid_moves[piece]))
         return piece, dest, captured_pieces
 
+    @staticmethod
+    def evaluate_position(board: Board):
+        """Evaluate board in O(1), equal to evaluate_board2 of its grid"""
+        return board.score + winner_sign(board.white_count, board.black_count) * WIN_SCORE
+
+    @staticmethod
+    def evaluate_material(board: Board):
+        """Evaluate board in O(1), equal to evaluate_board of its grid"""
+        bitboard = board.bitboard
+        white_kings = (bitboard.white & bitboard.kings).bit_count()
+        black_kings = (bitboard.black & bitboard.kings).bit_count()
+        score = (board.white_count - board.black_count) * 10 + (white_kings - black_kings) * 5
+        return score + winner_sign(board.white_count, board.black_count) * WIN_SCORE
+
     @staticmethod
     def calc_winner(board: np.ndarray) -> None:
         """Checks if board has winner"""
@@ -66,48 +291,257 @@ class AI:
         score += black_mask[board == StoneEnum.BLACK.value].sum()
         return score
 
-    @staticmethod
-    def get_possible_positions(board: Board, color: int):
-        """Gets all possible positions and moves to get there"""
-        possible_boards = []
-        all_valid_moves = board.get_valid_moves_all_pieces(color)
-        for piece in all_valid_moves:
-            for dest, captured_pieces in all_valid_moves[piece]:
-                new_board = deepcopy(board)
-                new_board.apply_move(*piece, *dest, captured_pieces)
-                possible_boards.append(
-                    (new_board, (piece, dest, captured_pieces)))
-
-        return possible_boards
+    def frontier_child(self, board: Board, sign: int, alpha, beta):
+        """Score child of a depth 1 node like negamax at depth 0, for the side that moved
+
+        Returns None for a leaf scored by static evaluation, those are left
+        to the batch evaluation of score_frontier.
+        """
+        if board.white_count == 0 or board.black_count == 0:
+            return None
+        if self.root_depth > 0 and (board.repetitions() > 1 or
+                                    board.quiet >= DrawConstants.QUIET_PLIES):
+            return -DRAW_SCORE
+        opponent = StoneEnum.BLACK.value if sign > 0 else StoneEnum.WHITE.value
+        if self.tablebase is not None:
+            score = self.tablebase.score(board, opponent)
+            if score is not None:
+                return sign * score
+        if self.quiescence and board.has_captures(opponent):
+            return -self.quiesce(board, -sign, -beta, -alpha, 1)
+        return None
+
+    def score_frontier(self, board: Board, moves, sign: int, alpha, beta):
+        """Score all children of a depth 1 node, static leaves with one batch evaluation
+
+        Draws, tablebase positions and forced captures are scored one by one
+        like in negamax. Batches use evaluate_position, with another
+        evaluation every leaf is evaluated on its own.
+        """
+        # pylint: disable=too-many-arguments
+        bitboard = board.bitboard
+        white, black, kings = [], [], []
+        scores = [None] * len(moves)
+        batch = self.evaluate == self.evaluate_position
+        for index, move in enumerate(moves):
+            undo = board.make_move(move)
+            try:
+                score = self.frontier_child(board, sign, alpha, beta)
+                if score is not None:
+                    alpha = max(alpha, score)
+                elif batch:
+                    white.append(bitboard.white)
+                    black.append(bitboard.black)
+                    kings.append(bitboard.kings)
+                else:
+                    score = sign * self.evaluate(board)
+                scores[index] = score
+            finally:
+                board.unmake_move(undo)
+        self.nodes += len(moves)
+        if not moves:
+            return -math.inf, None
+        if white:
+            batch = iter(evaluate_bitboards(white, black, kings, bitboard.geometry).tolist())
+            scores = [sign * next(batch) if score is None else score for score in scores]
+        best_eval = max(scores)
+        best_move = moves[scores.index(best_eval)]
+        self.pv_lines[1] = [best_move]
+        return best_eval, best_move
+
+    def quiesce(self, board: Board, sign: int, alpha, beta, qply: int):
+        """Search only forced captures until a quiet position and return its score
+
+        Called at depth 0 when the side to move has to capture. Captures
+        are mandatory, so there is no stand pat. Once `quiescence_nodes`
+        are spent, positions are evaluated without resolving captures.
+        Score is from the point of view of the side to move like in negamax.
+        """
+        # pylint: disable=too-many-arguments
+        self.nodes += 1
+        self.qnodes += 1
+        self.qdepth = max(self.qdepth, qply)
+        if self.nodes % self.CHECK_EVERY == 0:
+            self.check_budget()
+        if board.white_count == 0 or board.black_count == 0:
+            return sign * self.evaluate(board)
+        color = StoneEnum.WHITE.value if sign > 0 else StoneEnum.BLACK.value
+        if self.tablebase is not None:
+            score = self.tablebase.score(board, color)
+            if score is not None:
+                return sign * score
+        if self.qnodes >= self.quiescence_nodes or not board.has_captures(color):
+            return sign * self.evaluate(board)
+        best_eval = -math.inf
+        for move in board.get_moves(color):
+            undo = board.make_move(move)
+            try:
+                value = -self.quiesce(board, -sign, -beta, -alpha, qply + 1)
+            finally:
+                board.unmake_move(undo)
+            if value > best_eval:
+                best_eval = value
+                alpha = max(alpha, value)
+                if alpha >= beta:
+                    break
+        return best_eval
+
+    def selective_margins(self, board: Board, depth: int, sign: int, alpha, moves):
+        """Decide razoring and futility pruning of node from its static evaluation
+
+        Returns depth reduction of all moves by razoring and the score given
+        to quiet moves pruned by futility, None when they are searched.
+        Nodes with captures, the root and nodes without a finite alpha are
+        searched in full. Margins are in evaluate_board2 points.
+        """
+        # pylint: disable=too-many-arguments
+        if (not (self.razoring or self.futility) or depth >= self.root_depth
+                or alpha == -math.inf or not moves or moves[0][2]):
+            return 0, None
+        static = sign * self.evaluate(board)
+        margins = AIConstants.FUTILITY_MARGINS
+        if self.futility and depth <= len(margins) and static + margins[depth - 1] <= alpha:
+            return 0, static + margins[depth - 1]
+        if (self.razoring and 2 <= depth <= AIConstants.RAZOR_DEPTH
+                and static + AIConstants.RAZOR_MARGIN <= alpha):
+            self.razored += 1
+            return 1, None
+        return 0, None
+
+    def search_move(self, board: Board, depth: int, sign: int, alpha, beta,
+                    first: bool, reduction: int):
+        """Score move just made on board for the side that made it
+
+        Reduced moves get a null window search `reduction` plies shallower
+        first and are searched at full depth only when they beat alpha.
+        Moves after the first are searched with principal variation search.
+        """
+        # pylint: disable=too-many-arguments
+        if reduction:
+            value = -self.negamax(board, depth - 1 - reduction, -sign, -alpha - 1, -alpha)[0]
+            if value <= alpha:
+                self.pv_lines[depth - 1] = []
+                return value
+            self.reduction_researches += 1
+        if first or not self.pvs or alpha == -math.inf:
+            return -self.negamax(board, depth - 1, -sign, -beta, -alpha)[0]
+        value = -self.negamax(board, depth - 1, -sign, -alpha - 1, -alpha)[0]
+        if alpha < value < beta:
+            self.researches += 1
+            value = -self.negamax(board, depth - 1, -sign, -beta, -alpha)[0]
+        return value
 
     def minimax(self, board: Board, depth: int, maximizing_player: bool, alpha, beta):
-        """Implementation of MiniMax algorithm"""
+        """Search with alpha-beta window and score from the point of view of white
+
+        Wraps negamax for callers thinking in maximizing and minimizing
+        players. Returned move is in bit masks, see Board.move_to_squares.
+        """
         # pylint: disable=too-many-arguments
-        if depth == 0 or self.calc_winner(board.grid) != 0:
-            return self.evaluate_board2(board.grid), ()
         if maximizing_player:
-            max_eval = -math.inf
+            return self.negamax(board, depth, 1, alpha, beta)
+        score, move = self.negamax(board, depth, -1, -beta, -alpha)
+        return -score, move
+
+    def negamax(self, board: Board, depth: int, sign: int, alpha, beta):
+        """Negamax alpha-beta search with principal variation search
+
+        `sign` is 1 when white is to move and -1 for black, the score is from
+        the point of view of the side to move. With `pvs` moves after the
+        first are searched with a null window first and searched again
+        only when they fall inside the window; scores are integers, so the
+        null window is one point wide. Moves are made and taken back on the
+        given board, which is left unchanged.
+        Stored results only cut off searches of the same depth, so the
+        transposition table changes the cost of the search, not its result.
+        Positions covered by the tablebase are leaves with exact scores.
+        Below the root, positions repeated in the game or the search and
+        positions reaching the move limit are draws.
+        """
+        # pylint: disable=too-many-arguments, too-many-branches, too-many-locals
+        # pylint: disable=too-many-statements
+        self.nodes += 1
+        if self.nodes % self.CHECK_EVERY == 0:
+            self.check_budget()
+        self.pv_lines[depth] = []
+        if board.white_count == 0 or board.black_count == 0:
+            return sign * self.evaluate(board), ()
+        if depth < self.root_depth and (board.repetitions() > 1 or
+                                        board.quiet >= DrawConstants.QUIET_PLIES):
+            return DRAW_SCORE, ()
+        color = StoneEnum.WHITE.value if sign > 0 else StoneEnum.BLACK.value
+        if self.tablebase is not None:
+            score = self.tablebase.score(board, color)
+            if score is not None:
+                return sign * score, ()
+        if depth == 0:
+            if self.quiescence and board.has_captures(color):
+                return self.quiesce(board, sign, alpha, beta, 1), ()
+            return sign * self.evaluate(board), ()
+        key = board.zobrist
+        if sign < 0:
+            key ^= board.bitboard.geometry.side_key
+        table_move = None
+        if self.table is not None:
+            entry = self.table.probe(key)
+            if entry is not None:
+                _, entry_depth, bound, score, table_move = entry
+                if entry_depth == depth:
+                    if bound == Bound.EXACT:
+                        return score, table_move
+                    if bound == Bound.LOWER:
+                        alpha = max(alpha, score)
+                    else:
+                        beta = min(beta, score)
+                    if alpha >= beta:
+                        return score, table_move
+        alpha_start = alpha
+
+        ply = self.root_depth - depth
+        pv_move = self.pv[ply] if self.follow_pv and ply < len(self.pv) else None
+        moves = self.ordering.order(board.get_moves(color), ply, depth,
+                                    board.bitboard.kings, (pv_move, table_move))
+        follow_pv = pv_move is not None and moves[:1] == [pv_move]
+
+        if depth == 1 and self.batch_leaves:
+            best_eval, best_move = self.score_frontier(board, moves, sign, alpha, beta)
+        else:
+            best_eval = -math.inf
             best_move = None
-            for new_board, move in self.get_possible_positions(board, StoneEnum.WHITE.value):
-                value = self.minimax(new_board, depth - 1,
-                                     False, alpha, beta)[0]
-                max_eval = max(max_eval, value)
-                if value == max_eval:
-                    best_move = move
-                alpha = max(alpha, max_eval)
-                if beta <= alpha:
+            razor, futility = self.selective_margins(board, depth, sign, alpha, moves)
+            for index, move in enumerate(moves):
+                self.follow_pv = follow_pv and index == 0
+                undo = board.make_move(move)
+                quiet = not move[2] and not undo.promoted
+                try:
+                    if futility is not None and index > 0 and quiet:
+                        self.futility_pruned += 1
+                        value = futility
+                    else:
+                        reduction = razor
+                        if (self.lmr and quiet and depth >= AIConstants.LMR_DEPTH
+                                and index >= AIConstants.LMR_MOVES):
+                            self.reductions += 1
+                            reduction += AIConstants.LMR_REDUCTION
+                        value = self.search_move(board, depth, sign, alpha, beta, index == 0,
+                                                 min(reduction, depth - 1))
+                finally:
+                    board.unmake_move(undo)
+                if value > best_eval:
+                    best_eval, best_move = value, move
+                    alpha = max(alpha, best_eval)
+                    self.pv_lines[depth] = [move] + self.pv_lines[depth - 1]
+                if alpha >= beta:
+                    self.ordering.cutoff(move, ply, depth, index)
                     break
+        self.follow_pv = False
 
-            return max_eval, best_move
-        min_eval = math.inf
-        best_move = None
-        for new_board, move in self.get_possible_positions(board, StoneEnum.BLACK.value):
-            value = self.minimax(new_board, depth - 1,
-                                 True, alpha, beta)[0]
-            min_eval = min(min_eval, value)
-            if value == min_eval:
-                best_move = move
-            beta = min(beta, min_eval)
-            if beta <= alpha:
-                break
-        return min_eval, best_move
+        if self.table is not None:
+            if best_eval <= alpha_start:
+                bound = Bound.UPPER
+            elif best_eval >= beta:
+                bound = Bound.LOWER
+            else:
+                bound = Bound.EXACT
+            self.table.store(key, depth, bound, best_eval, best_move)
+        return best_eval, best_move
@@ -0,0 +1,61 @@
+"""Module for evaluating many positions at once"""
+from functools import lru_cache
+import numpy as np
+from game.bitboard import Geometry
+from game.config import StoneEnum
+from game.evaluation import PIECE_VALUE
+from game.evaluation import WIN_SCORE
+from game.evaluation import advancement
+from game.evaluation import weight_table
+
+
+def winner_signs(white_counts: np.ndarray, black_counts: np.ndarray) -> np.ndarray:
+    """Vectorized evaluation.winner_sign"""
+    return np.where(white_counts == 0, -1, np.where(black_counts == 0, 1, 0))
+
+
+def evaluate_grids(grids) -> np.ndarray:
+    """Evaluate (N, rows, cols) stack of grids, same as AI.evaluate_board2 of each"""
+    grids = np.asarray(grids)
+    rows = grids.shape[1]
+    white_mask = np.array([advancement(rows, row) for row in range(rows)])[:, np.newaxis]
+    black_mask = -white_mask[::-1]
+
+    counts = {piece: (grids == piece).sum(axis=(1, 2)) for piece in PIECE_VALUE}
+    score = sum(value * counts[piece] for piece, value in PIECE_VALUE.items())
+    score = score + (white_mask * (grids == StoneEnum.WHITE.value)).sum(axis=(1, 2))
+    score = score + (black_mask * (grids == StoneEnum.BLACK.value)).sum(axis=(1, 2))
+    white_counts = counts[StoneEnum.WHITE.value] + counts[StoneEnum.WHITE_KING.value]
+    black_counts = counts[StoneEnum.BLACK.value] + counts[StoneEnum.BLACK_KING.value]
+    return score + winner_signs(white_counts, black_counts) * WIN_SCORE
+
+
+def unpack_bits(masks: np.ndarray) -> np.ndarray:
+    """Unpack N uint64 masks to (N, 64) array of bits, column i is bit i"""
+    as_bytes = masks.astype('<u8').view(np.uint8).reshape(-1, 8)
+    return np.unpackbits(as_bytes, axis=1, bitorder='little')
+
+
+@lru_cache(maxsize=None)
+def weight_matrix(geometry: Geometry) -> np.ndarray:
+    """Weights of white men, black men, white kings and black kings per bit as (256,)"""
+    table = weight_table(geometry)
+    weights = np.zeros((4, 64), dtype=np.int64)
+    for index, piece in enumerate(PIECE_VALUE):
+        for mask, weight in table[piece].items():
+            weights[index, mask.bit_length() - 1] = weight
+    return weights.reshape(-1)
+
+
+def evaluate_bitboards(white, black, kings, geometry: Geometry) -> np.ndarray:
+    """Evaluate N positions given as masks, same as AI.evaluate_position of each"""
+    white = np.asarray(white, dtype=np.uint64)
+    black = np.asarray(black, dtype=np.uint64)
+    kings = np.asarray(kings, dtype=np.uint64)
+    men = ~kings
+    pieces = np.concatenate([unpack_bits(white & men), unpack_bits(black & men),
+                             unpack_bits(white & kings), unpack_bits(black & kings)], axis=1)
+    score = pieces @ weight_matrix(geometry)
+    white_counts = unpack_bits(white).sum(axis=1)
+    black_counts = unpack_bits(black).sum(axis=1)
+    return score + winner_signs(white_counts, black_counts) * WIN_SCORE
@@ -0,0 +1,324 @@
+"""Module with bitboard position engine"""
+from functools import lru_cache
+import random
+import numpy as np
+from game.config import StoneEnum
+
+ZOBRIST_SEED = 2023
+CAPTURE_CACHE_SIZE = 2**14  # positions with captures kept per geometry
+
+
+class Geometry:
+    """Bit layout of playable squares for board of given size
+
+    Playable squares are numbered row by row and every pair of rows is
+    followed by one unused (ghost) bit. With that padding every diagonal
+    step is a constant shift of `half` or `half + 1` bits, and steps
+    leaving the board land on a ghost bit or outside of the valid mask.
+    """
+    # pylint: disable=too-many-instance-attributes
+
+    def __init__(self, rows: int, cols: int) -> None:
+        self.rows = rows
+        self.cols = cols
+        self.half = cols // 2
+
+        self.squares = {}  # bit -> (row, col)
+        self.bits = {}  # (row, col) -> bit
+        self.valid = 0
+        for row in range(rows):
+            for col in range(cols):
+                if (row + col) % 2 == 1:
+                    bit = row*self.half + row//2 + col//2
+                    self.squares[bit] = (row, col)
+                    self.bits[(row, col)] = bit
+                    self.valid |= 1 << bit
+
+        self.first_row = self.row_mask(0)
+        self.last_row = self.row_mask(rows - 1)
+
+        # shifts in the same order as Board.get_dirs
+        up_right, up_left = -self.half, -(self.half + 1)
+        down_right, down_left = self.half + 1, self.half
+        self.shifts = {
+            StoneEnum.WHITE.value: (up_right, up_left),
+            StoneEnum.BLACK.value: (down_right, down_left),
+            StoneEnum.WHITE_KING.value: (up_right, up_left, down_right, down_left),
+            StoneEnum.BLACK_KING.value: (up_right, up_left, down_right, down_left),
+        }
+
+        # per square (jumped mask, landing mask) of every capture staying on board
+        self.jumps = {piece: {1 << bit: self._jumps(1 << bit, amounts) for bit in self.squares}
+                      for piece, amounts in self.shifts.items()}
+
+        self.captures = {}  # capture moves of recent positions
+
+        # zobrist keys are seeded so that hashes agree between processes
+        rng = random.Random(ZOBRIST_SEED)
+        self.zobrist = {piece.value: {1 << bit: rng.getrandbits(64) for bit in self.squares}
+                        for piece in StoneEnum}
+        self.side_key = rng.getrandbits(64)
+
+    def _jumps(self, mask: int, amounts) -> tuple:
+        """Captures from given square in the order of given shifts"""
+        jumps = []
+        for amount in amounts:
+            middle = shift(mask, amount) & self.valid
+            dest = shift(middle, amount) & self.valid
+            if middle and dest:
+                jumps.append((middle, dest))
+        return tuple(jumps)
+
+    def row_mask(self, row: int) -> int:
+        """Mask of all playable squares in given row"""
+        mask = 0
+        for (square_row, _), bit in self.bits.items():
+            if square_row == row:
+                mask |= 1 << bit
+        return mask
+
+    def square(self, mask: int) -> tuple[int, int]:
+        """Convert single bit mask to (row, col)"""
+        return self.squares[mask.bit_length() - 1]
+
+    def mask(self, row: int, col: int) -> int:
+        """Convert (row, col) to single bit mask, 0 for unplayable squares"""
+        bit = self.bits.get((row, col))
+        if bit is None:
+            return 0
+        return 1 << bit
+
+    def __deepcopy__(self, memo):
+        return self
+
+    def __reduce__(self):
+        return get_geometry, (self.rows, self.cols)
+
+
+@lru_cache(maxsize=None)
+def get_geometry(rows: int, cols: int) -> Geometry:
+    """Shared geometry for given board size"""
+    return Geometry(rows, cols)
+
+
+def shift(mask: int, amount: int) -> int:
+    """Shift mask by signed amount of bits"""
+    if amount > 0:
+        return mask << amount
+    return mask >> -amount
+
+
+def iter_bits(mask: int):
+    """Yield single bit masks of given mask from lowest to highest"""
+    while mask:
+        low = mask & -mask
+        yield low
+        mask ^= low
+
+
+class BitBoard:
+    """Position stored as bitmasks of white pieces, black pieces and kings
+
+    `white` and `black` contain every piece of the color, `kings` marks
+    which of them are kings, so white men are `white & ~kings`.
+    """
+
+    def __init__(self, geometry: Geometry) -> None:
+        self.geometry = geometry
+        self.white = 0
+        self.black = 0
+        self.kings = 0
+
+    def load_grid(self, grid) -> None:
+        """Load position from 2D grid of StoneEnum values"""
+        self.white = self.black = self.kings = 0
+        for (row, col), bit in self.geometry.bits.items():
+            piece = int(grid[row][col])
+            if piece == 0:
+                continue
+            if piece in (StoneEnum.WHITE.value, StoneEnum.WHITE_KING.value):
+                self.white |= 1 << bit
+            else:
+                self.black |= 1 << bit
+            if piece > 2:
+                self.kings |= 1 << bit
+
+    def to_grid(self) -> np.ndarray:
+        """Build 2D grid of StoneEnum values"""
+        grid = np.zeros((self.geometry.rows, self.geometry.cols), dtype=np.int8)
+        for mask in iter_bits(self.white | self.black):
+            grid[self.geometry.square(mask)] = self.piece(mask)
+        return grid
+
+    def pieces(self):
+        """Yield (StoneEnum value, square mask) of every piece, grouped by piece type"""
+        men = ~self.kings
+        for piece, pieces in ((StoneEnum.WHITE.value, self.white & men),
+                              (StoneEnum.BLACK.value, self.black & men),
+                              (StoneEnum.WHITE_KING.value, self.white & self.kings),
+                              (StoneEnum.BLACK_KING.value, self.black & self.kings)):
+            for mask in iter_bits(pieces):
+                yield piece, mask
+
+    def zobrist(self) -> int:
+        """Compute zobrist hash of piece placement from scratch"""
+        keys = self.geometry.zobrist
+        key = 0
+        for piece, mask in self.pieces():
+            key ^= keys[piece][mask]
+        return key
+
+    def piece(self, mask: int) -> int:
+        """Get StoneEnum value of piece on given square mask, 0 if empty"""
+        if self.white & mask:
+            piece = StoneEnum.WHITE.value
+        elif self.black & mask:
+            piece = StoneEnum.BLACK.value
+        else:
+            return 0
+        if self.kings & mask:
+            piece += 2
+        return piece
+
+    def put(self, mask: int, piece: int) -> None:
+        """Put piece on given square mask, replacing anything there"""
+        self.clear(mask)
+        if piece in (StoneEnum.WHITE.value, StoneEnum.WHITE_KING.value):
+            self.white |= mask
+        else:
+            self.black |= mask
+        if piece > 2:
+            self.kings |= mask
+
+    def clear(self, mask: int) -> None:
+        """Remove anything from given square mask"""
+        self.white &= ~mask
+        self.black &= ~mask
+        self.kings &= ~mask
+
+    def empty(self) -> int:
+        """Mask of empty playable squares"""
+        return self.geometry.valid & ~(self.white | self.black)
+
+    def own_and_opponent(self, piece_type: int) -> tuple[int, int]:
+        """Get masks of own and opponent pieces for given piece type"""
+        if piece_type in (StoneEnum.WHITE.value, StoneEnum.WHITE_KING.value):
+            return self.white, self.black
+        return self.black, self.white
+
+    def piece_moves(self, mask: int, piece_type: int, captured=()):
+        """Get moves of one piece as list of (dest mask, captured masks)
+
+        Only the longest capture chains are returned. Quiet moves are
+        returned when no capture is possible and `captured` is empty.
+        """
+        _, opponent = self.own_and_opponent(piece_type)
+        empty = self.empty()
+
+        captured_mask = 0
+        for cap in captured:
+            captured_mask |= cap
+        paths = self._capture_chains(mask, self.geometry.jumps[piece_type], opponent,
+                                     empty, captured_mask, tuple(captured))
+        if paths:
+            longest = max(len(path) for _, path in paths)
+            return [(dest, path) for dest, path in paths if len(path) == longest]
+        if captured:
+            return []
+        moves = []
+        for amount in self.geometry.shifts[piece_type]:
+            dest = shift(mask, amount) & empty
+            if dest:
+                moves.append((dest, ()))
+        return moves
+
+    @staticmethod
+    def _capture_chains(mask, jumps, opponent, empty, captured, path):
+        # pylint: disable=too-many-arguments
+        """Get capture chains from given square as (dest, path) in depth first preorder
+
+        `jumps` is the Geometry.jumps table of the piece type, `captured` the
+        mask of pieces already taken by `path`. Uses an explicit stack of
+        jump iterators instead of recursion.
+        """
+        paths = []
+        stack = [(iter(jumps[mask]), captured, path)]
+        while stack:
+            steps, captured, path = stack[-1]
+            for middle, dest in steps:
+                if middle & opponent and not middle & captured and dest & empty:
+                    chain = path + (middle,)
+                    paths.append((dest, chain))
+                    stack.append((iter(jumps[dest]), captured | middle, chain))
+                    break
+            else:
+                stack.pop()
+        return paths
+
+    def jumpers(self, pieces: int, shifts, opponent: int, empty: int) -> int:
+        """Mask of pieces able to capture in at least one of given directions"""
+        result = 0
+        for amount in shifts:
+            result |= shift(opponent, -amount) & shift(empty, -2*amount)
+        return result & pieces
+
+    def movers(self, pieces: int, shifts, empty: int) -> int:
+        """Mask of pieces able to make quiet move in one of given directions"""
+        result = 0
+        for amount in shifts:
+            result |= shift(empty, -amount)
+        return result & pieces
+
+    def can_capture(self, color: int) -> bool:
+        """Check if given player color has to capture"""
+        own, opponent = self.own_and_opponent(color)
+        empty = self.empty()
+        shifts = self.geometry.shifts
+        return bool(self.jumpers(own & ~self.kings, shifts[color], opponent, empty) or
+                    self.jumpers(own & self.kings, shifts[color + 2], opponent, empty))
+
+    def generate_moves(self, color: int) -> dict:
+        """Get moves for given player color as {piece mask: piece moves}
+
+        Mirrors the maximum capture rule: if any piece can capture, only
+        pieces with the longest chains are returned. Men come before kings,
+        both ordered from the top left of the board. Capture moves are cached
+        per position in the geometry, the returned dict must not be modified.
+        """
+        own, opponent = self.own_and_opponent(color)
+        king_color = color + 2
+        groups = ((own & ~self.kings, color), (own & self.kings, king_color))
+        empty = self.empty()
+        shifts = self.geometry.shifts
+
+        if any(self.jumpers(pieces, shifts[piece_type], opponent, empty)
+               for pieces, piece_type in groups):
+            cache = self.geometry.captures
+            key = (self.white, self.black, self.kings, color)
+            all_moves = cache.get(key)
+            if all_moves is not None:
+                return all_moves
+            all_moves = {}
+            max_captures = 0
+            for pieces, piece_type in groups:
+                pieces = self.jumpers(pieces, shifts[piece_type], opponent, empty)
+                for mask in iter_bits(pieces):
+                    moves = self.piece_moves(mask, piece_type)
+                    captures = len(moves[0][1])
+                    if captures > max_captures:
+                        all_moves.clear()
+                        max_captures = captures
+                    if captures == max_captures:
+                        all_moves[mask] = moves
+            if len(cache) >= CAPTURE_CACHE_SIZE:
+                cache.clear()
+            cache[key] = all_moves
+            return all_moves
+
+        all_moves = {}
+        for pieces, piece_type in groups:
+            for mask in iter_bits(self.movers(pieces, shifts[piece_type], empty)):
+                all_moves[mask] = [(dest, ()) for dest in
+                                   (shift(mask, amount) & empty
+                                    for amount in shifts[piece_type]) if dest]
+        return all_moves
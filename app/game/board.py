@@ -1,18 +1,41 @@
 """Module for fast computing"""
-from copy import deepcopy
-import pygame
-import numpy as np
-from game.config import Colors
+from typing import NamedTuple, Optional
+from game.bitboard import get_geometry
+from game.bitboard import BitBoard
+from game.config import DrawConstants
 from game.config import StoneEnum
-from game.config import StoneImages
-from game.config import SizeConstants as const
+from game.evaluation import weight_table
+
+PIECES = {'.': 0, 'w': StoneEnum.WHITE.value, 'b': StoneEnum.BLACK.value,
+          'W': StoneEnum.WHITE_KING.value, 'B': StoneEnum.BLACK_KING.value}
+
+
+class UndoRecord(NamedTuple):
+    """Everything needed to take back one move"""
+    move: tuple
+    piece: int
+    captured_kings: int
+    promoted: bool
+    white_count: int
+    black_count: int
+    winner: Optional[int]
+    zobrist: int
+    score: int
+    square: Optional[tuple]
+    previous_square: Optional[tuple]
+    quiet: int
 
 
 class Board:
-    """Class representing game board of checkers"""
+    """Class representing game board of checkers
+
+    Rendering lives in view.game_view.BoardView, `cell_width` and `radius`
+    are still accepted so that existing callers keep working.
+    """
     # pylint: disable=too-many-instance-attributes
 
-    def __init__(self, rows: int, cols: int, cell_width: int, radius: int) -> None:
+    def __init__(self, rows: int, cols: int, cell_width: int = 0, radius: int = 0) -> None:
+        # pylint: disable=unused-argument
         self.rows = rows
         self.cols = cols
 
@@ -20,92 +43,85 @@ class Board:
         self.black_count = 0
         self.winner = None
 
-        self.grid = np.zeros((rows, cols), dtype=np.int8)
-        self.cell_width = cell_width
-        self.circle_radius = radius
+        self.bitboard = BitBoard(get_geometry(rows, cols))
+        self.weights = weight_table(self.bitboard.geometry)
+        self.zobrist = 0
+        self.score = 0
+        self._grid = None
+        self.history = []  # position keys with side to move, one per ply
+        self.seen = {}  # {position key: occurrences in history}
+        self.quiet = 0  # plies since the last capture or man move
         self.init_pieces()
 
         self.square = None
         self.previous_square = None
 
+    @property
+    def grid(self):
+        """Read-only numpy view of the position, rebuilt after every change"""
+        if self._grid is None:
+            self._grid = self.bitboard.to_grid()
+            self._grid.flags.writeable = False
+        return self._grid
+
+    @grid.setter
+    def grid(self, grid) -> None:
+        self.bitboard.load_grid(grid)
+        self.sync()
+
+    def sync(self) -> None:
+        """Recompute counts, hash and score after bitboards were set directly"""
+        self.white_count = self.bitboard.white.bit_count()
+        self.black_count = self.bitboard.black.bit_count()
+        self.zobrist = self.bitboard.zobrist()
+        self.score = self.compute_score()
+        self._grid = None
+        self.history = [self.zobrist]
+        self.seen = {self.zobrist: 1}
+        self.quiet = 0
+
+    def copy_history(self, other: 'Board') -> None:
+        """Take over game history of other board standing in the same position"""
+        self.history = list(other.history)
+        self.seen = dict(other.seen)
+        self.quiet = other.quiet
+
+    def set_history(self, history, quiet: int) -> None:
+        """Take over game history as position keys, e.g. sent to another process"""
+        self.history = list(history)
+        self.seen = {}
+        for key in self.history:
+            self.seen[key] = self.seen.get(key, 0) + 1
+        self.quiet = quiet
+
+    def repetitions(self) -> int:
+        """Occurrences of the current position with the same side to move in history"""
+        return self.seen[self.history[-1]]
+
+    def is_draw(self) -> bool:
+        """Check if game is drawn by repetition or by the move limit"""
+        return self.repetitions() >= DrawConstants.REPETITIONS or \
+            self.quiet >= DrawConstants.QUIET_PLIES
+
+    def compute_score(self) -> int:
+        """Compute material and advancement score from scratch"""
+        weights = self.weights
+        return sum(weights[piece][mask] for piece, mask in self.bitboard.pieces())
+
     def init_pieces(self) -> None:
         """Init pieces on the board"""
         game_rows = (self.rows - 2)//2
+        geometry = self.bitboard.geometry
         # init black
         for row in range(game_rows):
-            for col in range(self.cols):
-                if (row + col) % 2 == 1:
-                    self.grid[row, col] = StoneEnum.BLACK.value
-                    self.black_count += 1
+            self.bitboard.black |= geometry.row_mask(row)
         for row in range(self.rows - game_rows, self.rows):
-            for col in range(self.cols):
-                if (row + col) % 2 == 1:
-                    self.grid[row, col] = StoneEnum.WHITE.value
-                    self.white_count += 1
-
-    def draw_piece(self, screen, row, col, color) -> None:
-        """Draw given piece on screen"""
-        if color == StoneEnum.WHITE.value:
-            img = StoneImages.WHITE_STONE
-        elif color == StoneEnum.WHITE_KING.value:
-            img = StoneImages.WHITE_KING
-        elif color == StoneEnum.BLACK.value:
-            img = StoneImages.BLACK_STONE
-        else:
-            img = StoneImages.BLACK_KING
-
-        x_pos = col*self.cell_width
-        y_pos = row*self.cell_width
-        x_stone = x_pos + const.STONE_OFFSET
-        y_stone = y_pos + const.STONE_OFFSET
-        screen.blit(img, (x_stone, y_stone))
-
-    def highlight_prev(self, screen):
-        """Highlight previous move"""
-        if self.square is not None:
-            pygame.draw.rect(screen, Colors.YELLOW, (self.square[1]*self.cell_width,
-                                                    self.square[0]*self.cell_width,
-                                                    self.cell_width, self.cell_width))
-            pygame.draw.rect(screen, Colors.YELLOW, (self.previous_square[1]*self.cell_width,
-                                                    self.previous_square[0]*self.cell_width,
-                                                    self.cell_width, self.cell_width))
-
-    def highlight(self, screen, row: int, col: int):
-        """Highlight given square"""
-        pygame.draw.rect(screen, Colors.YELLOW, (col*self.cell_width,
-                         row*self.cell_width, self.cell_width, self.cell_width))
-
-    def draw_pieces(self, screen):
-        """Draw all pieces"""
-        for row in range(self.rows):
-            for col in range(self.cols):
-                if self.grid[row][col] != 0:
-                    self.draw_piece(screen, row, col, self.grid[row, col])
-
-    def draw_all(self, screen) -> None:
-        """Draws everything needed on screen"""
-        self.draw_grid(screen)
-        self.highlight_prev(screen)
-
-    def draw_valid_moves(self, screen, valid_moves):
-        """Draw all valid moves on screen"""
-        for move, _ in valid_moves:
-            row, col = move
-            pygame.draw.circle(screen, Colors.BLUE, (col * self.cell_width + self.cell_width //
-                               2, row * self.cell_width + self.cell_width//2), self.circle_radius)
-
-    def draw_grid(self, screen) -> None:
-        """Draws empty board on screen"""
-        # self.screen.fill(Colors.BLACK)
-        for row in range(self.rows):
-            for col in range(self.cols):
-                color = Colors.BROWN if (row+col) % 2 else Colors.WHITE
-                pygame.draw.rect(screen, color, (row*self.cell_width, col*self.cell_width,
-                                                 self.cell_width, self.cell_width))
+            self.bitboard.white |= geometry.row_mask(row)
+        self.sync()
 
     def get_piece(self, row, col):
         """Retrieve piece"""
-        return self.grid[row, col]
+        return self.bitboard.piece(self.bitboard.geometry.mask(row, col))
 
     def get_winner(self):
         """Get winner color"""
@@ -119,22 +135,106 @@ class Board:
             return False
         return True
 
-    def apply_move(self, row: int, col: int, new_row: int, new_col: int, captured_pieces) -> None:
+    def apply_move(self, row: int, col: int, new_row: int, new_col: int,
+                   captured_pieces) -> UndoRecord:
         # pylint: disable=too-many-arguments
         """Moves piece from old position to new position"""
-        piece = self.grid[row, col]
-        self.grid[new_row, new_col] = piece
-        self.grid[row, col] = 0
+        geometry = self.bitboard.geometry
+        captured = tuple(geometry.mask(*cap) for cap in captured_pieces)
+        return self.make_move((geometry.mask(row, col), geometry.mask(new_row, new_col), captured))
+
+    def make_move(self, move) -> UndoRecord:
+        """Apply move given as (source, dest, captured) bit masks
+
+        Returns record which takes the move back in unmake_move.
+        """
+        source, dest, captured = move
+        bitboard = self.bitboard
+        geometry = bitboard.geometry
+        piece = bitboard.piece(source)
+        captured_kings = 0
+        for cap in captured:
+            captured_kings |= bitboard.kings & cap
+        promoted = (piece == StoneEnum.WHITE.value and bool(dest & geometry.first_row)) or \
+            (piece == StoneEnum.BLACK.value and bool(dest & geometry.last_row))
+        undo = UndoRecord(move, piece, captured_kings, promoted, self.white_count,
+                          self.black_count, self.winner, self.zobrist, self.score,
+                          self.square, self.previous_square, self.quiet)
+
+        bitboard.clear(source)
+        bitboard.put(dest, piece)
+        for cap in captured:
+            self._remove(cap)
+
+        final_piece = piece + 2 if promoted else piece
+        keys = geometry.zobrist
+        self.zobrist ^= keys[piece][source] ^ keys[final_piece][dest]
+        self.score += self.weights[final_piece][dest] - self.weights[piece][source]
+
+        self.square = geometry.square(dest)
+        self.previous_square = geometry.square(source)
+
+        if promoted:
+            bitboard.kings |= dest
+        self._grid = None
+
+        if captured or piece <= StoneEnum.BLACK.value:
+            self.quiet = 0
+        else:
+            self.quiet += 1
+        # every other ply black is to move
+        key = self.zobrist ^ geometry.side_key if len(self.history) % 2 else self.zobrist
+        self.history.append(key)
+        self.seen[key] = self.seen.get(key, 0) + 1
+        return undo
+
+    def unmake_move(self, undo: UndoRecord) -> None:
+        """Take back move applied by make_move or apply_move"""
+        source, dest, captured = undo.move
+        bitboard = self.bitboard
+        bitboard.clear(dest)
+        bitboard.put(source, undo.piece)
+        captured_mask = 0
+        for cap in captured:
+            captured_mask |= cap
+        if bitboard.white & source:
+            bitboard.black |= captured_mask
+        else:
+            bitboard.white |= captured_mask
+        bitboard.kings |= undo.captured_kings
+
+        self.white_count = undo.white_count
+        self.black_count = undo.black_count
+        self.winner = undo.winner
+        self.zobrist = undo.zobrist
+        self.score = undo.score
+        self.square = undo.square
+        self.previous_square = undo.previous_square
+        self._grid = None
+
+        key = self.history.pop()
+        count = self.seen[key] - 1
+        if count:
+            self.seen[key] = count
+        else:
+            del self.seen[key]
+        self.quiet = undo.quiet
 
-        self.remove_captured(captured_pieces)
+    def get_moves(self, color):
+        """Get valid moves for given player color as flat list of bit masks moves"""
+        return [(piece, dest, captured)
+                for piece, moves in self.bitboard.generate_moves(color).items()
+                for dest, captured in moves]
 
-        self.square = (new_row, new_col)
-        self.previous_square = (row, col)
+    def has_captures(self, color) -> bool:
+        """Check if given player color has to capture, cheaper than get_moves"""
+        return self.bitboard.can_capture(color)
 
-        if self.get_piece(new_row, new_col) == StoneEnum.WHITE.value and new_row == 0:
-            self.grid[new_row, new_col] += 2  # promote white
-        if self.get_piece(new_row, new_col) == StoneEnum.BLACK.value and new_row == self.rows - 1:
-            self.grid[new_row, new_col] += 2
+    def move_to_squares(self, move):
+        """Convert bit masks move to (piece, dest, captured_pieces) squares"""
+        square = self.bitboard.geometry.square
+        source, dest, captured = move
+        return square(source), square(dest), [square(cap) for cap in captured]
 
     def remove_captured(self, captured_pieces):
         """Remove given pieces from board"""
@@ -143,15 +243,24 @@ class Board:
 
     def remove_piece(self, row: int, col: int) -> None:
         """Remove piece from given position"""
-        if self.grid[row, col] in (StoneEnum.WHITE.value, StoneEnum.WHITE_KING.value):
+        self._remove(self.bitboard.geometry.mask(row, col))
+
+    def _remove(self, mask: int) -> None:
+        """Remove piece from given square mask"""
+        piece = self.bitboard.piece(mask)
+        if piece:
+            self.zobrist ^= self.bitboard.geometry.zobrist[piece][mask]
+            self.score -= self.weights[piece][mask]
+        if self.bitboard.white & mask:
             self.white_count -= 1
             if self.white_count == 0:
                 self.winner = StoneEnum.BLACK.value
-        elif self.grid[row, col] in (StoneEnum.BLACK.value, StoneEnum.BLACK_KING.value):
+        elif self.bitboard.black & mask:
             self.black_count -= 1
             if self.black_count == 0:
                 self.winner = StoneEnum.WHITE.value
-        self.grid[row, col] = 0
+        self.bitboard.clear(mask)
+        self._grid = None
 
     def get_dirs(self, color):
         """Get movable directions for given piece color"""
@@ -178,77 +287,36 @@ class Board:
     def get_valid_moves_all_pieces(self, color):
         """Get valid moves for given player color"""
         assert color in (StoneEnum.WHITE.value, StoneEnum.BLACK.value)
-
-        all_valid_moves = {}
-        max_captures = 0
-        pieces = np.argwhere(self.grid == color)
-        pieces = list(map(tuple, pieces))
-
-        for piece in pieces:
-            valid_moves = self.get_valid_moves(*piece, color)
-            if len(valid_moves) > 0 and len(valid_moves[0][1]) > max_captures:
-                all_valid_moves.clear()
-                max_captures = len(valid_moves[0][1])
-            if len(valid_moves) > 0 and len(valid_moves[0][1]) >= max_captures:
-                all_valid_moves[piece] = valid_moves
-
-        king_color = color + 2
-        king_pieces = np.argwhere(self.grid == king_color)
-        king_pieces = list(map(tuple, king_pieces))
-        for king_piece in king_pieces:
-            king_valid_moves = self.get_valid_moves(*king_piece, king_color)
-            if len(king_valid_moves) > 0 and len(king_valid_moves[0][1]) > max_captures:
-                all_valid_moves.clear()
-                max_captures = len(king_valid_moves[0][1])
-
-            if len(king_valid_moves) > 0 and len(king_valid_moves[0][1]) >= max_captures:
-                all_valid_moves[king_piece] = king_valid_moves
-        return all_valid_moves
+        return {self.bitboard.geometry.square(piece): self.to_squares(moves)
+                for piece, moves in self.bitboard.generate_moves(color).items()}
 
     def get_valid_moves(self, row: int, col: int, piece_type: int,
-                         has_captured=False, captured_pieces=None):
-        # pylint: disable=too-many-arguments, too-many-branches
+                        has_captured=False, captured_pieces=None):
+        # pylint: disable=too-many-arguments
         """Get all valid moves for given piece"""
-        if captured_pieces is None:
-            captured_pieces = []
-
-        valid_moves = []
-
-        dirs = self.get_dirs(piece_type)
-        if not has_captured:  # just move
-            for (dir_row, dir_col) in dirs:
-                if not self.valid_square(row + dir_row, col + dir_col):
-                    continue
-                if self.grid[row + dir_row, col + dir_col] == 0:
-                    valid_moves.append(
-                        ((row + dir_row, col + dir_col), deepcopy(captured_pieces)))
-        # try to capture
-        for (dir_row, dir_col) in dirs:
-            if not self.valid_square(row + 2*dir_row, col + 2*dir_col):
-                continue
-            # capturing an opponent piece and landing on empty square
-            if (self.is_opponent(piece_type, self.grid[row + dir_row, col + dir_col]) and
-                    self.grid[row + 2*dir_row, col + 2*dir_col] == 0):
-                # has already captured the piece
-                if (row + dir_row, col + dir_col) in captured_pieces:
-                    continue
-                captured_pieces.append((row + dir_row, col + dir_col))
-                # want moves with more captures
-                if len(valid_moves) > 0 and len(captured_pieces) > len(valid_moves[-1][1]):
-                    valid_moves.clear()
-
-                # append only moves with as many captures
-                if len(valid_moves) == 0 or len(captured_pieces) >= len(valid_moves[-1][1]):
-                    valid_moves.append(
-                        ((row + 2*dir_row, col + 2*dir_col), deepcopy(captured_pieces)))
-
-                longer_valid_moves = self.get_valid_moves(  # run it recursively
-                    row + 2*dir_row, col + 2*dir_col, piece_type, True, deepcopy(captured_pieces))
-                if len(longer_valid_moves) > 0:
-                    if len(longer_valid_moves[-1][1]) > len(valid_moves[-1][1]):
-                        valid_moves = longer_valid_moves
-                    elif len(longer_valid_moves[-1][1]) == len(valid_moves[-1][1]):
-                        valid_moves.extend(longer_valid_moves)
-                captured_pieces.pop()
-
-        return valid_moves
+        geometry = self.bitboard.geometry
+        captured = tuple(geometry.mask(*cap) for cap in captured_pieces or ())
+        moves = self.bitboard.piece_moves(geometry.mask(row, col), piece_type, captured)
+        if has_captured:
+            moves = [move for move in moves if move[1]]
+        return self.to_squares(moves)
+
+    def to_squares(self, moves):
+        """Convert moves from bit masks to (row, col) squares"""
+        square = self.bitboard.geometry.square
+        return [(square(dest), [square(cap) for cap in captured])
+                for dest, captured in moves]
+
+
+def board_from_rows(rows) -> Board:
+    """Build board from strings of '.', 'w', 'b', 'W' (white king), 'B' (black king)"""
+    board = Board(len(rows), len(rows[0]))
+    board.grid = [[PIECES[char] for char in row] for row in rows]
+    return board
+
+
+def opponent(color: int) -> int:
+    """Get color of the other player"""
+    if color == StoneEnum.WHITE.value:
+        return StoneEnum.BLACK.value
+    return StoneEnum.WHITE.value
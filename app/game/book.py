@@ -0,0 +1,119 @@
+"""Opening book file: hashed binary table of book moves read through mmap
+
+The file is an open addressing hash table keyed by zobrist hash with side
+to move, see game.book_builder for how it is built. Moves are stored as
+source and destination squares with a hash of the captured squares and
+are matched against the legal moves on lookup, so they do not depend on
+the order of move generation.
+"""
+import mmap
+import struct
+import zlib
+from functools import lru_cache
+from game.board import Board
+from game.config import StoneEnum
+
+MAGIC = b'CKOB'
+VERSION = 2
+HEADER = struct.Struct('<4sHBBII')  # magic, version, rows, cols, slots, entries
+# key, score for side to move, source and destination bit, captured hash, weight
+ENTRY = struct.Struct('<QhBBIB')
+EMPTY = 0  # key of unused slot
+MAX_SCORE = 2**15 - 1  # scores are stored as int16
+
+
+def position_key(board: Board, color: int) -> int:
+    """Zobrist hash of board with side to move, never EMPTY"""
+    key = board.zobrist
+    if color == StoneEnum.BLACK.value:
+        key ^= board.bitboard.geometry.side_key
+    return key or 1
+
+
+def move_fields(move) -> tuple:
+    """Source and destination bit indices and hash of captured squares of bit move"""
+    source, dest, captured = move
+    return (source.bit_length() - 1, dest.bit_length() - 1,
+            zlib.crc32(bytes(sorted(cap.bit_length() - 1 for cap in captured))))
+
+
+def write(path: str, book: dict, rows: int = 8, cols: int = 8) -> None:
+    """Write book {key: [(bit move, score, weight)]} as open addressing hash table
+
+    The load factor of the table is at most 1/2.
+    """
+    entries = sum(len(moves) for moves in book.values())
+    slots = 1 << max(4, (2 * entries).bit_length())
+    table = [None] * slots
+    for key, moves in book.items():
+        slot = key % slots
+        for move, score, weight in moves:
+            while table[slot] is not None:
+                slot = (slot + 1) % slots
+            table[slot] = ENTRY.pack(key, score, *move_fields(move), min(weight, 255))
+    empty = ENTRY.pack(EMPTY, 0, 0, 0, 0, 0)
+    with open(path, 'wb') as file:
+        file.write(HEADER.pack(MAGIC, VERSION, rows, cols, slots, entries))
+        file.write(b''.join(entry or empty for entry in table))
+
+
+class OpeningBook:
+    """Read-only memory-mapped opening book file"""
+
+    def __init__(self, path: str) -> None:
+        with open(path, 'rb') as file:
+            self.data = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, self.rows, self.cols, self.slots, self.entries = \
+            HEADER.unpack_from(self.data)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f'{path} is not an opening book file of version {VERSION}')
+        if len(self.data) != HEADER.size + self.slots * ENTRY.size:
+            raise ValueError(f'{path} is truncated')
+
+    def close(self) -> None:
+        """Unmap the file"""
+        self.data.close()
+
+    def lookup(self, board: Board, color: int) -> list:
+        """Get book moves of position as [(bit move, score, weight)], empty if not in book
+
+        Stored moves that are not legal in the position are left out.
+        """
+        if (board.rows, board.cols) != (self.rows, self.cols):
+            return []
+        key = position_key(board, color)
+        slot = key % self.slots
+        found = []
+        while True:
+            entry_key, score, source, dest, captured, weight = ENTRY.unpack_from(
+                self.data, HEADER.size + slot * ENTRY.size)
+            if entry_key == EMPTY:
+                break
+            if entry_key == key:
+                found.append(((source, dest, captured), score, weight))
+            slot = (slot + 1) % self.slots
+        if not found:
+            return []
+        legal = {move_fields(move): move for move in board.get_moves(color)}
+        return [(legal[fields], score, weight) for fields, score, weight in found
+                if fields in legal]
+
+    def choose(self, board: Board, color: int, rng=None):
+        """Get book move of position, None if not in book
+
+        Without `rng` the best scored move is returned, otherwise a move
+        drawn with probability proportional to its weight.
+        """
+        found = self.lookup(board, color)
+        if not found:
+            return None
+        if rng is None:
+            return max(found, key=lambda entry: entry[1])[0]
+        moves = [move for move, _, _ in found]
+        return rng.choices(moves, weights=[weight for _, _, weight in found])[0]
+
+
+@lru_cache(maxsize=None)
+def open_book(path: str) -> OpeningBook:
+    """Shared opening book for given file"""
+    return OpeningBook(path)
@@ -0,0 +1,110 @@
+"""Opening book builder
+
+python -m game.book_builder OUTPUT [--plies N] [--depth D] [--margin M] [--workers W]
+
+Run from the app directory (or with PYTHONPATH=app). Every position
+reachable in the first N plies through book moves is searched to depth D
+move by move; moves within M points of the best one are stored with a
+weight falling with their distance from the best score.
+"""
+import argparse
+import math
+from concurrent.futures import ProcessPoolExecutor
+from game.ai import AI
+from game.board import Board
+from game.book import MAX_SCORE
+from game.book import position_key
+from game.book import write
+from game.config import AIConstants
+from game.config import BookConstants
+from game.config import StoneEnum
+from game.position import Position
+
+
+def score_moves(position: Position, depth: int) -> list:
+    """Search every move of position to depth, get scores for the side to move"""
+    board = position.to_board()
+    maximizing = position.turn == StoneEnum.WHITE.value
+    epic_ai = AI(position.turn, BookConstants.TT_SIZE_MB)
+    epic_ai.root_depth = depth
+    scores = []
+    for move in board.get_moves(position.turn):
+        undo = board.make_move(move)
+        score = epic_ai.minimax(board, depth - 1, not maximizing, -math.inf, math.inf)[0]
+        board.unmake_move(undo)
+        score = score if maximizing else -score
+        scores.append(int(max(-MAX_SCORE, min(MAX_SCORE, score))))
+    return scores
+
+
+def book_moves(scores: list, margin: int) -> list:
+    """Get (move index, score, weight) of moves within margin of the best score"""
+    best = max(scores)
+    return [(index, score, margin + 1 - (best - score))
+            for index, score in enumerate(scores) if best - score <= margin]
+
+
+def build(plies: int = BookConstants.PLIES, depth: int = BookConstants.DEPTH,
+          margin: int = BookConstants.MARGIN, workers: int = None,
+          rows: int = 8, cols: int = 8, progress=None) -> dict:
+    # pylint: disable=too-many-arguments, too-many-locals
+    """Search book positions ply by ply, get {key: [(bit move, score, weight)]}
+
+    `workers=1` searches in this process.
+    """
+    book = {}
+    frontier = {Position.from_board(Board(rows, cols), StoneEnum.WHITE.value)}
+    executor = ProcessPoolExecutor(max_workers=workers) if workers != 1 else None
+    try:
+        for ply in range(plies):
+            positions = sorted(frontier, key=Position.astuple)
+            if executor is None:
+                results = [score_moves(position, depth) for position in positions]
+            else:
+                results = list(executor.map(score_moves, positions, [depth] * len(positions)))
+            frontier = set()
+            for position, scores in zip(positions, results):
+                if not scores:
+                    continue
+                board = position.to_board()
+                moves = board.get_moves(position.turn)
+                entries = [(moves[index], score, weight)
+                           for index, score, weight in book_moves(scores, margin)]
+                book[position_key(board, position.turn)] = entries
+                opponent = StoneEnum.BLACK.value if position.turn == StoneEnum.WHITE.value \
+                    else StoneEnum.WHITE.value
+                for move, _, _ in entries:
+                    undo = board.make_move(move)
+                    if board.winner is None:
+                        frontier.add(Position.from_board(board, opponent))
+                    board.unmake_move(undo)
+            if progress is not None:
+                progress(ply, len(positions))
+    finally:
+        if executor is not None:
+            executor.shutdown()
+    return book
+
+
+def main(argv=None):
+    """Build opening book file and print its size"""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('output')
+    parser.add_argument('--plies', type=int, default=BookConstants.PLIES)
+    parser.add_argument('--depth', type=int, default=BookConstants.DEPTH)
+    parser.add_argument('--margin', type=int, default=BookConstants.MARGIN)
+    parser.add_argument('--workers', type=int, default=AIConstants.WORKERS,
+                        help='processes searching positions, default one per CPU')
+    args = parser.parse_args(argv)
+
+    def progress(ply, positions):
+        print(f'ply {ply}: {positions} positions searched', flush=True)
+
+    book = build(args.plies, args.depth, args.margin, args.workers, progress=progress)
+    write(args.output, book)
+    entries = sum(len(moves) for moves in book.values())
+    print(f'{args.output}: {len(book)} positions, {entries} moves')
+
+
+if __name__ == '__main__':
+    main()
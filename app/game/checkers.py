@@ -1,55 +1,51 @@
 "Module representing checkers game interface"
-from copy import deepcopy
-import pygame
 from game.board import Board
 from game.config import SizeConstants as const
 from game.config import StoneEnum
-from game.config import WINNER_FONT
-from game.config import Colors
+from game.position import Position
+
+DRAW = 0  # get_winner result of drawn game
 
 
 class Checkers:
-    """Class representing game of checkers"""
+    """Class representing game of checkers
+
+    Drawing is delegated to `view` (view.game_view.GameView), without a
+    view the game runs headless. Played moves are passed to `recorder`
+    (game.record.GameRecorder) when one is given.
+    """
 
-    def __init__(self, screen) -> None:
-        self.screen = screen
-        self.board = Board(const.ROWS, const.COLS,
-                           const.CELL_SIZE, const.CIRCLE_RADIUS)
+    def __init__(self, view=None, recorder=None) -> None:
+        self.view = view
+        self.recorder = recorder
+        self.board = Board(const.ROWS, const.COLS)
         self.turn = StoneEnum.WHITE.value
 
         self.all_pieces_valid_moves = self.board.get_valid_moves_all_pieces(
             self.turn)
-        # print(str(self.turn) + ': ')
-        # print(self.all_pieces_valid_moves)
-        # print()
         self.selected_piece = None
         self.valid_moves = None
+        self.thinking = False
 
         self.move_count = 0
+        if self.recorder is not None:
+            self.recorder.start(self.board.rows, self.board.cols)
 
     def update_screen(self) -> None:
         """Update game on screen"""
-        self.board.draw_all(self.screen)
-        if self.selected_piece is not None:
-            self.board.highlight(self.screen, *self.selected_piece)
-            self.board.draw_valid_moves(self.screen, self.valid_moves)
-        self.board.draw_pieces(self.screen)
-        pygame.display.update()
+        if self.view:
+            self.view.update(self)
 
     def draw_winner(self, text):
         """Draw Winner name on screen"""
-        draw_text = WINNER_FONT.render('WINNER: ' + text, 1, Colors.BLACK)
-        self.screen.blit(draw_text, (const.WIDTH/2 - draw_text.get_width() /
-                            2, const.HEIGHT/2 - draw_text.get_height()/2))
-        # print(f'WINNER: {text} ')  # MAC
-        # print(f'MOVE COUNT: {self.move_count}')
-        pygame.display.update()
-        pygame.time.delay(5000)
+        if self.view:
+            self.view.draw_winner(text)
 
     def check_winner(self, draw=True) -> None:
-        """Check if winner is to be crowned"""
+        """Check if winner is to be crowned or the game is drawn"""
         winner = self.board.get_winner()
-        if not draw and (winner or len(self.all_pieces_valid_moves) == 0):
+        if not draw and (winner or len(self.all_pieces_valid_moves) == 0 or
+                         self.board.is_draw()):
             return True
         if len(self.all_pieces_valid_moves) == 0:
             if self.on_turn(StoneEnum.BLACK.value):
@@ -58,6 +54,9 @@ class Checkers:
                 self.draw_winner('BLACK')
             return True
         if winner is None:
+            if self.board.is_draw():
+                self.draw_winner('DRAW')
+                return True
             return False
         if winner == StoneEnum.WHITE.value:
             self.draw_winner('WHITE')
@@ -73,9 +72,45 @@ class Checkers:
         col = x_pos // const.CELL_SIZE
         return row, col
 
+    def get_winner(self):
+        """Get color of the winner, DRAW for drawn game, None while the game goes on"""
+        winner = self.board.get_winner()
+        if winner is None and len(self.all_pieces_valid_moves) == 0:
+            if self.on_turn(StoneEnum.BLACK.value):
+                return StoneEnum.WHITE.value
+            return StoneEnum.BLACK.value
+        if winner is None and self.board.is_draw():
+            return DRAW
+        return winner
+
+    def record_move(self, move, stats=None) -> None:
+        """Pass move about to be played to the recorder"""
+        if self.recorder is not None and self.recorder.enabled:
+            self.recorder.add(self, move, stats)
+
+    def finish_record(self):
+        """Pass game to the recorder's writer, unfinished games get result '*'"""
+        if self.recorder is None:
+            return None
+        return self.recorder.finish(self.get_winner())
+
+    def get_position(self) -> Position:
+        """Get current position with side to move"""
+        return Position.from_board(self.board, self.turn)
+
+    def set_position(self, position: Position) -> None:
+        """Continue game from given position without history"""
+        self.board = position.to_board()
+        self.turn = position.turn
+        self.all_pieces_valid_moves = self.board.get_valid_moves_all_pieces(self.turn)
+        self.selected_piece = None
+        self.valid_moves = None
+
     def get_board(self):
-        """Retrieve game board"""
-        return deepcopy(self.board)
+        """Retrieve copy of game board with its history, without rendering state"""
+        board = self.get_position().to_board()
+        board.copy_history(self.board)
+        return board
 
     def find_move(self, row, col):
         """Find move with given target from all valid moves"""
@@ -91,6 +126,7 @@ class Checkers:
             return False
 
         # move piece
+        self.record_move((self.selected_piece, (row, col), captured_pieces))
         self.board.apply_move(*self.selected_piece, row, col, captured_pieces)
 
         self.selected_piece = None
@@ -100,9 +136,6 @@ class Checkers:
         self.change_turn()
         self.all_pieces_valid_moves = self.board.get_valid_moves_all_pieces(
             self.turn)
-        print(str(self.turn) + ': ')
-        print(self.all_pieces_valid_moves)
-        print()
         return True
 
     def process_input(self, pos) -> None:
@@ -143,10 +176,11 @@ class Checkers:
         else:
             self.turn = StoneEnum.WHITE.value
 
-    def ai_move(self, move):
-        """Apply move from AI"""
+    def ai_move(self, move, stats=None):
+        """Apply move from AI, `stats` of its search go to the game record"""
         piece, dest, captured_pieces = move
         assert self.on_turn(self.board.get_piece(*piece))
+        self.record_move(move, stats)
         if self.on_turn(StoneEnum.WHITE.value):
             self.move_count += 1
         self.board.apply_move(*piece, *dest, captured_pieces)
@@ -156,8 +190,4 @@ class Checkers:
         self.change_turn()
         self.all_pieces_valid_moves = self.board.get_valid_moves_all_pieces(
             self.turn)
-        print(str(self.turn) + ': ')
-        print(self.all_pieces_valid_moves)
-        print()
-        pygame.time.delay(100)
         return True
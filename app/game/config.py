@@ -1,6 +1,5 @@
 """Width and height of displayed screen"""
 from enum import Enum
-import pygame
 
 class SizeConstants:
     """Namespace class for constants containing sizes for scalability"""
@@ -12,16 +11,12 @@ class SizeConstants:
     STONE_OFFSET = (CELL_SIZE-STONE_SIZE)//2
     CIRCLE_RADIUS = int(CELL_SIZE * 0.2)
 
-pygame.font.init()
-WINNER_FONT = pygame.font.SysFont('comicsans', 100)
-
-class Menu:
-    "Namespace class for Menu assets"
+class ViewConstants:
+    """Namespace class for window loop constants"""
     # pylint: disable=too-few-public-methods
-    TITLE_FONT = pygame.font.Font("app/assets/PressStart2P-Regular.ttf", 65)
-    MENU_FONT = pygame.font.Font(None, 50)
-    BACKGROUND = pygame.transform.scale(
-        pygame.image.load('app/assets/Background.png'), (SizeConstants.WIDTH, SizeConstants.HEIGHT))
+    FPS = 40  # frame rate cap of the window loop
+    FRAME_REPORT = False  # log frame time and CPU share of the window loop
+    FRAME_REPORT_SECONDS = 5.0  # seconds between frame time reports
 
 class Colors:
     "Namespace class for colors"
@@ -41,23 +36,77 @@ class StoneEnum(Enum):
     WHITE_KING = 3
     BLACK_KING = 4
 
-class StoneImages:
-    "Namespace class for stone images"
-    # pylint: disable=too-few-public-methods
-    size = SizeConstants.STONE_SIZE
-    WHITE_STONE = pygame.transform.scale(
-        pygame.image.load('app/assets/Stone_White.png'), (size, size))
-    WHITE_KING = pygame.transform.scale(
-        pygame.image.load('app/assets/Stone_White_2.png'), (size, size))
-
-    BLACK_STONE = pygame.transform.scale(
-        pygame.image.load('app/assets/Stone_Black.png'), (size, size))
-    BLACK_KING = pygame.transform.scale(
-        pygame.image.load('app/assets/Stone_Black_2.png'), (size, size))
-
 class AIConstants:
     # pylint: disable=too-few-public-methods
     "Namespace class for AI constants"
-    DEPTH = 6
+    DEPTH = 6  # search depth when no budget is given
+    MAX_DEPTH = 40  # iterative deepening limit when searching within a budget
+    TIME_BUDGET = 1.0  # seconds per move
     SEED = 25
-    
\ No newline at end of file
+    TT_SIZE_MB = 32  # memory cap of transposition table, 0 disables it
+    WORKERS = None  # processes of parallel root search in ParallelAI, None for one per CPU
+    BATCH_LEAVES = False  # score leaves of depth 1 nodes with one batch evaluation
+    TABLEBASE = None  # path of endgame tablebase file probed by the search, see game.tablebase
+    TABLEBASE_PIECES = 4  # pieces of generated tablebase
+    BOOK = None  # path of opening book file looked up before searching, see game.book_builder
+    BOOK_RANDOM = False  # pick book moves at random by weight instead of the best one
+    QUIESCENCE = True  # search forced captures past the nominal depth before evaluating
+    QUIESCENCE_NODES = 200_000  # quiescence nodes per move, then leaves are evaluated as they are
+    PVS = True  # search moves after the first with a null window, again only when they improve
+    ASPIRATION_WINDOW = 5  # half width of root window around previous iteration score, 0 disables
+    LMR = False  # search late quiet moves shallower, again at full depth when they beat alpha
+    LMR_DEPTH = 3  # remaining depth from which moves are reduced
+    LMR_MOVES = 3  # moves searched at full depth before reducing
+    LMR_REDUCTION = 1  # plies late moves are reduced by
+    FUTILITY = False  # skip quiet moves near leaves when static eval plus margin cannot reach alpha
+    FUTILITY_MARGINS = (12, 25)  # margins at remaining depth 1, 2, ... in evaluate_board2 points
+    RAZORING = False  # search one ply shallower when static eval is far below alpha
+    RAZOR_DEPTH = 3  # deepest remaining depth that is razored
+    RAZOR_MARGIN = 30  # in evaluate_board2 points
+
+
+class DrawConstants:
+    # pylint: disable=too-few-public-methods
+    "Namespace class for draw rules"
+    REPETITIONS = 3  # game is drawn when a position occurs this many times with the same side to move
+    QUIET_PLIES = 80  # game is drawn after this many plies without capture or man move
+
+
+class TournamentConstants:
+    # pylint: disable=too-few-public-methods
+    "Namespace class for self-play tournament constants"
+    GAMES = 100
+    OPENING_PLIES = 4  # random plies played from the initial position of every opening
+    MAX_PLIES = 200  # game is adjudicated as draw after this many plies
+    ELO0, ELO1 = 0, 10  # SPRT hypotheses in Elo
+    ALPHA, BETA = 0.05, 0.05  # SPRT error probabilities
+
+
+class BookConstants:
+    # pylint: disable=too-few-public-methods
+    "Namespace class for opening book builder constants"
+    PLIES = 4  # plies from the initial position covered by the book
+    DEPTH = 8  # search depth of every book move
+    MARGIN = 4  # moves scoring at most this much below the best one are kept
+    TT_SIZE_MB = 16  # transposition table of one position search
+
+
+class RecordConstants:
+    # pylint: disable=too-few-public-methods
+    "Namespace class for game records"
+    PATH = None  # PDN file the games played in the window are appended to, None disables it
+    VERBOSITY = 2  # level of game.record.Verbosity: 0 off, 1 moves, 2 times, 3 search info
+    BUFFER_GAMES = 16  # finished games kept in memory before writing them
+
+
+class ServerConstants:
+    # pylint: disable=too-few-public-methods
+    "Namespace class for game server constants"
+    HOST = '127.0.0.1'
+    PORT = 8765
+    WORKERS = None  # processes searching AI moves, None for one per CPU
+    QUEUE_LIMIT = 256  # AI moves waiting for a worker, further moves are refused as overloaded
+    CLIENT_REQUESTS = 32  # unanswered requests of one connection before its input is not read
+    TIME_BUDGET = 0.1  # default seconds per AI move of a session
+    MAX_TIME = 2.0  # longest time per AI move a session may ask for
+    LATENCY_SAMPLES = 10000  # recent AI moves latency percentiles are computed from
@@ -0,0 +1,248 @@
+"""Engine process speaking a line based text protocol on stdin and stdout
+
+python -m game.engine
+
+One game and one AI live for the whole process, so the transposition
+table, move ordering history, tablebase and opening book stay warm between
+searches. Moves are written in PDN square numbers (`11-15`, `22x15`) and
+positions in PDN FEN (`W:W21,22,K30:B1,2`), see game.record. Commands:
+
+    newgame                          initial position, search state cleared
+    position startpos [moves M ...]  initial position and moves played from it
+    position fen FEN [moves M ...]   position from FEN and moves played from it
+    moves M ...                      play moves in the current position
+    go [depth N] [time S] [nodes N]  search in background, without limits
+                                     for AIConstants.TIME_BUDGET seconds
+    stop                             end search early, its move is still sent
+    isready                          answered with readyok
+    fen                              send the current position
+    quit                             stop search and exit, at end of input
+                                     the search is finished first
+
+A search sends `info depth D score S nodes N time MS nps NPS pv M ...`
+after every completed iteration, score from the side to move, and ends
+with `bestmove M`, or `bestmove none` without legal moves. Invalid
+commands are answered with `error ...` and change nothing.
+"""
+import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from game.ai import AI
+from game.board import opponent
+from game.checkers import Checkers
+from game.config import AIConstants
+from game.config import StoneEnum
+from game.ordering import MoveOrderer
+from game.record import move_text
+from game.record import parse_fen
+from game.record import parse_move
+from game.record import position_fen
+from game.stats import NullSink
+
+GO_LIMITS = {'depth': int, 'time': float, 'nodes': int}
+
+
+def pv_text(board, color: int, pv) -> list:
+    """Write squares moves played one after another from board in PDN, board is left unchanged"""
+    texts, undos = [], []
+    for piece, dest, captured_pieces in pv:
+        texts.append(move_text(board.cols, (piece, dest, captured_pieces),
+                               board.get_valid_moves_all_pieces(color)))
+        undos.append(board.apply_move(*piece, *dest, captured_pieces))
+        color = opponent(color)
+    for undo in reversed(undos):
+        board.unmake_move(undo)
+    return texts
+
+
+class InfoSink(NullSink):
+    """Sends info line of every completed iteration of the engine search"""
+
+    def __init__(self, engine: 'Engine') -> None:
+        self.engine = engine
+
+    def iteration(self, stats) -> None:
+        """Send info line"""
+        self.engine.send_info(stats)
+
+
+class Engine:
+    """Runs protocol commands against one game and one warm AI
+
+    Searches run in a background thread, so `stop` and other commands are
+    read while searching. Lines are written to `output` whole and flushed.
+    """
+
+    def __init__(self, output=None, epic_ai: AI = None) -> None:
+        self.output = output if output is not None else sys.stdout
+        self.lock = threading.Lock()
+        self.ai = epic_ai if epic_ai is not None else AI(StoneEnum.WHITE.value)
+        self.ai.sink = InfoSink(self)
+        self.checkers = Checkers()
+        self.executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='engine')
+        self.future = None
+        self.search_board = None
+        self.commands = {'newgame': self.newgame, 'position': self.position,
+                         'moves': self.moves, 'go': self.go, 'stop': self.stop,
+                         'isready': self.isready, 'fen': self.fen}
+
+    def send(self, line: str) -> None:
+        """Write one line of output"""
+        with self.lock:
+            self.output.write(line + '\n')
+            self.output.flush()
+
+    def handle(self, line: str) -> bool:
+        """Run one command line, False after quit"""
+        words = line.split()
+        if not words:
+            return True
+        if words[0] == 'quit':
+            return False
+        command = self.commands.get(words[0])
+        if command is None:
+            self.send(f'error unknown command {words[0]}')
+            return True
+        try:
+            command(words[1:])
+        except ValueError as error:
+            self.send(f'error {error}')
+        return True
+
+    def busy(self) -> bool:
+        """Check if search is running"""
+        return self.future is not None and not self.future.done()
+
+    def check_idle(self) -> None:
+        """Refuse to change the game during a search"""
+        if self.busy():
+            raise ValueError('search in progress, send stop first')
+
+    def newgame(self, args) -> None:
+        """Start new game and forget everything learned by the search"""
+        self.check_idle()
+        self.position(['startpos'])
+        if self.ai.table is not None:
+            self.ai.table.clear()
+        self.ai.ordering = MoveOrderer()
+
+    def position(self, args) -> None:
+        """Set position from startpos or FEN, then play moves given after `moves`"""
+        self.check_idle()
+        if not args or args[0] not in ('startpos', 'fen'):
+            raise ValueError('position needs startpos or fen')
+        rest = args[1:]
+        checkers = Checkers()
+        if args[0] == 'fen':
+            if not rest:
+                raise ValueError('position fen needs a FEN')
+            board = checkers.board
+            checkers.set_position(parse_fen(rest[0], board.rows, board.cols))
+            rest = rest[1:]
+        if rest and rest[0] != 'moves':
+            raise ValueError(f'unexpected {rest[0]}')
+        self.play(checkers, rest[1:])
+        self.checkers = checkers
+
+    def moves(self, args) -> None:
+        """Play moves in the current position, none of them when one is illegal"""
+        self.check_idle()
+        checkers = Checkers()
+        checkers.set_position(self.checkers.get_position())
+        checkers.board.copy_history(self.checkers.board)
+        self.play(checkers, args)
+        self.checkers = checkers
+
+    @staticmethod
+    def play(checkers: Checkers, texts) -> None:
+        """Play PDN moves in game"""
+        for text in texts:
+            if checkers.get_winner() is not None:
+                raise ValueError(f'game is over before {text}')
+            checkers.ai_move(parse_move(checkers.board.cols, text,
+                                        checkers.all_pieces_valid_moves))
+
+    def go(self, args) -> None:
+        """Start search of the current position with given limits"""
+        self.check_idle()
+        if len(args) % 2:
+            raise ValueError('go limits come in pairs, e.g. depth 6')
+        limits = {}
+        for name, value in zip(args[::2], args[1::2]):
+            if name not in GO_LIMITS:
+                raise ValueError(f'unknown limit {name}')
+            limits[name] = GO_LIMITS[name](value)
+        time_budget = limits.get('time')
+        if not limits:
+            time_budget = AIConstants.TIME_BUDGET
+        board = self.checkers.get_board()
+        self.ai.color = self.checkers.turn
+        self.ai.stop_event = threading.Event()
+        self.search_board = board
+        self.future = self.executor.submit(self.search, board, time_budget,
+                                           limits.get('nodes'), limits.get('depth'))
+
+    def search(self, board, time_budget, node_budget, depth) -> None:
+        """Run search inside the engine thread and send its best move"""
+        try:
+            move = self.ai.get_best_move(board, time_budget, node_budget, depth)
+        except Exception as error:  # pylint: disable=broad-except
+            self.send(f'error search failed: {error!r}')
+            move = None
+        if move is None:
+            self.send('bestmove none')
+        else:
+            self.send('bestmove ' + pv_text(board, self.ai.color, [move])[0])
+
+    def send_info(self, stats) -> None:
+        """Send info line of search iteration"""
+        score = stats.score
+        if self.ai.color == StoneEnum.BLACK.value:
+            score = -score
+        nps = round(stats.nodes / stats.seconds) if stats.seconds else 0
+        line = (f'info depth {stats.depth} score {score} nodes {stats.nodes} '
+                f'time {round(1000 * stats.seconds)} nps {nps}')
+        if stats.pv:
+            line += ' pv ' + ' '.join(pv_text(self.search_board, self.ai.color, stats.pv))
+        self.send(line)
+
+    def stop(self, args=()) -> None:
+        """Stop running search, it still sends its best move"""
+        if self.ai.stop_event is not None:
+            self.ai.stop_event.set()
+
+    def isready(self, args) -> None:
+        """Answer readyok"""
+        self.send('readyok')
+
+    def fen(self, args) -> None:
+        """Send the current position"""
+        self.send('fen ' + position_fen(self.checkers.get_position()))
+
+    def wait(self) -> None:
+        """Wait until running search sends its best move"""
+        if self.future is not None:
+            self.future.result()
+
+    def close(self) -> None:
+        """Stop search and wait for its best move"""
+        self.stop()
+        self.wait()
+        self.executor.shutdown()
+
+
+def main(stdin=None) -> None:
+    """Read commands from stdin until quit or end of input"""
+    engine = Engine()
+    try:
+        for line in stdin if stdin is not None else sys.stdin:
+            if not engine.handle(line):
+                break
+        else:
+            engine.wait()
+    finally:
+        engine.close()
+
+
+if __name__ == "__main__":
+    main()
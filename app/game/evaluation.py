@@ -0,0 +1,45 @@
+"""Module with precomputed evaluation tables"""
+from functools import lru_cache
+from game.bitboard import Geometry
+from game.config import StoneEnum
+
+PIECE_VALUE = {
+    StoneEnum.WHITE.value: 10,
+    StoneEnum.BLACK.value: -10,
+    StoneEnum.WHITE_KING.value: 15,
+    StoneEnum.BLACK_KING.value: -15,
+}
+DRAW_SCORE = 0  # score of positions drawn by repetition or move limit
+WIN_SCORE = 10000
+TABLEBASE_WIN = 5000  # won tablebase position less its distance, above any material score
+
+
+def advancement(rows: int, row: int) -> int:
+    """Bonus of white man in given row, same as white_mask of AI.evaluate_board2"""
+    for i in range(0, rows - 1, 2):
+        if row in (i, i + 1):
+            return rows - i
+    return 0
+
+
+@lru_cache(maxsize=None)
+def weight_table(geometry: Geometry) -> dict:
+    """Score of every piece on every square as {piece: {square mask: score}}"""
+    rows = geometry.rows
+    table = {piece: {} for piece in PIECE_VALUE}
+    for (row, _), bit in geometry.bits.items():
+        mask = 1 << bit
+        for piece, value in PIECE_VALUE.items():
+            table[piece][mask] = value
+        table[StoneEnum.WHITE.value][mask] += advancement(rows, row)
+        table[StoneEnum.BLACK.value][mask] -= advancement(rows, rows - 1 - row)
+    return table
+
+
+def winner_sign(white_count: int, black_count: int) -> int:
+    """Same as AI.calc_winner computed from piece counts"""
+    if white_count == 0:
+        return -1
+    if black_count == 0:
+        return 1
+    return 0
@@ -0,0 +1,92 @@
+"""Module with move ordering for AI search"""
+
+
+class OrderingStats:
+    """Counters of searched nodes and beta cutoffs per remaining depth"""
+
+    def __init__(self) -> None:
+        self.nodes = {}
+        self.cutoffs = {}
+        self.first_move_cutoffs = {}
+
+    def first_move_cutoff_rate(self, depth: int) -> float:
+        """Share of cutoffs at given depth caused by the first searched move"""
+        cutoffs = self.cutoffs.get(depth, 0)
+        if cutoffs == 0:
+            return 0.0
+        return self.first_move_cutoffs.get(depth, 0) / cutoffs
+
+    def report(self) -> dict:
+        """Get {depth: (nodes, cutoffs, first move cutoff rate)} from deepest"""
+        return {depth: (self.nodes[depth], self.cutoffs.get(depth, 0),
+                        self.first_move_cutoff_rate(depth))
+                for depth in sorted(self.nodes, reverse=True)}
+
+
+class MoveOrderer:
+    """Orders moves for alpha-beta search
+
+    Hash and principal variation moves go first, then captures (kings
+    captured first, then longer chains), killer moves of the same ply and
+    the remaining quiet moves by history heuristic score. Heuristics can
+    be switched off to measure what they bring.
+    """
+    CAPTURE, KILLER, QUIET = 2, 1, 0
+    KILLER_SLOTS = 2
+
+    def __init__(self, killers: bool = True, history: bool = True) -> None:
+        self.use_killers = killers
+        self.use_history = history
+        self.killers = {}
+        self.history = {}
+        self.stats = OrderingStats()
+
+    def new_search(self) -> None:
+        """Forget killers and age history before searching a new position"""
+        self.killers.clear()
+        self.history = {move: score // 2 for move, score in self.history.items() if score > 1}
+        self.stats = OrderingStats()
+
+    def order(self, moves, ply: int, depth: int, kings: int, first_moves=()):
+        # pylint: disable=too-many-arguments
+        """Sort moves in place from most to least promising
+
+        `first_moves` (e.g. PV move, hash move) are put in front in the given
+        order, `kings` is the mask of kings on the board.
+        """
+        self.stats.nodes[depth] = self.stats.nodes.get(depth, 0) + 1
+        killers = self.killers.get(ply, ()) if self.use_killers else ()
+        history = self.history if self.use_history else {}
+
+        def key(move):
+            source, dest, captured = move
+            if captured:
+                captured_kings = sum(1 for cap in captured if cap & kings)
+                return self.CAPTURE, captured_kings, len(captured)
+            if move in killers:
+                return self.KILLER, -killers.index(move), 0
+            return self.QUIET, history.get((source, dest), 0), 0
+
+        moves.sort(key=key, reverse=True)
+        for move in reversed([move for move in first_moves if move is not None]):
+            if move in moves:
+                moves.remove(move)
+                moves.insert(0, move)
+        return moves
+
+    def cutoff(self, move, ply: int, depth: int, index: int) -> None:
+        """Record that move searched as index-th caused a beta cutoff"""
+        stats = self.stats
+        stats.cutoffs[depth] = stats.cutoffs.get(depth, 0) + 1
+        if index == 0:
+            stats.first_move_cutoffs[depth] = stats.first_move_cutoffs.get(depth, 0) + 1
+        source, dest, captured = move
+        if captured:
+            return
+        if self.use_killers:
+            killers = self.killers.setdefault(ply, [])
+            if move not in killers:
+                killers.insert(0, move)
+                del killers[self.KILLER_SLOTS:]
+        if self.use_history:
+            self.history[(source, dest)] = self.history.get((source, dest), 0) + depth * depth
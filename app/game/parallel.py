@@ -0,0 +1,129 @@
+"""Module with parallel root search over a pool of worker processes"""
+import math
+import time
+from concurrent.futures import ProcessPoolExecutor
+from game.ai import AI
+from game.ai import SearchAborted
+from game.board import Board
+from game.config import AIConstants
+from game.config import StoneEnum
+from game.position import Position
+
+_worker_ai = None
+
+
+def init_worker(table_size_mb: float) -> None:
+    """Create search state kept by worker process between tasks"""
+    global _worker_ai  # pylint: disable=global-statement
+    _worker_ai = AI(StoneEnum.WHITE.value, table_size_mb)
+
+
+def worker_ai() -> AI:
+    """Search state of this worker process created by init_worker"""
+    return _worker_ai
+
+
+def search_move(position, history, quiet, move, depth, maximizing_player, window, time_left,
+                node_limit):
+    # pylint: disable=too-many-arguments
+    """Search position with game history after given root move inside worker process
+
+    Returns (score, principal variation after the move, nodes searched),
+    score is None when the budget ran out.
+    """
+    board = position.to_board()
+    board.set_history(history, quiet)
+    epic_ai = _worker_ai
+    epic_ai.nodes = 0
+    epic_ai.qnodes = 0
+    epic_ai.deadline = None if time_left is None else time.perf_counter() + time_left
+    epic_ai.node_limit = node_limit
+    epic_ai.root_depth = depth
+    epic_ai.follow_pv = False
+    board.make_move(move)
+    try:
+        score = epic_ai.minimax(board, depth - 1, not maximizing_player, *window)[0]
+    except SearchAborted:
+        return None, [], epic_ai.nodes
+    return score, epic_ai.pv_lines.get(depth - 1, []), epic_ai.nodes
+
+
+class ParallelAI(AI):
+    """AI splitting root moves between long-lived worker processes
+
+    The first root move is searched alone to get a bound, the remaining
+    ones in parallel with that bound (young brothers wait). Workers keep
+    their transposition tables between moves and receive positions as
+    Position values. Use as context manager or call close().
+    """
+
+    def __init__(self, color: int, table_size_mb: float = AIConstants.TT_SIZE_MB,
+                 workers: int = AIConstants.WORKERS) -> None:
+        super().__init__(color, table_size_mb)
+        self.table_size_mb = table_size_mb
+        self.workers = workers
+        self.executor = None
+
+    def start(self) -> ProcessPoolExecutor:
+        """Start worker processes if not running yet"""
+        if self.executor is None:
+            self.executor = ProcessPoolExecutor(self.workers, initializer=init_worker,
+                                                initargs=(self.table_size_mb,))
+        return self.executor
+
+    def close(self) -> None:
+        """Stop worker processes"""
+        if self.executor is not None:
+            self.executor.shutdown(cancel_futures=True)
+            self.executor = None
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def search_root(self, board: Board, depth: int, maximizing_player: bool):
+        """Search one iteration with root moves split between workers"""
+        executor = self.start()
+        if board.white_count == 0 or board.black_count == 0:
+            return self.evaluate_position(board), ()
+        color = StoneEnum.WHITE.value if maximizing_player else StoneEnum.BLACK.value
+        pv_move = self.pv[0] if self.pv else None
+        moves = self.ordering.order(board.get_moves(color), 0, depth,
+                                    board.bitboard.kings, (pv_move,))
+        if not moves:
+            return (-math.inf if maximizing_player else math.inf), None
+        position = Position.from_board(board, color)
+
+        def submit(move, window):
+            time_left = None
+            if self.deadline is not None:
+                time_left = self.deadline - time.perf_counter()
+            node_limit = None
+            if self.node_limit is not None:
+                node_limit = max(0, self.node_limit - self.nodes)
+            return executor.submit(search_move, position, board.history, board.quiet, move,
+                                   depth, maximizing_player, window, time_left, node_limit)
+
+        results = [submit(moves[0], (-math.inf, math.inf)).result()]
+        self.nodes += results[0][2]
+        if results[0][0] is None:
+            raise SearchAborted
+        if maximizing_player:
+            window = results[0][0], math.inf
+        else:
+            window = -math.inf, results[0][0]
+        futures = [submit(move, window) for move in moves[1:]]
+        results += [future.result() for future in futures]
+        self.nodes += sum(nodes for _, _, nodes in results[1:])
+        if any(score is None for score, _, _ in results):
+            raise SearchAborted
+
+        best_eval, best_move, best_pv = results[0][0], moves[0], results[0][1]
+        for move, (score, pv_line, _) in zip(moves[1:], results[1:]):
+            if (score > best_eval) if maximizing_player else (score < best_eval):
+                best_eval, best_move, best_pv = score, move, pv_line
+        self.pv_lines[depth] = [best_move] + best_pv
+        return best_eval, best_move
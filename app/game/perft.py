@@ -0,0 +1,147 @@
+"""Perft: count leaf nodes of the move tree to verify and time move generation
+
+python -m game.perft [depth] [--divide] [--squares]
+
+Run from the app directory (or with PYTHONPATH=app). Without --divide
+every reference position is counted up to `depth` and compared with the
+known node counts, --squares uses Board.get_valid_moves_all_pieces and
+apply_move instead of the bit move generator.
+"""
+import argparse
+import time
+from game.board import Board
+from game.board import board_from_rows
+from game.board import opponent
+from game.config import StoneEnum
+
+# leaf nodes of the initial 8x8 position, white to move; the longest capture
+# chain is mandatory here, so from depth 6 on the numbers differ from the
+# published English draughts ones
+START_COUNTS = {1: 7, 2: 49, 3: 302, 4: 1469, 5: 7361, 6: 36473, 7: 177532, 8: 828783}
+
+# name: (rows, color to move, {depth: leaf nodes})
+TRICKY = {
+    'king multi-jump': ((
+        '........',
+        '..b.b...',
+        '........',
+        '..b.b...',
+        '...W....',
+        '........',
+        '........',
+        '......b.',
+    ), StoneEnum.WHITE.value,
+        {1: 2, 2: 4, 3: 16, 4: 32, 5: 112, 6: 212, 7: 686, 8: 1085}),
+    'max capture rule': ((
+        '........',
+        '......b.',
+        '........',
+        '..b.b...',
+        '.w.....w',
+        '........',
+        '.....b..',
+        '........',
+    ), StoneEnum.WHITE.value,
+        {1: 1, 2: 6, 3: 18, 4: 94, 5: 280, 6: 1379, 7: 3867, 8: 18862}),
+    'promotion on capture': ((
+        '........',
+        '..b.....',
+        '...w....',
+        '........',
+        '.....b..',
+        '..B.....',
+        '...w.w..',
+        '........',
+    ), StoneEnum.WHITE.value,
+        {1: 2, 2: 2, 3: 6, 4: 16, 5: 39, 6: 156, 7: 427, 8: 1660}),
+    'kings crossing': ((
+        '.B......',
+        '....b...',
+        '.....w..',
+        '..b.....',
+        '........',
+        '..w.b...',
+        '.W......',
+        '........',
+    ), StoneEnum.BLACK.value,
+        {1: 1, 2: 5, 3: 32, 4: 82, 5: 411, 6: 1239, 7: 6733, 8: 22032}),
+}
+
+
+def perft(board: Board, depth: int, color: int, squares: bool = False) -> int:
+    """Count positions reached after exactly `depth` plies, board is left unchanged"""
+    if depth == 0:
+        return 1
+    if squares:
+        nodes = 0
+        for piece, moves in board.get_valid_moves_all_pieces(color).items():
+            for dest, captured_pieces in moves:
+                undo = board.apply_move(*piece, *dest, captured_pieces)
+                nodes += perft(board, depth - 1, opponent(color), squares)
+                board.unmake_move(undo)
+        return nodes
+    moves = board.get_moves(color)
+    if depth == 1:
+        return len(moves)
+    nodes = 0
+    for move in moves:
+        undo = board.make_move(move)
+        nodes += perft(board, depth - 1, opponent(color))
+        board.unmake_move(undo)
+    return nodes
+
+
+def divide(board: Board, depth: int, color: int, squares: bool = False) -> dict:
+    """Get perft of depth - 1 after every move as {(piece, dest, captured): nodes}"""
+    result = {}
+    for move in board.get_moves(color):
+        undo = board.make_move(move)
+        piece, dest, captured = board.move_to_squares(move)
+        result[(piece, dest, tuple(captured))] = perft(board, depth - 1, opponent(color), squares)
+        board.unmake_move(undo)
+    return result
+
+
+def positions() -> dict:
+    """Get reference positions as {name: (board, color, {depth: nodes})}"""
+    result = {'start': (Board(8, 8), StoneEnum.WHITE.value, START_COUNTS)}
+    for name, (rows, color, counts) in TRICKY.items():
+        result[name] = (board_from_rows(rows), color, counts)
+    return result
+
+
+def main(argv=None):
+    """Run perft of reference positions and print node counts and speed"""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('depth', type=int, nargs='?', default=6)
+    parser.add_argument('--divide', action='store_true',
+                        help='node counts per move of the initial position')
+    parser.add_argument('--squares', action='store_true',
+                        help='use get_valid_moves_all_pieces instead of bit moves')
+    args = parser.parse_args(argv)
+
+    if args.divide:
+        counts = divide(Board(8, 8), args.depth, StoneEnum.WHITE.value, args.squares)
+        for (piece, dest, captured), nodes in counts.items():
+            print(f'{piece} -> {dest} {list(captured)}: {nodes}')
+        print(f'total: {sum(counts.values())}')
+        return
+
+    print(f'{"position":<22} {"depth":>5} {"nodes":>10} {"seconds":>8} {"nodes/s":>10}  check')
+    failed = False
+    for name, (board, color, counts) in positions().items():
+        for depth in range(1, args.depth + 1):
+            start = time.perf_counter()
+            nodes = perft(board, depth, color, args.squares)
+            duration = time.perf_counter() - start
+            expected = counts.get(depth)
+            check = '' if expected is None else ('ok' if nodes == expected else f'FAIL {expected}')
+            failed = failed or check.startswith('FAIL')
+            print(f'{name:<22} {depth:>5} {nodes:>10} {duration:>8.3f} '
+                  f'{nodes / max(duration, 1e-9):>10.0f}  {check}')
+    if failed:
+        raise SystemExit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,36 @@
+"""Random games, positions reached by random moves for tests and benchmarks"""
+import random
+from game.board import Board
+
+
+def random_game(rng: random.Random, plies: int, board: Board = None):
+    """Play up to `plies` random moves, yield board with side to move before every move
+
+    The same board is yielded every time, changed by the moves played so
+    far. The game stops early when the side to move has no moves or it
+    is won; the position after the last move is yielded as well.
+    """
+    board = board if board is not None else Board(8, 8, 0, 0)
+    color = 1
+    for _ in range(plies):
+        yield board, color
+        moves = board.get_moves(color)
+        if not moves or board.winner is not None:
+            return
+        board.make_move(rng.choice(moves))
+        color = 3 - color
+    yield board, color
+
+
+def random_position(rng: random.Random, plies=(10, 40)):
+    """Board and side to move after a random number of random moves"""
+    board, color = None, None
+    for board, color in random_game(rng, rng.randint(*plies)):
+        pass
+    return board, color
+
+
+def random_boards(seed: int, count: int, plies=(0, 120)) -> list:
+    """Boards reached in `count` random games"""
+    rng = random.Random(seed)
+    return [random_position(rng, plies)[0] for _ in range(count)]
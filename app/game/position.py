@@ -0,0 +1,80 @@
+"""Module with compact immutable position value type"""
+from game.bitboard import BitBoard
+from game.bitboard import get_geometry
+from game.board import Board
+from game.config import StoneEnum
+
+
+class Position:
+    """Hashable position: board size, piece masks and side to move
+
+    Cheap to copy (copies are the same object), to pickle and to use as
+    dict key. Converts to and from Board, which holds the search and
+    rendering state.
+    """
+    __slots__ = ('rows', 'cols', 'white', 'black', 'kings', 'turn')
+
+    def __init__(self, rows: int, cols: int, white: int, black: int, kings: int,
+                 turn: int = StoneEnum.WHITE.value) -> None:
+        # pylint: disable=too-many-arguments
+        setter = object.__setattr__
+        setter(self, 'rows', rows)
+        setter(self, 'cols', cols)
+        setter(self, 'white', white)
+        setter(self, 'black', black)
+        setter(self, 'kings', kings)
+        setter(self, 'turn', turn)
+
+    @classmethod
+    def from_board(cls, board: Board, turn: int = StoneEnum.WHITE.value) -> 'Position':
+        """Capture position of board with given side to move"""
+        bitboard = board.bitboard
+        return cls(board.rows, board.cols, bitboard.white, bitboard.black, bitboard.kings, turn)
+
+    def to_board(self) -> Board:
+        """Create board with this position, without rendering state"""
+        board = Board(self.rows, self.cols)
+        bitboard = board.bitboard
+        bitboard.white, bitboard.black, bitboard.kings = self.white, self.black, self.kings
+        board.sync()
+        return board
+
+    def zobrist(self) -> int:
+        """Zobrist hash equal to Board.zobrist, with side key when black is to move"""
+        bitboard = BitBoard(get_geometry(self.rows, self.cols))
+        bitboard.white, bitboard.black, bitboard.kings = self.white, self.black, self.kings
+        board_key = bitboard.zobrist()
+        if self.turn == StoneEnum.BLACK.value:
+            board_key ^= get_geometry(self.rows, self.cols).side_key
+        return board_key
+
+    def astuple(self) -> tuple:
+        """Get fields as (rows, cols, white, black, kings, turn)"""
+        return self.rows, self.cols, self.white, self.black, self.kings, self.turn
+
+    def __setattr__(self, name, value):
+        raise AttributeError(f'{type(self).__name__} is immutable')
+
+    def __delattr__(self, name):
+        raise AttributeError(f'{type(self).__name__} is immutable')
+
+    def __eq__(self, other) -> bool:
+        if not isinstance(other, Position):
+            return NotImplemented
+        return self.astuple() == other.astuple()
+
+    def __hash__(self) -> int:
+        return hash(self.astuple())
+
+    def __repr__(self) -> str:
+        return (f'Position({self.rows}, {self.cols}, {self.white:#x}, {self.black:#x}, '
+                f'{self.kings:#x}, {self.turn})')
+
+    def __reduce__(self):
+        return Position, self.astuple()
+
+    def __copy__(self):
+        return self
+
+    def __deepcopy__(self, memo):
+        return self
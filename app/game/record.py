@@ -0,0 +1,275 @@
+"""Game records in PDN notation and their headless replay
+
+Dark squares are numbered 1, 2, ... row by row from the top left corner,
+a move is written `from-to`, a capture `fromxto`. When two captures of
+one piece end on the same square the landing squares are listed too
+(`fromxlandingxto`). Per move think time and search info go to comments.
+"""
+import re
+import time
+from game.bitboard import get_geometry
+from game.checkers import DRAW
+from game.checkers import Checkers
+from game.config import RecordConstants
+from game.config import StoneEnum
+from game.position import Position
+
+
+class Verbosity:
+    # pylint: disable=too-few-public-methods
+    "Namespace class for levels of game records"
+    OFF = 0  # nothing is recorded
+    MOVES = 1  # moves and result
+    TIMING = 2  # and seconds per move
+    SEARCH = 3  # and score, depth and nodes of AI moves
+
+
+RESULTS = {StoneEnum.WHITE.value: '1-0', StoneEnum.BLACK.value: '0-1', DRAW: '1/2-1/2',
+           None: '*'}
+FEN_COLORS = {StoneEnum.WHITE.value: 'W', StoneEnum.BLACK.value: 'B'}
+FEN = re.compile(r'([WB]):W((?:K?\d+,?)*):B((?:K?\d+,?)*)')
+TAG = re.compile(r'\[(\w+)\s+"([^"]*)"\]')
+TOKEN = re.compile(r'\{[^}]*\}|1-0|0-1|1/2-1/2|\*|\d+\.|\d+(?:[-x]\d+)+')
+
+
+def square_number(cols: int, row: int, col: int) -> int:
+    """PDN number of dark square"""
+    return row * (cols // 2) + col // 2 + 1
+
+
+def number_square(cols: int, number: int) -> tuple:
+    """Dark square (row, col) of PDN number"""
+    row, index = divmod(number - 1, cols // 2)
+    return row, 2 * index + (row + 1) % 2
+
+
+def landing_squares(piece, captured_pieces) -> list:
+    """Squares a capture chain lands on, captured pieces are in jump order"""
+    row, col = piece
+    squares = []
+    for cap_row, cap_col in captured_pieces:
+        row, col = 2 * cap_row - row, 2 * cap_col - col
+        squares.append((row, col))
+    return squares
+
+
+def move_text(cols: int, move, valid_moves: dict) -> str:
+    """Write squares move in PDN, `valid_moves` as from get_valid_moves_all_pieces"""
+    piece, dest, captured_pieces = move
+    if not captured_pieces:
+        return f'{square_number(cols, *piece)}-{square_number(cols, *dest)}'
+    squares = [piece, dest]
+    same_end = [caps for end, caps in valid_moves.get(tuple(piece), ())
+                if tuple(end) == tuple(dest)]
+    if len(same_end) > 1:
+        squares = [piece] + landing_squares(piece, captured_pieces)
+    return 'x'.join(str(square_number(cols, *square)) for square in squares)
+
+
+def parse_move(cols: int, text: str, valid_moves: dict):
+    """Find squares move (piece, dest, captured_pieces) written as PDN in valid moves"""
+    numbers = [int(number) for number in re.split('[-x]', text)]
+    squares = [number_square(cols, number) for number in numbers]
+    piece, dest = squares[0], squares[-1]
+    for end, captured_pieces in valid_moves.get(piece, ()):
+        if tuple(end) != dest or bool(captured_pieces) != ('x' in text):
+            continue
+        if len(squares) > 2 and landing_squares(piece, captured_pieces) != squares[1:]:
+            continue
+        return piece, tuple(end), captured_pieces
+    raise ValueError(f'illegal move {text}')
+
+
+def position_fen(position: Position) -> str:
+    """Write position as PDN FEN, e.g. `W:W21,22,K30:B1,2`"""
+    geometry = get_geometry(position.rows, position.cols)
+    fields = [FEN_COLORS[position.turn]]
+    for letter, mask in (('W', position.white), ('B', position.black)):
+        squares = sorted((square_number(position.cols, *geometry.square(1 << bit)), bit)
+                         for bit in range(mask.bit_length()) if mask >> bit & 1)
+        fields.append(letter + ','.join(('K' if position.kings >> bit & 1 else '') + str(number)
+                                        for number, bit in squares))
+    return ':'.join(fields)
+
+
+def parse_fen(text: str, rows: int = 8, cols: int = 8) -> Position:
+    """Read position written by position_fen, ValueError when malformed"""
+    match = FEN.fullmatch(text.strip())
+    if match is None:
+        raise ValueError(f'malformed FEN {text}')
+    geometry = get_geometry(rows, cols)
+    turn, masks, kings = match.group(1), {'W': 0, 'B': 0}, 0
+    for field in text.strip().split(':')[1:]:
+        for square in filter(None, field[1:].split(',')):
+            number = int(square.lstrip('K'))
+            if not 1 <= number <= rows * cols // 2:
+                raise ValueError(f'square {number} is off the board')
+            mask = geometry.mask(*number_square(cols, number))
+            masks[field[0]] |= mask
+            if square.startswith('K'):
+                kings |= mask
+    if masks['W'] & masks['B']:
+        raise ValueError('square with pieces of both colors')
+    turn = StoneEnum.WHITE.value if turn == 'W' else StoneEnum.BLACK.value
+    return Position(rows, cols, masks['W'], masks['B'], kings, turn)
+
+
+class GameRecord:
+    """Moves of one game with tags, comments and result"""
+
+    def __init__(self, rows: int, cols: int, tags: dict = None) -> None:
+        self.rows = rows
+        self.cols = cols
+        self.tags = {'Event': '?', 'Date': time.strftime('%Y.%m.%d'),
+                     'White': '?', 'Black': '?', 'Result': '*'}
+        self.tags.update(tags or {})
+        self.tags['Board'] = f'{rows}x{cols}'
+        self.moves = []  # [(text, comment)]
+
+    def add(self, text: str, comment: str = '') -> None:
+        """Append move in PDN with optional comment"""
+        self.moves.append((text, comment))
+
+    def finish(self, winner) -> None:
+        """Set result from winner color, DRAW or None for unfinished game"""
+        self.tags['Result'] = RESULTS[winner]
+
+    def to_pdn(self) -> str:
+        """Write game as PDN text ending with empty line"""
+        lines = [f'[{name} "{value}"]' for name, value in self.tags.items()]
+        tokens = []
+        for index, (text, comment) in enumerate(self.moves):
+            if index % 2 == 0:
+                tokens.append(f'{index // 2 + 1}.')
+            tokens.append(text)
+            if comment:
+                tokens.append(f'{{{comment}}}')
+        tokens.append(self.tags['Result'])
+        line = ''
+        movetext = []
+        for token in tokens:
+            if line and len(line) + len(token) >= 80:
+                movetext.append(line)
+                line = ''
+            line = f'{line} {token}' if line else token
+        movetext.append(line)
+        return '\n'.join(lines + [''] + movetext) + '\n\n'
+
+    @classmethod
+    def from_pdn(cls, text: str) -> 'GameRecord':
+        """Read one game written by to_pdn"""
+        tags = dict(TAG.findall(text))
+        rows, cols = (int(size) for size in tags.get('Board', '8x8').split('x'))
+        record = cls(rows, cols, tags)
+        for token in TOKEN.findall(TAG.sub('', text)):
+            if token.startswith('{'):
+                move, _ = record.moves[-1]
+                record.moves[-1] = (move, token[1:-1])
+            elif re.fullmatch(r'\d+(?:[-x]\d+)+', token) and token not in ('1-0', '0-1'):
+                record.add(token)
+        return record
+
+
+def read_games(text: str) -> list:
+    """Split PDN text of many games into GameRecords"""
+    games = re.split(r'\n\s*\n(?=\[)', text.strip())
+    return [GameRecord.from_pdn(game) for game in games if game.strip()]
+
+
+def replay(record: GameRecord, checkers: Checkers = None) -> Checkers:
+    """Play recorded moves into headless game, ValueError on illegal move"""
+    if checkers is None:
+        checkers = Checkers()
+    for text, _ in record.moves:
+        move = parse_move(record.cols, text, checkers.all_pieces_valid_moves)
+        checkers.ai_move(move)
+    return checkers
+
+
+class GameRecorder:
+    """Records moves played in Checkers and writes finished games
+
+    Time per move is measured from the previous move. Games are kept in
+    memory until the writer is flushed or closed; with verbosity OFF
+    nothing is recorded at all.
+    """
+
+    def __init__(self, writer: 'GameWriter' = None,
+                 verbosity: int = RecordConstants.VERBOSITY, tags: dict = None) -> None:
+        self.writer = writer
+        self.verbosity = verbosity
+        self.tags = tags or {}
+        self.record = None
+        self.last_time = time.perf_counter()
+
+    @property
+    def enabled(self) -> bool:
+        """Check if moves are recorded"""
+        return self.verbosity > Verbosity.OFF
+
+    def start(self, rows: int, cols: int) -> None:
+        """Begin recording new game"""
+        self.record = GameRecord(rows, cols, self.tags)
+        self.last_time = time.perf_counter()
+
+    def add(self, checkers: Checkers, move, stats=None) -> None:
+        """Record squares move about to be played in checkers, with optional SearchStats"""
+        now = time.perf_counter()
+        seconds, self.last_time = now - self.last_time, now
+        if self.record is None:
+            self.start(checkers.board.rows, checkers.board.cols)
+        comment = []
+        if self.verbosity >= Verbosity.TIMING:
+            comment.append(f'{seconds:.3f}s')
+        if self.verbosity >= Verbosity.SEARCH and stats is not None:
+            comment.append(f'{stats.source} score={stats.score} depth={stats.depth} '
+                           f'nodes={stats.nodes}')
+        self.record.add(move_text(checkers.board.cols, move, checkers.all_pieces_valid_moves),
+                        ' '.join(comment))
+
+    def finish(self, winner) -> GameRecord:
+        """End game with winner as from Checkers.get_winner and pass it to the writer"""
+        record, self.record = self.record, None
+        if record is None:
+            return None
+        record.finish(winner)
+        if self.writer is not None:
+            self.writer.write(record)
+        return record
+
+    def close(self) -> None:
+        """Write games still buffered by the writer"""
+        if self.writer is not None:
+            self.writer.close()
+
+
+class GameWriter:
+    """Buffered PDN file, games are appended in batches of `buffer_games`"""
+
+    def __init__(self, path: str, buffer_games: int = RecordConstants.BUFFER_GAMES) -> None:
+        self.path = path
+        self.buffer_games = buffer_games
+        self.buffer = []
+
+    def write(self, record: GameRecord) -> None:
+        """Queue game, flush when the buffer is full"""
+        self.buffer.append(record.to_pdn())
+        if len(self.buffer) >= self.buffer_games:
+            self.flush()
+
+    def flush(self) -> None:
+        """Append queued games to the file"""
+        if self.buffer:
+            with open(self.path, 'a', encoding='utf-8') as file:
+                file.write(''.join(self.buffer))
+            self.buffer.clear()
+
+    def close(self) -> None:
+        """Write remaining games"""
+        self.flush()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
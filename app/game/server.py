@@ -0,0 +1,484 @@
+"""Asyncio server hosting many human vs AI games, one JSON object per line over TCP
+
+python -m game.server [--host HOST] [--port PORT] [--workers N] [--report SECONDS]
+
+Every request is an object with `op` and an optional `id` copied to its
+reply. Moves are written in PDN square numbers and positions in PDN FEN,
+see game.record. Operations:
+
+    {"op": "new", "ai": "black", "time": 0.1, "depth": 6}
+        start a game, `time` and `depth` limit every AI move of it
+    {"op": "move", "session": S, "move": "22-18"}
+        play a move, answered after the AI replied to it
+    {"op": "state", "session": S}
+    {"op": "close", "session": S}
+    {"op": "metrics"}
+
+Game replies carry `session`, `fen`, `turn`, `legal` moves of the human,
+`result` (None while playing) and `reply`, the AI move played. Failures are
+answered with {"ok": false, "error": ...}; error `overloaded` means the AI
+queue is full and the move was not played, the client may send it again.
+When the search of an AI move fails, e.g. a worker process died, the error
+starts with `search failed` and the game of the session is closed.
+
+AI moves are searched in a pool of worker processes. Queued moves are
+taken from the connections in turn, so a client with many games does not
+starve the others. A connection with too many unanswered requests is not
+read until some are answered.
+"""
+import argparse
+import asyncio
+import itertools
+import json
+import logging
+import math
+import os
+import time
+from collections import OrderedDict
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from game.checkers import Checkers
+from game.config import AIConstants
+from game.config import ServerConstants
+from game.config import StoneEnum
+from game.parallel import init_worker
+from game.parallel import worker_ai
+from game.position import Position
+from game.record import RESULTS
+from game.record import move_text
+from game.record import parse_move
+from game.record import position_fen
+
+COLORS = {'white': StoneEnum.WHITE.value, 'black': StoneEnum.BLACK.value}
+COLOR_NAMES = {color: name for name, color in COLORS.items()}
+
+
+def search_move(position: Position, history, quiet: int, time_budget: float, depth):
+    """Search AI move of position with game history inside worker process, squares move"""
+    board = position.to_board()
+    board.set_history(history, quiet)
+    epic_ai = worker_ai()
+    epic_ai.color = position.turn
+    return epic_ai.get_best_move(board, time_budget, depth=depth)
+
+
+def percentile(samples, fraction: float) -> float:
+    """Nearest rank percentile of samples, 0 without samples"""
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, max(0, math.ceil(fraction * len(ordered)) - 1))]
+
+
+class Overloaded(Exception):
+    """Raised when the AI queue is full"""
+
+
+class SearchFailed(Exception):
+    """Raised when the worker searching an AI move fails, e.g. the pool broke"""
+
+
+class Metrics:
+    """Counters and recent latencies of the server"""
+
+    def __init__(self, samples: int = ServerConstants.LATENCY_SAMPLES) -> None:
+        self.samples = samples
+        self.reset()
+
+    def reset(self) -> None:
+        """Start measuring again"""
+        self.started = time.perf_counter()
+        self.latency = deque(maxlen=self.samples)  # seconds from queueing to AI move
+        self.wait = deque(maxlen=self.samples)  # seconds spent in the queue
+        self.moves = 0  # AI moves searched
+        self.games = 0  # games finished
+        self.rejected = 0  # AI moves refused as overloaded
+        self.max_queued = 0
+
+    def add_move(self, wait: float, latency: float) -> None:
+        """Account one searched AI move"""
+        self.moves += 1
+        self.wait.append(wait)
+        self.latency.append(latency)
+
+    def snapshot(self, **gauges) -> dict:
+        """Get JSON serializable metrics with current gauges like queue depth"""
+        elapsed = max(time.perf_counter() - self.started, 1e-9)
+
+        def summary(samples):
+            return {f'p{round(100 * fraction)}': round(1000 * percentile(samples, fraction), 3)
+                    for fraction in (0.5, 0.9, 0.99, 1.0)}
+        return {**gauges, 'max_queued': self.max_queued, 'moves': self.moves,
+                'games': self.games, 'rejected': self.rejected,
+                'seconds': round(elapsed, 3),
+                'moves_per_second': round(self.moves / elapsed, 3),
+                'games_per_second': round(self.games / elapsed, 3),
+                'latency_ms': summary(self.latency), 'wait_ms': summary(self.wait)}
+
+
+class Scheduler:
+    """Runs jobs in an executor, at most `workers` at once, taking clients in turn
+
+    Jobs of every client wait in their own FIFO queue. Whenever a worker
+    is free the next job is taken from the client that waited longest, so
+    clients share the workers equally however many jobs each queues.
+    Beyond `limit` queued jobs submit raises Overloaded. When the process
+    pool broke, `restart` is called to get a new executor, jobs that ran
+    in the broken one fail with BrokenProcessPool.
+    """
+
+    def __init__(self, executor, workers: int, limit: int = ServerConstants.QUEUE_LIMIT,
+                 metrics: Metrics = None, restart=None) -> None:
+        # pylint: disable=too-many-arguments
+        self.executor = executor
+        self.restart = restart
+        self.workers = workers
+        self.limit = limit
+        self.metrics = metrics if metrics is not None else Metrics()
+        self.queues = OrderedDict()  # {client: deque of (future, function, args, queued time)}
+        self.queued = 0
+        self.running = 0
+
+    def submit(self, client, function, *args) -> asyncio.Future:
+        """Queue job of client, get future of its result"""
+        self.check_capacity()
+        future = asyncio.get_running_loop().create_future()
+        self.queues.setdefault(client, deque()).append(
+            (future, function, args, time.perf_counter()))
+        self.queued += 1
+        self.metrics.max_queued = max(self.metrics.max_queued, self.queued)
+        self.dispatch()
+        return future
+
+    def check_capacity(self) -> None:
+        """Raise Overloaded when no more jobs may be queued"""
+        if self.queued >= self.limit:
+            self.metrics.rejected += 1
+            raise Overloaded
+
+    def drop(self, client) -> None:
+        """Cancel queued jobs of client, running ones finish unheard"""
+        for future, _, _, _ in self.queues.pop(client, ()):
+            future.cancel()
+            self.queued -= 1
+
+    def replace(self, executor) -> bool:
+        """Replace broken executor unless already done, False without restart"""
+        if self.restart is None:
+            return False
+        if executor is self.executor:
+            self.executor = self.restart()
+        return True
+
+    def start(self, function, args) -> tuple:
+        """Run function in the executor, in a new one when the pool broke, get (executor, job)"""
+        loop = asyncio.get_running_loop()
+        executor = self.executor
+        try:
+            return executor, loop.run_in_executor(executor, function, *args)
+        except BrokenProcessPool:
+            if not self.replace(executor):
+                raise
+        return self.executor, loop.run_in_executor(self.executor, function, *args)
+
+    def dispatch(self) -> None:
+        """Start queued jobs while workers are free"""
+        while self.running < self.workers and self.queues:
+            client, queue = self.queues.popitem(last=False)
+            future, function, args, queued = queue.popleft()
+            if queue:
+                self.queues[client] = queue
+            self.queued -= 1
+            if future.cancelled():
+                continue
+            started = time.perf_counter()
+            try:
+                executor, job = self.start(function, args)
+            except BrokenProcessPool as error:
+                future.set_exception(error)
+                continue
+            self.running += 1
+            job.add_done_callback(
+                lambda job, future=future, queued=queued, started=started, executor=executor:
+                self.finished(job, future, started - queued, time.perf_counter() - queued,
+                              executor))
+
+    def finished(self, job, future: asyncio.Future, wait: float, latency: float,
+                 executor=None) -> None:
+        """Pass job result to its future, replace broken executor and start the next job"""
+        # pylint: disable=too-many-arguments
+        self.running -= 1
+        if job.cancelled():
+            future.cancel()
+        else:
+            self.metrics.add_move(wait, latency)
+            error = job.exception()
+            if isinstance(error, BrokenProcessPool):
+                self.replace(executor)
+            if not future.cancelled():
+                if error is not None:
+                    future.set_exception(error)
+                else:
+                    future.set_result(job.result())
+        self.dispatch()
+
+
+class Session:
+    """One game of a client against the AI"""
+    # pylint: disable=too-few-public-methods
+
+    def __init__(self, client, ai_color: int, time_budget: float, depth) -> None:
+        self.client = client
+        self.checkers = Checkers()
+        self.ai_color = ai_color
+        self.time_budget = time_budget
+        self.depth = depth
+        self.busy = False  # request of the session is being answered
+
+
+class GameServer:
+    """Holds game sessions of all connections and answers their requests"""
+
+    def __init__(self, workers: int = ServerConstants.WORKERS,
+                 limit: int = ServerConstants.QUEUE_LIMIT, executor=None) -> None:
+        """`executor` runs search_move, by default a pool of `workers` processes
+
+        The default pool is replaced by a new one when a worker process dies.
+        """
+        self.workers = workers or os.cpu_count()
+        self.executor = executor if executor is not None else self.new_pool()
+        self.metrics = Metrics()
+        self.scheduler = Scheduler(self.executor, self.workers, limit, self.metrics,
+                                   self.restart_pool if executor is None else None)
+        self.sessions = {}
+        self.session_ids = itertools.count(1)
+        self.client_ids = itertools.count(1)
+        self.logger = logging.getLogger('game.server')
+        self.operations = {'new': self.new_game, 'move': self.play_move,
+                           'state': self.state, 'close': self.close_session,
+                           'metrics': self.get_metrics}
+
+    async def start(self, host: str = ServerConstants.HOST,
+                    port: int = ServerConstants.PORT) -> asyncio.AbstractServer:
+        """Start listening, port 0 picks a free one"""
+        return await asyncio.start_server(self.handle_client, host, port)
+
+    def new_pool(self) -> ProcessPoolExecutor:
+        """Start worker processes"""
+        return ProcessPoolExecutor(self.workers, initializer=init_worker,
+                                   initargs=(AIConstants.TT_SIZE_MB,))
+
+    def restart_pool(self) -> ProcessPoolExecutor:
+        """Replace process pool broken by a dead worker"""
+        self.logger.warning('worker pool broke, starting a new one')
+        self.executor.shutdown(wait=False, cancel_futures=True)
+        self.executor = self.new_pool()
+        return self.executor
+
+    def close(self) -> None:
+        """Stop worker processes"""
+        self.executor.shutdown(cancel_futures=True)
+
+    async def handle_client(self, reader: asyncio.StreamReader,
+                            writer: asyncio.StreamWriter) -> None:
+        """Read requests of one connection and answer them concurrently"""
+        client = next(self.client_ids)
+        pending = asyncio.Semaphore(ServerConstants.CLIENT_REQUESTS)
+        tasks = set()
+        try:
+            while True:
+                await pending.acquire()
+                line = await reader.readline()
+                if not line:
+                    break
+                task = asyncio.create_task(self.respond(client, line, writer, pending))
+                tasks.add(task)
+                task.add_done_callback(tasks.discard)
+        except (ConnectionError, asyncio.CancelledError):
+            pass  # client left or server shuts down
+        finally:
+            for task in tasks:
+                task.cancel()
+            self.scheduler.drop(client)
+            for key in [key for key, session in self.sessions.items() if session.client == client]:
+                del self.sessions[key]
+            writer.close()
+
+    async def respond(self, client, line: bytes, writer: asyncio.StreamWriter,
+                      pending: asyncio.Semaphore) -> None:
+        """Answer one request line"""
+        try:
+            request = {}
+            try:
+                request = json.loads(line)
+                if not isinstance(request, dict):
+                    raise ValueError('request must be an object')
+                operation = self.operations.get(request.get('op'))
+                if operation is None:
+                    raise ValueError(f'unknown op {request.get("op")}')
+                reply = {'ok': True, **await operation(client, request)}
+            except Overloaded:
+                reply = {'ok': False, 'error': 'overloaded'}
+            except (ValueError, KeyError, TypeError) as error:
+                reply = {'ok': False, 'error': str(error)}
+            except SearchFailed as error:
+                reply = {'ok': False, 'error': f'search failed: {error}'}
+            if 'id' in request:
+                reply['id'] = request['id']
+            writer.write(json.dumps(reply).encode() + b'\n')
+            await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            pending.release()
+
+    def session(self, client, request: dict) -> Session:
+        """Find session of request owned by client"""
+        session = self.sessions.get(request.get('session'))
+        if session is None or session.client != client:
+            raise ValueError(f'unknown session {request.get("session")}')
+        return session
+
+    async def new_game(self, client, request: dict) -> dict:
+        """Start game, the AI moves first when it plays white"""
+        if request.get('ai', 'black') not in COLORS:
+            raise ValueError('ai must be white or black')
+        time_budget = float(request.get('time', ServerConstants.TIME_BUDGET))
+        if not math.isfinite(time_budget) or time_budget <= 0:
+            raise ValueError('time must be a positive number of seconds')
+        time_budget = min(time_budget, ServerConstants.MAX_TIME)
+        depth = request.get('depth')
+        if depth is not None:
+            depth = max(1, min(int(depth), AIConstants.MAX_DEPTH))
+        session = Session(client, COLORS[request.get('ai', 'black')], time_budget, depth)
+        key = f's{next(self.session_ids)}'
+        self.sessions[key] = session
+        reply = {}
+        if session.ai_color == session.checkers.turn:
+            session.busy = True
+            try:
+                reply['reply'] = await self.ai_move(session)
+            except (Overloaded, SearchFailed):
+                self.sessions.pop(key, None)
+                raise
+            finally:
+                session.busy = False
+        return {'session': key, **reply, **self.game_state(session)}
+
+    async def play_move(self, client, request: dict) -> dict:
+        """Play move of the human and answer with the move of the AI"""
+        session = self.session(client, request)
+        checkers = session.checkers
+        if session.busy:
+            raise ValueError('session is busy')
+        if checkers.get_winner() is not None:
+            raise ValueError('game is over')
+        move = parse_move(checkers.board.cols, str(request.get('move')),
+                          checkers.all_pieces_valid_moves)
+        self.scheduler.check_capacity()
+        checkers.ai_move(move)
+        reply = {}
+        if checkers.get_winner() is None:
+            session.busy = True
+            try:
+                reply['reply'] = await self.ai_move(session)
+            except SearchFailed:
+                self.sessions.pop(request['session'], None)
+                raise
+            finally:
+                session.busy = False
+        if checkers.get_winner() is not None:
+            self.metrics.games += 1
+        return {'session': request['session'], **reply, **self.game_state(session)}
+
+    async def ai_move(self, session: Session) -> str:
+        """Search and play AI move of session, get it in PDN"""
+        checkers = session.checkers
+        board = checkers.board
+        try:
+            move = await self.scheduler.submit(
+                session.client, search_move, checkers.get_position(), board.history,
+                board.quiet, session.time_budget, session.depth)
+        except Overloaded:
+            raise
+        except Exception as error:  # pylint: disable=broad-except
+            raise SearchFailed(repr(error)) from error
+        text = move_text(board.cols, move, checkers.all_pieces_valid_moves)
+        checkers.ai_move(move)
+        return text
+
+    def game_state(self, session: Session) -> dict:
+        """Position, legal moves and result of session"""
+        checkers = session.checkers
+        winner = checkers.get_winner()
+        legal = []
+        if winner is None and checkers.turn != session.ai_color:
+            valid_moves = checkers.all_pieces_valid_moves
+            legal = [move_text(checkers.board.cols, (piece, dest, captured_pieces), valid_moves)
+                     for piece, moves in valid_moves.items()
+                     for dest, captured_pieces in moves]
+        return {'fen': position_fen(checkers.get_position()),
+                'turn': COLOR_NAMES[checkers.turn], 'legal': legal,
+                'result': None if winner is None else RESULTS[winner]}
+
+    async def state(self, client, request: dict) -> dict:
+        """Current state of session"""
+        return {'session': request['session'], **self.game_state(self.session(client, request))}
+
+    async def close_session(self, client, request: dict) -> dict:
+        """End session"""
+        self.session(client, request)
+        del self.sessions[request['session']]
+        return {'session': request['session']}
+
+    async def get_metrics(self, client, request: dict) -> dict:
+        """Server metrics with queue depth and number of sessions"""
+        return {'metrics': self.snapshot()}
+
+    def snapshot(self) -> dict:
+        """Get metrics with current gauges"""
+        return self.metrics.snapshot(sessions=len(self.sessions), queued=self.scheduler.queued,
+                                     running=self.scheduler.running,
+                                     workers=self.scheduler.workers)
+
+    async def report(self, seconds: float) -> None:
+        """Log metrics every `seconds`"""
+        while True:
+            await asyncio.sleep(seconds)
+            self.logger.info('metrics %s', json.dumps(self.snapshot()))
+
+
+async def serve(host: str, port: int, workers, report: float) -> None:
+    """Run server until cancelled"""
+    game_server = GameServer(workers)
+    server = await game_server.start(host, port)
+    if report:
+        asyncio.get_running_loop().create_task(game_server.report(report))
+    game_server.logger.info('listening on %s', server.sockets[0].getsockname())
+    try:
+        async with server:
+            await server.serve_forever()
+    finally:
+        game_server.close()
+
+
+def main(argv=None):
+    """Parse command line and serve"""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--host', default=ServerConstants.HOST)
+    parser.add_argument('--port', type=int, default=ServerConstants.PORT)
+    parser.add_argument('--workers', type=int, default=ServerConstants.WORKERS,
+                        help='processes searching AI moves, default one per CPU')
+    parser.add_argument('--report', type=float, default=0,
+                        help='log metrics every REPORT seconds')
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s %(message)s')
+    try:
+        asyncio.run(serve(args.host, args.port, args.workers, args.report))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
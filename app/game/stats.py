@@ -0,0 +1,187 @@
+"""Search statistics and sinks they are sent to
+
+Every AI.get_best_move builds a SearchStats and passes it to the AI's
+sink. With the default NullSink nothing else happens; an enabled sink
+also turns on the Profiler, which times move generation, evaluation and
+make/unmake calls of the search.
+"""
+import json
+import logging
+import time
+
+
+class Profiler:
+    """Counts calls and seconds of functions wrapped during one search"""
+
+    BOARD_METHODS = {'get_moves': 'movegen', 'make_move': 'make_unmake',
+                     'unmake_move': 'make_unmake'}
+
+    def __init__(self) -> None:
+        self.calls = {}
+        self.seconds = {}
+        self.evaluate = None
+
+    def wrap(self, name: str, function):
+        """Get function counting its calls and time under given name"""
+        calls, seconds = self.calls, self.seconds
+        calls.setdefault(name, 0)
+        seconds.setdefault(name, 0.0)
+        clock = time.perf_counter
+
+        def timed(*args):
+            start = clock()
+            try:
+                return function(*args)
+            finally:
+                seconds[name] += clock() - start
+                calls[name] += 1
+        return timed
+
+    def attach(self, board, epic_ai) -> None:
+        """Time board methods and evaluation of the AI until detach"""
+        for method, name in self.BOARD_METHODS.items():
+            setattr(board, method, self.wrap(name, getattr(board, method)))
+        self.evaluate = epic_ai.evaluate
+        epic_ai.evaluate = self.wrap('evaluation', self.evaluate)
+
+    def detach(self, board, epic_ai) -> None:
+        """Restore methods replaced by attach"""
+        for method in self.BOARD_METHODS:
+            delattr(board, method)
+        epic_ai.evaluate = self.evaluate
+
+
+class SearchStats:
+    """Result and cost of one AI.get_best_move call"""
+    # pylint: disable=too-many-instance-attributes
+
+    def __init__(self, color: int, source: str) -> None:
+        self.color = color
+        self.source = source  # 'search', 'book' or 'tablebase'
+        self.score = None
+        self.depth = 0
+        self.pv = []
+        self.nodes = 0
+        self.qnodes = 0  # quiescence nodes, included in nodes
+        self.qdepth = 0  # deepest quiescence ply
+        self.researches = 0  # principal variation search re-searches
+        self.aspiration_researches = 0  # root searches repeated outside aspiration window
+        self.reductions = 0  # late moves searched with reduced depth
+        self.reduction_researches = 0  # reduced moves searched again at full depth
+        self.futility_pruned = 0  # quiet moves skipped by futility pruning
+        self.razored = 0  # nodes searched shallower by razoring
+        self.iteration_nodes = []  # nodes of every completed iteration
+        self.interior = 0  # nodes whose moves were generated and searched
+        self.cutoffs = 0
+        self.seconds = 0.0
+        self.calls = {}  # profiled calls by part, empty when not profiled
+        self.timings = {}  # profiled seconds by part
+
+    @property
+    def leaves(self) -> int:
+        """Nodes not expanded: evaluated, terminal, tablebase or table hits"""
+        return self.nodes - self.interior
+
+    @property
+    def evaluations(self) -> int:
+        """Static evaluation calls, only known when profiled"""
+        return self.calls.get('evaluation', 0)
+
+    @property
+    def branching_factor(self) -> float:
+        """Effective branching factor: node growth of the last iteration"""
+        if len(self.iteration_nodes) >= 2 and self.iteration_nodes[-2]:
+            return self.iteration_nodes[-1] / self.iteration_nodes[-2]
+        if self.depth:
+            return self.nodes ** (1 / self.depth)
+        return 0.0
+
+    @property
+    def nodes_per_second(self) -> float:
+        """Search speed"""
+        return self.nodes / self.seconds if self.seconds else 0.0
+
+    def as_dict(self) -> dict:
+        """Get JSON serializable dict of all values"""
+        timings = dict(self.timings)
+        if timings:
+            timings['other'] = max(0.0, self.seconds - sum(timings.values()))
+        return {'color': self.color, 'source': self.source, 'score': self.score,
+                'depth': self.depth, 'pv': self.pv, 'nodes': self.nodes,
+                'qnodes': self.qnodes, 'qdepth': self.qdepth, 'researches': self.researches,
+                'aspiration_researches': self.aspiration_researches,
+                'reductions': self.reductions, 'reduction_researches': self.reduction_researches,
+                'futility_pruned': self.futility_pruned, 'razored': self.razored,
+                'iteration_nodes': self.iteration_nodes, 'leaves': self.leaves,
+                'evaluations': self.evaluations, 'cutoffs': self.cutoffs,
+                'branching_factor': round(self.branching_factor, 3),
+                'seconds': round(self.seconds, 6),
+                'nodes_per_second': round(self.nodes_per_second),
+                'timings': {name: round(seconds, 6) for name, seconds in timings.items()}}
+
+    def __repr__(self) -> str:
+        return (f'SearchStats(source={self.source}, depth={self.depth}, score={self.score}, '
+                f'nodes={self.nodes}, seconds={self.seconds:.3f})')
+
+
+class NullSink:
+    """Discards stats, keeps the search unprofiled"""
+    enabled = False
+
+    def record(self, stats: SearchStats) -> None:
+        """Ignore stats"""
+
+    def iteration(self, stats: SearchStats) -> None:
+        """Ignore stats of completed iteration, depth, score, nodes and pv are filled in"""
+
+    def close(self) -> None:
+        """Nothing to release"""
+
+
+class MemorySink(NullSink):
+    """Collects stats in a list"""
+    enabled = True
+
+    def __init__(self) -> None:
+        self.records = []
+
+    def record(self, stats: SearchStats) -> None:
+        """Append stats"""
+        self.records.append(stats)
+
+
+class LoggerSink(NullSink):
+    """Logs one line per search"""
+    enabled = True
+
+    def __init__(self, logger: logging.Logger = None, level: int = logging.INFO) -> None:
+        self.logger = logger if logger is not None else logging.getLogger('game.search')
+        self.level = level
+
+    def record(self, stats: SearchStats) -> None:
+        """Log stats as JSON"""
+        if self.logger.isEnabledFor(self.level):
+            self.logger.log(self.level, 'search %s', json.dumps(stats.as_dict()))
+
+
+class JsonlSink(NullSink):
+    """Appends stats to a file, one JSON object per line"""
+    enabled = True
+
+    def __init__(self, path: str) -> None:
+        self.file = open(path, 'a', encoding='utf-8')  # pylint: disable=consider-using-with
+
+    def record(self, stats: SearchStats) -> None:
+        """Write stats line"""
+        self.file.write(json.dumps(stats.as_dict()) + '\n')
+        self.file.flush()
+
+    def close(self) -> None:
+        """Close the file"""
+        self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
@@ -0,0 +1,372 @@
+"""Endgame tablebase: retrograde generator and memory-mapped probe
+
+python -m game.tablebase OUTPUT [--pieces N]
+
+Run from the app directory (or with PYTHONPATH=app). Solves every position
+with 2..N pieces and white to move (black to move is probed through the
+180 degree rotation with colors swapped) and writes one byte per position:
+win or loss of the side to move with distance to conversion (plies until a
+capture ends the game or changes material), 0 for draw.
+"""
+import argparse
+from array import array
+import math
+import mmap
+import struct
+import time
+from functools import lru_cache
+from itertools import combinations
+from itertools import product
+import numpy as np
+from game.bitboard import BitBoard
+from game.bitboard import Geometry
+from game.bitboard import get_geometry
+from game.bitboard import iter_bits
+from game.board import Board
+from game.config import AIConstants
+from game.config import StoneEnum
+from game.evaluation import TABLEBASE_WIN
+
+MAGIC = b'CKTB'
+VERSION = 1
+HEADER = struct.Struct('<4sHBBB7x')  # magic, version, rows, cols, max pieces
+LOSS = 128  # values 1..127 are wins, LOSS + dtc are losses, 0 is draw
+MAX_DTC = 127
+
+
+class Outcome:
+    """Namespace class for tablebase results of the side to move"""
+    # pylint: disable=too-few-public-methods
+    DRAW = 0
+    WIN = 1
+    LOSS = 2
+
+
+def encode(outcome: int, dtc: int) -> int:
+    """Pack outcome and distance to conversion into one byte"""
+    assert dtc <= MAX_DTC, 'distance to conversion does not fit in a byte'
+    if outcome == Outcome.WIN:
+        return dtc
+    if outcome == Outcome.LOSS:
+        return LOSS + dtc
+    return 0
+
+
+def decode(value: int) -> tuple[int, int]:
+    """Unpack byte into (outcome, distance to conversion)"""
+    if value == 0:
+        return Outcome.DRAW, 0
+    if value < LOSS:
+        return Outcome.WIN, value
+    return Outcome.LOSS, value - LOSS
+
+
+def negate(value: int) -> int:
+    """Value for the player who moved into a position with given value"""
+    outcome, dtc = decode(value)
+    if outcome == Outcome.WIN:
+        return encode(Outcome.LOSS, dtc + 1)
+    if outcome == Outcome.LOSS:
+        return encode(Outcome.WIN, dtc + 1)
+    return 0
+
+
+def preference(value: int) -> tuple[int, int]:
+    """Sort key of values for the side to move, greater is better"""
+    outcome, dtc = decode(value)
+    if outcome == Outcome.WIN:
+        return 2, -dtc
+    if outcome == Outcome.LOSS:
+        return 0, dtc
+    return 1, 0
+
+
+class Indexer:
+    """Maps positions with white to move to indexes of the table
+
+    Positions are split by material signature (white men, white kings,
+    black men, black kings). Inside a signature every piece group is
+    ranked as a combination of square numbers and the ranks are combined
+    in mixed radix, so slots with overlapping groups are left unused.
+    """
+
+    def __init__(self, geometry: Geometry, max_pieces: int) -> None:
+        self.geometry = geometry
+        self.max_pieces = max_pieces
+        bits = sorted(geometry.squares)
+        self.count = len(bits)
+        self.numbers = {1 << bit: number for number, bit in enumerate(bits)}
+        # 180 degree rotation reverses the row major numbering
+        self.rotated = {1 << bit: 1 << bits[self.count - 1 - number]
+                        for number, bit in enumerate(bits)}
+        self.radixes = [math.comb(self.count, size) for size in range(max_pieces + 1)]
+        self.ranks = {}  # caches of rank and rotate by mask
+        self.rotations = {}
+        self.offsets = {}
+        self.size = 0
+        for pieces in range(2, max_pieces + 1):
+            for signature in self.signatures(pieces):
+                self.offsets[signature] = self.size
+                self.size += math.prod(math.comb(self.count, group) for group in signature)
+
+    @staticmethod
+    def signatures(pieces: int):
+        """Yield material signatures with given number of pieces, both colors present"""
+        for white in range(1, pieces):
+            black = pieces - white
+            for white_kings in range(white + 1):
+                for black_kings in range(black + 1):
+                    yield white - white_kings, white_kings, black - black_kings, black_kings
+
+    def rank(self, mask: int) -> int:
+        """Rank of the squares of mask among combinations of the same size"""
+        rank = self.ranks.get(mask)
+        if rank is None:
+            rank = sum(math.comb(self.numbers[bit], order + 1)
+                       for order, bit in enumerate(iter_bits(mask)))
+            self.ranks[mask] = rank
+        return rank
+
+    def index(self, white: int, black: int, kings: int):
+        """Get index of position with white to move, None if it has too many pieces"""
+        groups = (white & ~kings, white & kings, black & ~kings, black & kings)
+        signature = tuple(group.bit_count() for group in groups)
+        offset = self.offsets.get(signature)
+        if offset is None:
+            return None
+        index = 0
+        for group, size in zip(groups, signature):
+            index = index * self.radixes[size] + self.rank(group)
+        return offset + index
+
+    def rotate(self, mask: int) -> int:
+        """Rotate mask by 180 degrees"""
+        result = self.rotations.get(mask)
+        if result is None:
+            result = 0
+            for bit in iter_bits(mask):
+                result |= self.rotated[bit]
+            self.rotations[mask] = result
+        return result
+
+    def flip(self, white: int, black: int, kings: int) -> tuple[int, int, int]:
+        """Turn position with black to move into the same one with white to move"""
+        return self.rotate(black), self.rotate(white), self.rotate(kings)
+
+    def positions(self, signature):
+        """Yield (index, white, black, kings) of every legal position of signature"""
+        geometry = self.geometry
+        squares = list(self.numbers)
+        men_squares = {
+            StoneEnum.WHITE.value: [bit for bit in squares if not bit & geometry.first_row],
+            StoneEnum.BLACK.value: [bit for bit in squares if not bit & geometry.last_row],
+        }
+        allowed = (men_squares[StoneEnum.WHITE.value], squares,
+                   men_squares[StoneEnum.BLACK.value], squares)
+        groups = []
+        for size, group_squares in zip(signature, allowed):
+            groups.append([(sum(combo), self.rank(sum(combo)))
+                           for combo in combinations(group_squares, size)])
+        radixes = [self.radixes[size] for size in signature]
+        offset = self.offsets[signature]
+        for placement in product(*groups):
+            masks = [mask for mask, _ in placement]
+            if sum(masks) != masks[0] | masks[1] | masks[2] | masks[3]:
+                continue  # two pieces on one square
+            index = 0
+            for (_, rank), radix in zip(placement, radixes):
+                index = index * radix + rank
+            yield (offset + index, masks[0] | masks[1], masks[2] | masks[3],
+                   masks[1] | masks[3])
+
+
+def successors(bitboard: BitBoard, indexer: Indexer, values: np.ndarray):
+    """Get (capture value, quiet successor indexes) of position with white to move
+
+    Capture value is the outcome of the best capture looked up in `values`
+    with distance 1 as the capture converts, None when the position has
+    only quiet moves (their successors are in the same class and not
+    solved yet).
+    """
+    geometry = indexer.geometry
+    white, black, kings = bitboard.white, bitboard.black, bitboard.kings
+    capture_values, quiet = [], []
+    for source, moves in bitboard.generate_moves(StoneEnum.WHITE.value).items():
+        for dest, captured in moves:
+            captured_mask = sum(captured)
+            new_kings = kings & ~captured_mask
+            if source & kings:
+                new_kings = new_kings & ~source | dest
+            elif dest & geometry.first_row:
+                new_kings |= dest
+            new_black = black & ~captured_mask
+            if not new_black:
+                capture_values.append(encode(Outcome.WIN, 1))
+                continue
+            index = indexer.index(*indexer.flip(white & ~source | dest, new_black, new_kings))
+            if captured:
+                capture_values.append(negate(int(values[index])))
+            else:
+                quiet.append(index)
+    if capture_values:
+        outcome, _ = decode(max(capture_values, key=preference))
+        return encode(outcome, 1), []
+    return None, quiet
+
+
+def solve_class(pieces: int, indexer: Indexer, values: np.ndarray) -> None:
+    """Solve all positions with given number of pieces, smaller ones must be solved"""
+    # pylint: disable=too-many-locals
+    bitboard = BitBoard(indexer.geometry)
+    owners, edges = array('q'), array('q')
+    for signature in indexer.signatures(pieces):
+        for index, white, black, kings in indexer.positions(signature):
+            bitboard.white, bitboard.black, bitboard.kings = white, black, kings
+            value, quiet = successors(bitboard, indexer, values)
+            if value is not None:
+                values[index] = value
+            elif not quiet:
+                values[index] = encode(Outcome.LOSS, 0)
+            else:
+                owners.extend([index] * len(quiet))
+                edges.extend(quiet)
+    indexer.geometry.captures.clear()
+
+    # retrograde by distance: a position is won in dtc plies once a successor
+    # is lost in dtc - 1, lost in dtc once all successors are won in less
+    owners = np.frombuffer(owners, dtype=np.int64)
+    edges = np.frombuffer(edges, dtype=np.int64)
+    not_lost = np.zeros(values.size, dtype=bool)
+    dtc = 1
+    while owners.size:
+        succ = values[edges]
+        won = owners[succ == LOSS + dtc - 1]
+        not_lost[owners[(succ == 0) | (succ >= dtc)]] = True
+        lost = owners[~not_lost[owners]]
+        not_lost[owners] = False
+        if won.size == 0 and lost.size == 0 and dtc > 1:
+            break
+        values[won] = encode(Outcome.WIN, dtc)
+        values[lost] = encode(Outcome.LOSS, dtc)
+        keep = values[owners] == 0
+        owners, edges = owners[keep], edges[keep]
+        dtc += 1
+
+
+def generate(max_pieces: int, rows: int = 8, cols: int = 8, progress=None) -> np.ndarray:
+    """Solve all positions with up to `max_pieces` pieces, get table of values"""
+    indexer = Indexer(get_geometry(rows, cols), max_pieces)
+    values = np.zeros(indexer.size, dtype=np.uint8)
+    for pieces in range(2, max_pieces + 1):
+        start = time.perf_counter()
+        solve_class(pieces, indexer, values)
+        if progress is not None:
+            progress(pieces, time.perf_counter() - start)
+    return values
+
+
+def write(path: str, values: np.ndarray, max_pieces: int, rows: int = 8, cols: int = 8) -> None:
+    """Write table of values with header to file"""
+    with open(path, 'wb') as file:
+        file.write(HEADER.pack(MAGIC, VERSION, rows, cols, max_pieces))
+        file.write(values.tobytes())
+
+
+class Tablebase:
+    """Read-only memory-mapped tablebase file"""
+
+    def __init__(self, path: str) -> None:
+        with open(path, 'rb') as file:
+            self.data = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, rows, cols, max_pieces = HEADER.unpack_from(self.data)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f'{path} is not a tablebase file of version {VERSION}')
+        self.rows, self.cols = rows, cols
+        self.max_pieces = max_pieces
+        self.indexer = Indexer(get_geometry(rows, cols), max_pieces)
+        if len(self.data) != HEADER.size + self.indexer.size:
+            raise ValueError(f'{path} is truncated')
+
+    def close(self) -> None:
+        """Unmap the file"""
+        self.data.close()
+
+    def covers(self, board: Board) -> bool:
+        """Check board has the size and few enough pieces to be probed"""
+        return (board.white_count + board.black_count <= self.max_pieces
+                and (board.rows, board.cols) == (self.rows, self.cols))
+
+    def probe(self, board: Board, color: int):
+        """Get byte value for side to move, None if position is not covered"""
+        if not self.covers(board):
+            return None
+        if board.white_count == 0 or board.black_count == 0:
+            lost = board.white_count == 0 if color == StoneEnum.WHITE.value \
+                else board.black_count == 0
+            return encode(Outcome.LOSS, 0) if lost else encode(Outcome.WIN, 0)
+        bitboard = board.bitboard
+        masks = bitboard.white, bitboard.black, bitboard.kings
+        if color == StoneEnum.BLACK.value:
+            masks = self.indexer.flip(*masks)
+        return self.data[HEADER.size + self.indexer.index(*masks)]
+
+    def score(self, board: Board, color: int):
+        """Search score from white's point of view, None if not covered
+
+        Won positions score TABLEBASE_WIN less the distance, so shorter
+        wins and longer losses are preferred.
+        """
+        value = self.probe(board, color)
+        if value is None:
+            return None
+        outcome, dtc = decode(value)
+        if outcome == Outcome.DRAW:
+            return 0
+        score = TABLEBASE_WIN - dtc
+        if outcome == Outcome.LOSS:
+            score = -score
+        return score if color == StoneEnum.WHITE.value else -score
+
+    def best_move(self, board: Board, color: int):
+        """Get bit move keeping the best result for side to move, None if not covered"""
+        if not self.covers(board):
+            return None
+        opponent = StoneEnum.BLACK.value if color == StoneEnum.WHITE.value \
+            else StoneEnum.WHITE.value
+        best, best_key = None, None
+        for move in board.get_moves(color):
+            undo = board.make_move(move)
+            key = preference(negate(self.probe(board, opponent)))
+            board.unmake_move(undo)
+            if best_key is None or key > best_key:
+                best, best_key = move, key
+        return best
+
+
+@lru_cache(maxsize=None)
+def open_tablebase(path: str) -> Tablebase:
+    """Shared tablebase for given file"""
+    return Tablebase(path)
+
+
+def main(argv=None):
+    """Generate tablebase file and print statistics"""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('output')
+    parser.add_argument('--pieces', type=int, default=AIConstants.TABLEBASE_PIECES)
+    args = parser.parse_args(argv)
+
+    def progress(pieces, seconds):
+        print(f'{pieces} pieces solved in {seconds:.1f} s', flush=True)
+
+    values = generate(args.pieces, progress=progress)
+    write(args.output, values, args.pieces)
+    wins = int(((values > 0) & (values < LOSS)).sum())
+    losses = int((values >= LOSS).sum())
+    longest = max(int(values[values < LOSS].max()), int(values.max()) - LOSS)
+    print(f'{args.output}: {values.size} slots, {wins} wins, {losses} losses, '
+          f'longest distance to conversion {longest}')
+
+
+if __name__ == '__main__':
+    main()
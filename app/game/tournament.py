@@ -0,0 +1,319 @@
+"""Headless self-play tournament between two engine configurations
+
+python -m game.tournament --engine name=new,depth=5 --engine name=old,depth=4 \\
+    --games 1000 --workers 8
+
+Run from the app directory (or with PYTHONPATH=app). Every opening is
+played twice with colors swapped, games run in a pool of processes and
+the match stops early once SPRT accepts one of the hypotheses.
+"""
+import argparse
+import math
+import random
+from concurrent.futures import FIRST_COMPLETED
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures import wait
+from typing import NamedTuple
+from typing import Optional
+from game.ai import AI
+from game.board import Board
+from game.board import opponent
+from game.config import AIConstants
+from game.config import SizeConstants as const
+from game.config import StoneEnum
+from game.config import TournamentConstants
+
+EVALUATIONS = {
+    'position': AI.evaluate_position,
+    'material': AI.evaluate_material,
+}
+
+
+class EngineConfig(NamedTuple):
+    """Settings of one tournament engine"""
+    name: str
+    depth: Optional[int] = None  # iterative deepening limit
+    time_budget: Optional[float] = None  # seconds per move
+    evaluation: str = 'position'  # key of EVALUATIONS
+    table_size_mb: float = AIConstants.TT_SIZE_MB
+    quiescence: bool = AIConstants.QUIESCENCE
+    lmr: bool = AIConstants.LMR
+    futility: bool = AIConstants.FUTILITY
+    razoring: bool = AIConstants.RAZORING
+
+    @classmethod
+    def parse(cls, spec: str) -> 'EngineConfig':
+        """Parse 'name=new,depth=5,time=0.1,eval=material,tt=16,q=0,lmr=1,fut=1,razor=1'"""
+        fields = dict(item.split('=', 1) for item in spec.split(',') if item)
+        unknown = set(fields) - {'name', 'depth', 'time', 'eval', 'tt', 'q', 'lmr', 'fut', 'razor'}
+        if unknown:
+            raise ValueError(f'unknown engine options: {", ".join(sorted(unknown))}')
+        evaluation = fields.get('eval', 'position')
+        if evaluation not in EVALUATIONS:
+            raise ValueError(f'unknown evaluation: {evaluation}')
+        return cls(name=fields.get('name', spec),
+                   depth=int(fields['depth']) if 'depth' in fields else None,
+                   time_budget=float(fields['time']) if 'time' in fields else None,
+                   evaluation=evaluation,
+                   table_size_mb=float(fields.get('tt', AIConstants.TT_SIZE_MB)),
+                   quiescence=bool(int(fields.get('q', AIConstants.QUIESCENCE))),
+                   lmr=bool(int(fields.get('lmr', AIConstants.LMR))),
+                   futility=bool(int(fields.get('fut', AIConstants.FUTILITY))),
+                   razoring=bool(int(fields.get('razor', AIConstants.RAZORING))))
+
+    def make_ai(self, color: int) -> AI:
+        """Create AI playing given color with these settings"""
+        epic_ai = AI(color, self.table_size_mb, evaluation=EVALUATIONS[self.evaluation],
+                     quiescence=self.quiescence)
+        epic_ai.lmr, epic_ai.futility, epic_ai.razoring = self.lmr, self.futility, self.razoring
+        return epic_ai
+
+    def best_move(self, epic_ai: AI, board: Board):
+        """Search move for given position within configured limits"""
+        return epic_ai.get_best_move(board, self.time_budget, depth=self.depth)
+
+
+def make_openings(count: int, plies: int = TournamentConstants.OPENING_PLIES,
+                  seed: int = AIConstants.SEED) -> list:
+    """Get `count` openings as lists of bit moves played from the initial position
+
+    Openings are distinct positions reached by random moves, they repeat
+    only when there are fewer distinct positions than requested.
+    """
+    rng = random.Random(seed)
+    openings, seen = [], set()
+    for _ in range(count * 20):
+        if len(openings) == count:
+            break
+        board = Board(const.ROWS, const.COLS)
+        color = StoneEnum.WHITE.value
+        moves = []
+        for _ in range(plies):
+            legal = board.get_moves(color)
+            if not legal or board.winner is not None:
+                break
+            move = rng.choice(legal)
+            board.make_move(move)
+            moves.append(move)
+            color = opponent(color)
+        key = (board.zobrist, color)
+        if len(moves) == plies and key not in seen:
+            seen.add(key)
+            openings.append(moves)
+    return [openings[index % len(openings)] for index in range(count)]
+
+
+def play_game(white: EngineConfig, black: EngineConfig, opening,
+              max_plies: int = TournamentConstants.MAX_PLIES) -> int:
+    """Play one game from given opening, get 1 for white win, -1 for black win, 0 for draw
+
+    Side without moves loses, game reaching `max_plies`, repeating a position
+    or exceeding the move limit without captures and man moves is a draw.
+    """
+    board = Board(const.ROWS, const.COLS)
+    for move in opening:
+        board.make_move(move)
+    color = StoneEnum.WHITE.value if len(opening) % 2 == 0 else StoneEnum.BLACK.value
+    engines = {StoneEnum.WHITE.value: (white, white.make_ai(StoneEnum.WHITE.value)),
+               StoneEnum.BLACK.value: (black, black.make_ai(StoneEnum.BLACK.value))}
+    for _ in range(len(opening), max_plies):
+        if board.winner is not None or board.is_draw():
+            break
+        config, epic_ai = engines[color]
+        move = config.best_move(epic_ai, board)
+        if move is None:
+            return 1 if color == StoneEnum.BLACK.value else -1
+        piece, dest, captured_pieces = move
+        board.apply_move(*piece, *dest, captured_pieces)
+        color = opponent(color)
+    if board.winner == StoneEnum.WHITE.value:
+        return 1
+    if board.winner == StoneEnum.BLACK.value:
+        return -1
+    return 0
+
+
+def play_pair_game(engine_a: EngineConfig, engine_b: EngineConfig, opening,
+                   a_is_white: bool, max_plies: int) -> int:
+    """Play one game, get its result from the point of view of engine_a"""
+    if a_is_white:
+        return play_game(engine_a, engine_b, opening, max_plies)
+    return -play_game(engine_b, engine_a, opening, max_plies)
+
+
+def elo_from_score(score: float) -> float:
+    """Elo difference corresponding to expected score in [0, 1]"""
+    if score <= 0:
+        return -math.inf
+    if score >= 1:
+        return math.inf
+    return -400 * math.log10(1 / score - 1)
+
+
+def score_from_elo(elo: float) -> float:
+    """Expected score of a player stronger by given Elo difference"""
+    return 1 / (1 + 10 ** (-elo / 400))
+
+
+class MatchResult:
+    """Wins, draws and losses of engine A against engine B"""
+
+    def __init__(self, wins: int = 0, draws: int = 0, losses: int = 0) -> None:
+        self.wins = wins
+        self.draws = draws
+        self.losses = losses
+
+    def add(self, result: int) -> None:
+        """Count game result given from the point of view of engine A"""
+        if result > 0:
+            self.wins += 1
+        elif result < 0:
+            self.losses += 1
+        else:
+            self.draws += 1
+
+    @property
+    def games(self) -> int:
+        """Number of counted games"""
+        return self.wins + self.draws + self.losses
+
+    def score(self) -> float:
+        """Average points per game of engine A"""
+        if self.games == 0:
+            return 0.5
+        return (self.wins + self.draws / 2) / self.games
+
+    def variance(self) -> float:
+        """Variance of points of one game"""
+        if self.games == 0:
+            return 0.0
+        score = self.score()
+        return (self.wins * (1 - score) ** 2 + self.draws * (0.5 - score) ** 2
+                + self.losses * score ** 2) / self.games
+
+    def elo(self, z_value: float = 1.96) -> tuple[float, float, float]:
+        """Get Elo difference with bounds of its confidence interval (95% by default)"""
+        score = self.score()
+        margin = z_value * math.sqrt(self.variance() / self.games) if self.games else 1.0
+        return (elo_from_score(score), elo_from_score(score - margin),
+                elo_from_score(score + margin))
+
+    def llr(self, elo0: float, elo1: float) -> float:
+        """Log likelihood ratio of H1 (elo1) against H0 (elo0), normal approximation
+
+        Half a game is added to every outcome when one of them was not seen
+        yet, otherwise a one-sided match would have zero variance.
+        """
+        if self.games == 0:
+            return 0.0
+        counts = self
+        if min(self.wins, self.draws, self.losses) == 0:
+            counts = MatchResult(self.wins + 0.5, self.draws + 0.5, self.losses + 0.5)
+        score0, score1 = score_from_elo(elo0), score_from_elo(elo1)
+        return (self.games * (score1 - score0) * (2 * counts.score() - score0 - score1)
+                / (2 * counts.variance()))
+
+    def sprt(self, elo0: float = TournamentConstants.ELO0,
+             elo1: float = TournamentConstants.ELO1,
+             alpha: float = TournamentConstants.ALPHA,
+             beta: float = TournamentConstants.BETA) -> Optional[bool]:
+        """Get True when H1 is accepted, False when H0 is accepted, None to continue"""
+        llr = self.llr(elo0, elo1)
+        if llr >= math.log((1 - beta) / alpha):
+            return True
+        if llr <= math.log(beta / (1 - alpha)):
+            return False
+        return None
+
+
+def run_match(engine_a: EngineConfig, engine_b: EngineConfig,
+              games: int = TournamentConstants.GAMES, workers: int = None,
+              sprt: Optional[tuple] = None, opening_plies=TournamentConstants.OPENING_PLIES,
+              max_plies: int = TournamentConstants.MAX_PLIES,
+              seed: int = AIConstants.SEED) -> MatchResult:
+    # pylint: disable=too-many-arguments, too-many-locals
+    """Play match of up to `games` games between two engines
+
+    Both engines play both colors of every opening. With `sprt` given as
+    (elo0, elo1, alpha, beta) the match stops as soon as it is decided.
+    `workers=1` plays the games in this process.
+    """
+    openings = make_openings((games + 1) // 2, opening_plies, seed)
+    tasks = [(engine_a, engine_b, openings[index // 2], index % 2 == 0, max_plies)
+             for index in range(games)]
+    result = MatchResult()
+
+    def decided():
+        return sprt is not None and result.sprt(*sprt) is not None
+
+    if workers == 1:
+        for task in tasks:
+            result.add(play_pair_game(*task))
+            if decided():
+                break
+        return result
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        pending = {executor.submit(play_pair_game, *task) for task in tasks}
+        while pending and not decided():
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                result.add(future.result())
+        for future in pending:
+            future.cancel()
+    return result
+
+
+def format_elo(value: float) -> str:
+    """Format Elo difference with sign"""
+    if math.isinf(value):
+        return '+inf' if value > 0 else '-inf'
+    return f'{value:+.1f}'
+
+
+def report(engine_a: EngineConfig, engine_b: EngineConfig, result: MatchResult,
+           sprt: Optional[tuple] = None) -> str:
+    """Describe match result as text"""
+    elo, low, high = result.elo()
+    lines = [f'{engine_a.name} vs {engine_b.name}: {result.games} games',
+             f'W {result.wins}  D {result.draws}  L {result.losses}  '
+             f'score {100 * result.score():.1f}%',
+             f'Elo {format_elo(elo)} [{format_elo(low)}, {format_elo(high)}] (95%)']
+    if sprt is not None:
+        elo0, elo1, alpha, beta = sprt
+        verdict = {True: 'H1 accepted', False: 'H0 accepted', None: 'inconclusive'}
+        lines.append(f'SPRT elo0={elo0} elo1={elo1}: LLR {result.llr(elo0, elo1):.2f} '
+                     f'({math.log(beta / (1 - alpha)):.2f}, {math.log((1 - beta) / alpha):.2f}) '
+                     f'{verdict[result.sprt(*sprt)]}')
+    return '\n'.join(lines)
+
+
+def main(argv=None):
+    """Parse command line, play the match and print report"""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--engine', action='append', type=EngineConfig.parse,
+                        help='engine A then engine B, e.g. name=new,depth=5,time=0.1,'
+                             'eval=material,tt=16,q=0,lmr=1,fut=1,razor=1')
+    parser.add_argument('--games', type=int, default=TournamentConstants.GAMES)
+    parser.add_argument('--workers', type=int, default=None,
+                        help='processes playing games, default one per CPU')
+    parser.add_argument('--opening-plies', type=int, default=TournamentConstants.OPENING_PLIES)
+    parser.add_argument('--max-plies', type=int, default=TournamentConstants.MAX_PLIES)
+    parser.add_argument('--seed', type=int, default=AIConstants.SEED)
+    parser.add_argument('--sprt', nargs=4, type=float, metavar=('ELO0', 'ELO1', 'ALPHA', 'BETA'),
+                        help='stop early once SPRT decides')
+    args = parser.parse_args(argv)
+    engines = args.engine or [EngineConfig.parse('name=position,depth=4'),
+                              EngineConfig.parse('name=material,depth=4,eval=material')]
+    if len(engines) != 2:
+        parser.error('exactly two --engine options are needed')
+    result = run_match(*engines, games=args.games, workers=args.workers, sprt=args.sprt,
+                       opening_plies=args.opening_plies, max_plies=args.max_plies,
+                       seed=args.seed)
+    sprt = args.sprt or (TournamentConstants.ELO0, TournamentConstants.ELO1,
+                         TournamentConstants.ALPHA, TournamentConstants.BETA)
+    print(report(*engines, result, sprt))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,63 @@
+"""Module with transposition table for AI search"""
+
+
+class Bound:
+    """Namespace class for kinds of stored search scores"""
+    # pylint: disable=too-few-public-methods
+    EXACT = 0
+    LOWER = 1
+    UPPER = 2
+
+
+class TranspositionTable:
+    """Fixed size hash table of search results keyed by zobrist hash
+
+    Every bucket has two slots: the first one keeps the deepest result
+    stored in the bucket, the second one is always replaced.
+    Entries are tuples (key, depth, bound, score, best_move).
+    """
+    ENTRY_SIZE = 400  # rough size of one entry in bytes, used for the memory cap
+
+    def __init__(self, size_mb: float) -> None:
+        self.buckets = max(1, int(size_mb * 2**20) // (2 * self.ENTRY_SIZE))
+        self.slots = [None] * (2 * self.buckets)
+        self.hits = 0
+        self.misses = 0
+        self.collisions = 0
+        self.stores = 0
+
+    def probe(self, key: int):
+        """Find entry for given key, None if not stored"""
+        index = 2 * (key % self.buckets)
+        for entry in (self.slots[index], self.slots[index + 1]):
+            if entry is not None and entry[0] == key:
+                self.hits += 1
+                return entry
+        self.misses += 1
+        if self.slots[index] is not None:
+            self.collisions += 1
+        return None
+
+    def store(self, key: int, depth: int, bound: int, score, best_move) -> None:
+        # pylint: disable=too-many-arguments
+        """Store search result, replacing by depth-preferred/always-replace policy"""
+        index = 2 * (key % self.buckets)
+        entry = (key, depth, bound, score, best_move)
+        deepest = self.slots[index]
+        self.stores += 1
+        if deepest is None or deepest[0] == key or depth >= deepest[1]:
+            self.slots[index] = entry
+        else:
+            self.slots[index + 1] = entry
+
+    def clear(self) -> None:
+        """Remove all entries and reset counters"""
+        self.slots = [None] * (2 * self.buckets)
+        self.hits = self.misses = self.collisions = self.stores = 0
+
+    def stats(self) -> dict:
+        """Get counters of table usage"""
+        probes = self.hits + self.misses
+        return {'hits': self.hits, 'misses': self.misses,
+                'collisions': self.collisions, 'stores': self.stores,
+                'hit_rate': self.hits / probes if probes else 0.0}
@@ -0,0 +1,57 @@
+"""Module running AI search off the pygame event loop"""
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from game.ai import AI
+from game.board import Board
+
+
+class AIWorker:
+    """Computes AI moves in a background thread
+
+    The frame loop starts a search with request() and polls done(), so
+    the window keeps rendering and handling events during the search.
+    """
+
+    def __init__(self, epic_ai: AI) -> None:
+        self.ai = epic_ai
+        self.executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='ai')
+        self.future = None
+        self.stop_event = None
+
+    def request(self, board: Board, random_move: bool = False) -> None:
+        """Start searching move for given board, which must not be changed meanwhile"""
+        self.cancel()
+        self.stop_event = threading.Event()
+        self.future = self.executor.submit(self._search, board, random_move, self.stop_event)
+
+    def _search(self, board: Board, random_move: bool, stop_event: threading.Event):
+        """Run search inside the worker thread"""
+        if random_move:
+            return self.ai.get_random_move(board)
+        self.ai.stop_event = stop_event
+        return self.ai.get_best_move(board)
+
+    def busy(self) -> bool:
+        """Check if search is running"""
+        return self.future is not None and not self.future.done()
+
+    def done(self) -> bool:
+        """Check if move is ready to be taken"""
+        return self.future is not None and self.future.done()
+
+    def take(self):
+        """Take finished move, None when there is no legal move"""
+        move = self.future.result()
+        self.future = None
+        return move
+
+    def cancel(self) -> None:
+        """Stop running search and forget its result"""
+        if self.stop_event is not None:
+            self.stop_event.set()
+        self.future = None
+
+    def close(self) -> None:
+        """Cancel search and let the thread finish in background"""
+        self.cancel()
+        self.executor.shutdown(wait=False)
@@ -1,7 +1,15 @@
 """Module for testing AI methods"""
+import math
+import random
+import time
 import pytest
 from game.ai import AI
 from game.board import Board
+from game.board import board_from_rows
+from game.config import AIConstants
+from game.evaluation import DRAW_SCORE
+from game.playout import random_game
+from game.playout import random_position
 from tests.test_board import GRID1, GRID2, GRID3
 
 
@@ -28,4 +36,302 @@ def test_evaluate_board2(grid, expected):
     board.grid = grid
     epic_ai = AI(1)
     assert epic_ai.evaluate_board2(grid) == expected
-    
\ No newline at end of file
+
+
+@pytest.mark.parametrize("seed, depth", [(0, 3), (1, 4), (2, 5)])
+def test_table_keeps_search_result(seed, depth):
+    """Test search with transposition table gives the same score as without"""
+    board, color = random_position(random.Random(seed), (10, 30))
+    maximizing = color == 1
+    expected = AI(color, 0).minimax(board, depth, maximizing, -math.inf, math.inf)[0]
+    epic_ai = AI(color)
+    for _ in range(2):
+        score, move = epic_ai.minimax(board, depth, maximizing, -math.inf, math.inf)
+        assert score == expected
+    assert epic_ai.table.hits > 0
+    board.make_move(move)
+    assert AI(color, 0).minimax(board, depth - 1, not maximizing,
+                                -math.inf, math.inf)[0] == expected
+
+
+def test_iterative_deepening_fixed_depth():
+    """Test search without budget reaches fixed depth with the same score"""
+    board = Board(8, 8, 0, 0)
+    epic_ai = AI(2)
+    board.make_move(board.get_moves(1)[0])
+    move = epic_ai.get_best_move(board, None)
+    assert epic_ai.depth_reached == AIConstants.DEPTH
+    assert board.move_to_squares(epic_ai.pv[0]) == move
+    expected = AI(2, 0).minimax(board, AIConstants.DEPTH, False, -math.inf, math.inf)[0]
+    undo = board.make_move(epic_ai.pv[0])
+    assert AI(2, 0).minimax(board, AIConstants.DEPTH - 1, True,
+                            -math.inf, math.inf)[0] == expected
+    board.unmake_move(undo)
+
+
+@pytest.mark.parametrize("time_budget", [0.05, 0.2])
+def test_iterative_deepening_time_budget(time_budget):
+    """Test search returns a legal move within its time budget"""
+    board = Board(8, 8, 0, 0)
+    epic_ai = AI(1)
+    start = time.perf_counter()
+    move = epic_ai.get_best_move(board, time_budget)
+    assert time.perf_counter() - start < time_budget + 0.1
+    assert epic_ai.depth_reached >= 1
+    assert move[0] in board.get_valid_moves_all_pieces(1)
+    assert (board.grid == GRID1).all()
+
+
+def test_iterative_deepening_node_budget():
+    """Test node budget stops the search"""
+    board = Board(8, 8, 0, 0)
+    epic_ai = AI(1)
+    epic_ai.get_best_move(board, None, 2000)
+    assert epic_ai.nodes <= 2000 + AI.CHECK_EVERY
+    assert len(epic_ai.pv) == epic_ai.depth_reached
+
+
+@pytest.mark.parametrize("grid, expected",
+                         [(GRID1, 0),
+                          (GRID2, -88),
+                          (GRID3, -87)
+                          ])
+def test_evaluate_position(grid, expected):
+    """Test incremental evaluation equals second board eval"""
+    board = Board(8, 8, 0, 0)
+    board.grid = grid
+    assert AI.evaluate_position(board) == expected
+
+
+@pytest.mark.parametrize("seed", range(3))
+def test_evaluate_position_random_games(seed):
+    """Test incremental evaluation follows moves, captures and promotions"""
+    epic_ai = AI(1)
+    for board, _ in random_game(random.Random(seed), 150):
+        assert epic_ai.evaluate_position(board) == epic_ai.evaluate_board2(board.grid)
+        assert epic_ai.evaluate_material(board) == epic_ai.evaluate_board(board.grid)
+
+
+def test_random_move_seeded_once():
+    """Test random moves differ between calls but repeat for the same seed"""
+    board = Board(8, 8, 0, 0)
+    first, second = AI(1, seed=7), AI(1, seed=7)
+    moves = [first.get_random_move(board) for _ in range(20)]
+    assert [second.get_random_move(board) for _ in range(20)] == moves
+    assert len({(piece, dest) for piece, dest, _ in moves}) > 1
+
+
+def test_depth_limit():
+    """Test depth limit caps iterative deepening within a budget"""
+    epic_ai = AI(1)
+    epic_ai.get_best_move(Board(8, 8, 0, 0), time_budget=10.0, depth=2)
+    assert epic_ai.depth_reached == 2
+
+
+HANGING = (
+    '........',
+    '........',
+    '...b....',
+    '........',
+    '.w......',
+    '........',
+    '........',
+    'b.....w.',
+)
+
+
+def capture_resolution(board, maximizing):
+    """Score of playing out forced captures without pruning"""
+    color = 1 if maximizing else 2
+    if board.white_count == 0 or board.black_count == 0 or not board.has_captures(color):
+        return AI.evaluate_position(board)
+    scores = []
+    for move in board.get_moves(color):
+        undo = board.make_move(move)
+        scores.append(capture_resolution(board, not maximizing))
+        board.unmake_move(undo)
+    return max(scores) if maximizing else min(scores)
+
+
+def test_quiescence_avoids_hanging_piece():
+    """Test depth 1 search with quiescence sees the recapture after a quiet move"""
+    board = board_from_rows(HANGING)
+    plain = AI(1, 0, quiescence=False).minimax(board, 1, True, -math.inf, math.inf)[1]
+    assert board.move_to_squares(plain)[:2] == ((4, 1), (3, 2))
+    epic_ai = AI(1, 0, quiescence=True)
+    move = epic_ai.minimax(board, 1, True, -math.inf, math.inf)[1]
+    assert board.move_to_squares(move)[:2] != ((4, 1), (3, 2))
+    assert epic_ai.qnodes > 0
+
+
+@pytest.mark.parametrize("seed", range(4))
+def test_quiescence_resolves_captures(seed):
+    """Test quiescence score equals full resolution of forced captures"""
+    checked = 0
+    for board, color in random_game(random.Random(seed), 120):
+        if board.has_captures(color):
+            epic_ai = AI(color, 0)
+            score = epic_ai.minimax(board, 0, color == 1, -math.inf, math.inf)[0]
+            assert score == capture_resolution(board, color == 1)
+            assert epic_ai.qnodes == epic_ai.nodes - 1
+            checked += 1
+    assert checked > 0
+
+
+def test_quiescence_node_budget():
+    """Test quiescence stops resolving captures when its budget is spent"""
+    board = board_from_rows(HANGING)
+    board.make_move(board.get_moves(1)[0])
+    assert board.has_captures(2)
+    epic_ai = AI(2, 0)
+    epic_ai.quiescence_nodes = 1
+    assert epic_ai.minimax(board, 0, False, -math.inf, math.inf)[0] == \
+        AI.evaluate_position(board)
+    assert epic_ai.qnodes == 1
+
+
+def test_quiescence_stats():
+    """Test quiescence nodes and depth are reported"""
+    epic_ai = AI(1)
+    epic_ai.get_best_move(board_from_rows(HANGING), None, depth=1)
+    assert epic_ai.stats.qnodes == epic_ai.qnodes > 0
+    assert epic_ai.stats.qdepth == epic_ai.qdepth >= 1
+    assert epic_ai.stats.nodes > epic_ai.stats.qnodes
+
+
+LOSING_KING = (
+    '.B...b.b',
+    '........',
+    '........',
+    '........',
+    '........',
+    '........',
+    '........',
+    '......W.',
+)
+
+
+def test_search_scores_repetition_as_draw():
+    """Test search sees the game history and values repeating the position as draw"""
+    board = board_from_rows(LOSING_KING)
+    epic_ai = AI(1)
+    epic_ai.get_best_move(board, None, depth=3)
+    assert epic_ai.stats.score < DRAW_SCORE
+    for move in [(7, 6, 6, 7), (0, 1, 1, 2), (6, 7, 7, 6), (1, 2, 0, 1)]:
+        board.apply_move(*move, [])
+    epic_ai = AI(1)
+    move = epic_ai.get_best_move(board, None, depth=3)
+    assert epic_ai.stats.score == DRAW_SCORE
+    assert move == ((7, 6), (6, 7), [])
+    assert len(board.history) == 5
+
+
+def full_minimax(board, depth, maximizing):
+    """Score of minimax without any pruning"""
+    color = 1 if maximizing else 2
+    if board.white_count == 0 or board.black_count == 0 or depth == 0:
+        return AI.evaluate_position(board)
+    scores = []
+    for move in board.get_moves(color):
+        undo = board.make_move(move)
+        scores.append(full_minimax(board, depth - 1, not maximizing))
+        board.unmake_move(undo)
+    if not scores:
+        return -math.inf if maximizing else math.inf
+    return max(scores) if maximizing else min(scores)
+
+
+@pytest.mark.parametrize("seed, pvs", [(0, True), (1, True), (2, True), (3, False)])
+def test_search_matches_full_minimax(seed, pvs):
+    """Test alpha-beta with and without PVS scores as minimax without pruning"""
+    board, color = random_position(random.Random(seed))
+    epic_ai = AI(color, 0, quiescence=False)
+    epic_ai.pvs = pvs
+    score = epic_ai.minimax(board, 4, color == 1, -math.inf, math.inf)[0]
+    assert score == full_minimax(board, 4, color == 1)
+
+
+@pytest.mark.parametrize("seed", range(3))
+def test_window_search_bounds(seed):
+    """Test score outside of the window bounds the true score from the same side"""
+    board, color = random_position(random.Random(seed))
+    maximizing = color == 1
+    exact = AI(color, 0).minimax(board, 4, maximizing, -math.inf, math.inf)[0]
+    for alpha, beta in [(exact - 1, exact + 1), (exact, exact + 1), (exact - 1, exact),
+                        (exact + 10, exact + 11), (exact - 11, exact - 10)]:
+        score = AI(color).minimax(board, 4, maximizing, alpha, beta)[0]
+        if score <= alpha:
+            assert exact <= score
+        elif score >= beta:
+            assert exact >= score
+        else:
+            assert score == exact
+
+
+@pytest.mark.parametrize("seed", range(3))
+def test_aspiration_window_keeps_score(seed):
+    """Test aspiration windows and their re-searches do not change the result"""
+    board, color = random_position(random.Random(seed))
+    results = []
+    for pvs, window in [(False, 0), (True, 0), (True, 1), (True, 50)]:
+        epic_ai = AI(color)
+        epic_ai.pvs = pvs
+        epic_ai.aspiration_window = window
+        epic_ai.get_best_move(board, None, depth=5)
+        assert epic_ai.stats.aspiration_researches == epic_ai.aspiration_researches
+        if not window:
+            assert epic_ai.aspiration_researches == 0
+        results.append(epic_ai.stats.score)
+    assert len(set(results)) == 1
+
+
+def test_pvs_researches_counted():
+    """Test moves failing high on the null window are searched again"""
+    board, color = random_position(random.Random(0))
+    epic_ai = AI(color, 0)
+    epic_ai.get_best_move(board, None, depth=6)
+    assert epic_ai.stats.researches == epic_ai.researches > 0
+    epic_ai = AI(color, 0)
+    epic_ai.pvs = False
+    epic_ai.get_best_move(board, None, depth=6)
+    assert epic_ai.researches == 0
+
+
+@pytest.mark.parametrize("seed", range(3))
+def test_selective_search_prunes(seed):
+    """Test selective options search fewer nodes, count their pruning and play legal moves"""
+    board, color = random_position(random.Random(seed))
+    full = AI(color)
+    full.get_best_move(board, None, depth=6)
+    epic_ai = AI(color)
+    epic_ai.lmr = epic_ai.futility = epic_ai.razoring = True
+    move = epic_ai.get_best_move(board, None, depth=6)
+    assert epic_ai.nodes < full.nodes
+    assert full.reductions == full.futility_pruned == full.razored == 0
+    assert epic_ai.stats.reductions == epic_ai.reductions > 0
+    assert epic_ai.stats.futility_pruned == epic_ai.futility_pruned
+    assert epic_ai.stats.reduction_researches == epic_ai.reduction_researches
+    assert epic_ai.stats.razored == epic_ai.razored
+    assert move[0] in board.get_valid_moves_all_pieces(color)
+
+
+def test_selective_margins():
+    """Test futility and razoring apply only below the root, far below alpha and when quiet"""
+    board = board_from_rows(LOSING_KING)
+    epic_ai = AI(1)
+    epic_ai.futility = epic_ai.razoring = True
+    epic_ai.root_depth = 5
+    moves = board.get_moves(1)
+    static = AI.evaluate_position(board)
+    assert epic_ai.selective_margins(board, 1, 1, static + 100, moves) == \
+        (0, static + AIConstants.FUTILITY_MARGINS[0])
+    assert epic_ai.selective_margins(board, 3, 1, static + 100, moves) == (1, None)
+    assert epic_ai.selective_margins(board, 1, 1, static, moves) == (0, None)
+    assert epic_ai.selective_margins(board, 1, 1, -math.inf, moves) == (0, None)
+    assert epic_ai.selective_margins(board, 5, 1, static + 100, moves) == (0, None)
+    epic_ai.futility = epic_ai.razoring = False
+    assert epic_ai.selective_margins(board, 1, 1, static + 100, moves) == (0, None)
+    board = board_from_rows(HANGING)
+    board.make_move(board.get_moves(1)[0])
+    epic_ai.futility = True
+    assert epic_ai.selective_margins(board, 1, -1, 100, board.get_moves(2)) == (0, None)
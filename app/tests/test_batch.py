@@ -0,0 +1,68 @@
+"""Module for testing batch evaluation"""
+import math
+import numpy as np
+import pytest
+from game.ai import AI
+from game.batch import evaluate_bitboards
+from game.batch import evaluate_grids
+from game.board import board_from_rows
+from game.evaluation import DRAW_SCORE
+from game.playout import random_boards
+from tests.test_ai import LOSING_KING
+from tests.test_board import GRID1, GRID2, GRID3
+
+
+def test_evaluate_grids():
+    """Test grid stack gives the same scores as evaluate_board2"""
+    epic_ai = AI(1)
+    grids = [GRID1, GRID2, GRID3] + [board.grid for board in random_boards(0, 20)]
+    expected = [epic_ai.evaluate_board2(grid) for grid in grids]
+    assert evaluate_grids(np.stack(grids).astype(np.int8)).tolist() == expected
+
+
+def test_evaluate_bitboards():
+    """Test packed bitboards give the same scores as evaluate_position"""
+    boards = random_boards(1, 30)
+    masks = [[board.bitboard.white for board in boards],
+             [board.bitboard.black for board in boards],
+             [board.bitboard.kings for board in boards]]
+    scores = evaluate_bitboards(*masks, boards[0].bitboard.geometry)
+    assert scores.tolist() == [AI.evaluate_position(board) for board in boards]
+
+
+@pytest.mark.parametrize('quiescence', [True, False])
+def test_batch_leaves_search(quiescence, monkeypatch):
+    """Test search scoring leaves in batches gives the same result"""
+    frontiers = []
+    score_frontier = AI.score_frontier
+    monkeypatch.setattr(AI, 'score_frontier',
+                        lambda self, *args: frontiers.append(args) or score_frontier(self, *args))
+    for board in random_boards(2, 6):
+        for depth in (1, 3):
+            batch_ai = AI(1, 0, batch_leaves=True, quiescence=quiescence)
+            assert AI(1, 0, quiescence=quiescence).minimax(board, depth, True, -math.inf,
+                                                           math.inf) == \
+                batch_ai.minimax(board, depth, True, -math.inf, math.inf)
+    assert frontiers
+
+
+def test_batch_leaves_custom_evaluation():
+    """Test batch scoring of depth 1 nodes uses the evaluation given to the AI"""
+    for board in random_boards(3, 6):
+        for depth in (1, 3):
+            expected = AI(1, 0, evaluation=AI.evaluate_material)
+            batch_ai = AI(1, 0, evaluation=AI.evaluate_material, batch_leaves=True)
+            assert batch_ai.minimax(board, depth, True, -math.inf, math.inf) == \
+                expected.minimax(board, depth, True, -math.inf, math.inf)
+
+
+@pytest.mark.parametrize('depth', [1, 3])
+def test_batch_leaves_see_draws(depth):
+    """Test batch scoring of depth 1 nodes scores repeated positions as draws"""
+    board = board_from_rows(LOSING_KING)
+    for move in [(7, 6, 6, 7), (0, 1, 1, 2), (6, 7, 7, 6), (1, 2, 0, 1)] * 2:
+        board.apply_move(*move, [])
+    expected, batch_ai = AI(1, 0), AI(1, 0, batch_leaves=True)
+    assert batch_ai.get_best_move(board, None, depth=depth) == \
+        expected.get_best_move(board, None, depth=depth)
+    assert batch_ai.stats.score == expected.stats.score == DRAW_SCORE
@@ -0,0 +1,77 @@
+"""Module for testing bitboard engine"""
+from copy import deepcopy
+import pickle
+import pytest
+from game.bitboard import BitBoard
+from game.bitboard import get_geometry
+from game.bitboard import shift
+from tests.test_board import GRID1, GRID2, GRID3
+
+
+@pytest.mark.parametrize("size", [10, 8, 6, 4])
+def test_geometry_shifts(size):
+    """Test every diagonal step is a shift landing on the right square"""
+    geometry = get_geometry(size, size)
+    assert len(geometry.bits) == size*size//2
+    dirs = [(-1, 1), (-1, -1), (1, 1), (1, -1)]
+    for (row, col), bit in geometry.bits.items():
+        for (dir_row, dir_col), amount in zip(dirs, geometry.shifts[3]):
+            dest = shift(1 << bit, amount) & geometry.valid
+            expected = geometry.mask(row + dir_row, col + dir_col)
+            assert dest == expected
+
+
+@pytest.mark.parametrize("grid", [GRID1, GRID2, GRID3])
+def test_grid_round_trip(grid):
+    """Test loading and building grid gives the same position"""
+    bitboard = BitBoard(get_geometry(8, 8))
+    bitboard.load_grid(grid)
+    assert (bitboard.to_grid() == grid).all()
+
+
+@pytest.mark.parametrize("grid, color, expected",
+                         [(GRID1, 1, 7),
+                          (GRID1, 2, 7),
+                          (GRID2, 1, 2),
+                          (GRID3, 1, 1),
+                          (GRID3, 2, 2)])
+def test_generate_moves_count(grid, color, expected):
+    """Test number of generated moves"""
+    bitboard = BitBoard(get_geometry(8, 8))
+    bitboard.load_grid(grid)
+    moves = bitboard.generate_moves(color)
+    assert sum(len(piece_moves) for piece_moves in moves.values()) == expected
+
+
+def test_geometry_is_shared():
+    """Test copies of bitboard share the geometry"""
+    bitboard = BitBoard(get_geometry(8, 8))
+    assert deepcopy(bitboard).geometry is bitboard.geometry
+    assert pickle.loads(pickle.dumps(bitboard)).geometry is bitboard.geometry
+
+
+@pytest.mark.parametrize("size", [10, 8, 6, 4])
+def test_jump_tables(size):
+    """Test jump tables hold every capture staying on the board"""
+    geometry = get_geometry(size, size)
+    dirs = [(-1, 1), (-1, -1), (1, 1), (1, -1)]
+    for (row, col), bit in geometry.bits.items():
+        expected = []
+        for dir_row, dir_col in dirs:
+            middle = geometry.mask(row + dir_row, col + dir_col)
+            dest = geometry.mask(row + 2*dir_row, col + 2*dir_col)
+            if middle and dest:
+                expected.append((middle, dest))
+        assert list(geometry.jumps[3][1 << bit]) == expected
+
+
+def test_capture_cache():
+    """Test repeated capture generation gives the same moves from the cache"""
+    bitboard = BitBoard(get_geometry(8, 8))
+    bitboard.load_grid(GRID2)
+    geometry = bitboard.geometry
+    geometry.captures.clear()
+    moves = bitboard.generate_moves(1)
+    assert any(captured for piece_moves in moves.values() for _, captured in piece_moves)
+    assert len(geometry.captures) == 1
+    assert bitboard.generate_moves(1) is moves
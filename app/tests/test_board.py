@@ -1,7 +1,12 @@
 """Module for testing board methods"""
 
+import random
 import pytest
+from game.config import DrawConstants
+from game.board import board_from_rows
+from game.board import opponent
 from game.board import Board
+from game.playout import random_game
 import numpy as np
 
 
@@ -86,6 +91,12 @@ def test_is_opponent(piece, other, expected):
     assert board.is_opponent(piece, other) == expected
 
 
+@pytest.mark.parametrize("color, expected", [(1, 2), (2, 1)])
+def test_opponent(color, expected):
+    """Test color of the other player"""
+    assert opponent(color) == expected
+
+
 GRID1 = np.array([[0, 2, 0, 2, 0, 2, 0, 2],
                   [2, 0, 2, 0, 2, 0, 2, 0],
                   [0, 2, 0, 2, 0, 2, 0, 2],
@@ -144,3 +155,96 @@ def test_get_valid_moves_all_pieces(grid, color, expected):
     board = Board(8, 8, 0, 0)
     board.grid = grid
     assert board.get_valid_moves_all_pieces(color) == expected
+
+
+def board_state(board):
+    """Snapshot of everything make/unmake has to restore"""
+    bitboard = board.bitboard
+    return (bitboard.white, bitboard.black, bitboard.kings, board.white_count,
+            board.black_count, board.winner, board.square, board.previous_square,
+            tuple(board.history), tuple(sorted(board.seen.items())), board.quiet)
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_make_unmake_move(seed):
+    """Test board is identical after make and unmake move in random games"""
+    for board, color in random_game(random.Random(seed), 150):
+        before = board_state(board)
+        grid = board.grid.copy()
+        for move in board.get_moves(color):
+            undo = board.make_move(move)
+            board.unmake_move(undo)
+            assert board_state(board) == before
+            assert (board.grid == grid).all()
+
+
+@pytest.mark.parametrize("seed", range(3))
+def test_zobrist_incremental(seed):
+    """Test incrementally kept hash equals hash computed from scratch"""
+    board = Board(8, 8, 0, 0)
+    for _ in random_game(random.Random(seed), 150, board):
+        assert board.zobrist == board.bitboard.zobrist()
+    board.remove_piece(*board.square)
+    assert board.zobrist == board.bitboard.zobrist()
+
+
+KINGS = (
+    '.B......',
+    '........',
+    '........',
+    '........',
+    '........',
+    '........',
+    '........',
+    '......W.',
+)
+
+
+def test_threefold_repetition():
+    """Test repeated king moves draw on the third occurrence with the same side to move"""
+    board = board_from_rows(KINGS)
+    shuffle = [(7, 6, 6, 7), (0, 1, 1, 2), (6, 7, 7, 6), (1, 2, 0, 1)]
+    for cycle in range(2):
+        for move in shuffle:
+            assert not board.is_draw()
+            board.apply_move(*move, [])
+        assert board.repetitions() == cycle + 2
+    assert board.is_draw()
+    assert board.quiet == 8
+    assert len(board.history) == 9
+    board.apply_move(7, 6, 6, 7, [])
+    assert board.repetitions() == 3
+
+
+def test_quiet_move_limit(monkeypatch):
+    """Test move limit counts king moves and restarts on man moves"""
+    monkeypatch.setattr(DrawConstants, 'QUIET_PLIES', 3)
+    rows = list(KINGS)
+    rows[5] = 'w.......'
+    board = board_from_rows(rows)
+    board.apply_move(7, 6, 6, 5, [])
+    board.apply_move(0, 1, 1, 2, [])
+    assert board.quiet == 2 and not board.is_draw()
+    undo = board.apply_move(6, 5, 5, 4, [])
+    assert board.is_draw()
+    board.unmake_move(undo)
+    assert board.quiet == 2 and not board.is_draw()
+    board.apply_move(5, 0, 4, 1, [])
+    assert board.quiet == 0
+
+
+def test_copy_history():
+    """Test copied history continues counting repetitions"""
+    board = board_from_rows(KINGS)
+    board.apply_move(7, 6, 6, 7, [])
+    board.apply_move(0, 1, 1, 2, [])
+    copy = board_from_rows(KINGS)
+    copy.apply_move(7, 6, 6, 7, [])
+    copy.apply_move(0, 1, 1, 2, [])
+    copy.sync()
+    assert copy.history == [board.zobrist] and copy.quiet == 0
+    copy.copy_history(board)
+    copy.apply_move(6, 7, 7, 6, [])
+    copy.apply_move(1, 2, 0, 1, [])
+    assert copy.repetitions() == 2
+    assert board.repetitions() == 1
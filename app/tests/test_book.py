@@ -0,0 +1,103 @@
+"""Module for testing opening book"""
+import random
+import pytest
+from game.ai import AI
+from game.board import Board
+from game.book import OpeningBook
+from game.book import position_key
+from game.book import write
+from game.book_builder import book_moves
+from game.book_builder import build
+
+
+@pytest.fixture(scope='module', name='book')
+def fixture_book(tmp_path_factory):
+    """Book of the first two plies keeping every move"""
+    path = str(tmp_path_factory.mktemp('book') / 'book.bin')
+    write(path, build(plies=2, depth=2, margin=1000, workers=1))
+    book = OpeningBook(path)
+    yield book
+    book.close()
+
+
+@pytest.mark.parametrize("scores, margin, expected",
+                         [([3, 1, -5], 2, [(0, 3, 3), (1, 1, 1)]),
+                          ([0, 0], 0, [(0, 0, 1), (1, 0, 1)]),
+                          ([-7], 4, [(0, -7, 5)]),
+                          ])
+def test_book_moves(scores, margin, expected):
+    """Test moves within margin are kept with weights falling with score"""
+    assert book_moves(scores, margin) == expected
+
+
+def test_lookup(book):
+    """Test book holds every move of the first two plies"""
+    board = Board(8, 8)
+    moves = board.get_moves(1)
+    assert [move for move, _, _ in book.lookup(board, 1)] == moves
+    for move in moves:
+        undo = board.make_move(move)
+        assert [entry[0] for entry in book.lookup(board, 2)] == board.get_moves(2)
+        assert book.lookup(board, 1) == []
+        board.unmake_move(undo)
+
+
+def test_lookup_matches_legal_moves(tmp_path, monkeypatch):
+    """Test book moves do not depend on the order of move generation"""
+    board = Board(8, 8)
+    move = board.get_moves(1)[1]
+    path = str(tmp_path / 'book.bin')
+    write(path, {position_key(board, 1): [(move, 3, 1)]})
+    get_moves = Board.get_moves
+    monkeypatch.setattr(Board, 'get_moves', lambda self, color: get_moves(self, color)[::-1])
+    reordered = OpeningBook(path)
+    assert reordered.lookup(board, 1) == [(move, 3, 1)]
+    reordered.close()
+
+
+def test_lookup_skips_illegal_moves(tmp_path):
+    """Test stored moves that are not legal in the position are left out"""
+    board = Board(8, 8)
+    legal = board.get_moves(1)[0]
+    path = str(tmp_path / 'book.bin')
+    write(path, {position_key(board, 1): [(legal, 5, 1), (board.get_moves(2)[0], 9, 1)]})
+    stale = OpeningBook(path)
+    assert stale.lookup(board, 1) == [(legal, 5, 1)]
+    stale.close()
+
+
+def test_not_in_book(book):
+    """Test positions after the book plies are not found"""
+    board = Board(8, 8)
+    for color in (1, 2, 1):
+        board.make_move(board.get_moves(color)[0])
+    assert book.lookup(board, 2) == []
+    assert book.choose(board, 2) is None
+    assert book.lookup(Board(10, 10), 1) == []
+
+
+def test_ai_uses_book(book):
+    """Test AI plays book moves without searching"""
+    board = Board(8, 8)
+    epic_ai = AI(1, book=book)
+    move = epic_ai.get_best_move(board)
+    assert epic_ai.nodes == 0
+    assert epic_ai.stats.source == 'book'
+    best = max(book.lookup(board, 1), key=lambda entry: entry[1])[0]
+    assert move == board.move_to_squares(best)
+
+
+def test_weighted_choice(book):
+    """Test random book choice varies and repeats for the same seed"""
+    board = Board(8, 8)
+    picks = [book.choose(board, 1, random.Random(seed)) for seed in range(30)]
+    assert len(set(picks)) > 1
+    assert picks == [book.choose(board, 1, random.Random(seed)) for seed in range(30)]
+
+
+def test_rejects_other_files(tmp_path):
+    """Test file without book header is refused"""
+    path = tmp_path / 'other.bin'
+    path.write_bytes(b'x' * 64)
+    with pytest.raises(ValueError):
+        OpeningBook(str(path))
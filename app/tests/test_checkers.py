@@ -1,7 +1,11 @@
 """Module to test checkers class"""
 
 import pytest
+from game.ai import AI
+from game.board import board_from_rows
+from game.checkers import DRAW
 from game.checkers import Checkers
+from game.config import DrawConstants
 
 
 @pytest.mark.parametrize("color, expected",
@@ -25,3 +29,21 @@ def test_change_turn():
         else:
             assert game.on_turn(1)
         game.change_turn()
+
+
+def test_king_endgame_ends_in_draw():
+    """Test AI game of lone kings ends as draw by repetition or move limit"""
+    game = Checkers()
+    game.board = board_from_rows(('.B......', '........', '........', '........',
+                                  '........', '........', '........', '......W.'))
+    game.all_pieces_valid_moves = game.board.get_valid_moves_all_pieces(game.turn)
+    players = {1: AI(1), 2: AI(2)}
+    for _ in range(DrawConstants.QUIET_PLIES):
+        if game.get_winner() is not None:
+            break
+        board = game.get_board()
+        assert board.history == game.board.history
+        game.ai_move(players[game.turn].get_best_move(board, None, depth=3))
+    assert game.get_winner() == DRAW
+    assert game.check_winner(False)
+    assert game.board.is_draw()
@@ -0,0 +1,102 @@
+"""Module for testing the text protocol engine"""
+import io
+import os
+import subprocess
+import sys
+import pytest
+from game.engine import Engine
+from game.record import position_fen
+
+
+def run(engine, *lines):
+    """Send command lines, wait for search and get output lines"""
+    engine.output.seek(0)
+    engine.output.truncate()
+    for line in lines:
+        assert engine.handle(line)
+    engine.wait()
+    return engine.output.getvalue().splitlines()
+
+
+@pytest.fixture(name='engine')
+def fixture_engine():
+    """Engine writing to memory"""
+    engine = Engine(io.StringIO())
+    yield engine
+    engine.close()
+
+
+def test_position_and_moves(engine):
+    """Test position commands set the game and moves are played in it"""
+    assert run(engine, 'position startpos moves 22-18 9-14', 'fen') == \
+        ['fen W:W18,21,23,24,25,26,27,28,29,30,31,32:B1,2,3,4,5,6,7,8,10,11,12,14']
+    assert run(engine, 'moves 18x9 5x14', 'fen') == \
+        ['fen W:W21,23,24,25,26,27,28,29,30,31,32:B1,2,3,4,6,7,8,10,11,12,14']
+    assert run(engine, 'position fen B:WK18:B1,2', 'fen') == ['fen B:WK18:B1,2']
+
+
+@pytest.mark.parametrize("line", ['position', 'position fen', 'position startpos 22-18',
+                                  'position fen W:W1', 'moves 22-17', 'moves 22-18 22-18',
+                                  'go depth', 'go speed 3', 'go depth x', 'hello'])
+def test_invalid_commands(engine, line):
+    """Test invalid commands get an error and leave the game as it was"""
+    run(engine, 'position startpos moves 24-20')
+    fen = position_fen(engine.checkers.get_position())
+    output = run(engine, line)
+    assert len(output) == 1 and output[0].startswith('error ')
+    assert position_fen(engine.checkers.get_position()) == fen
+
+
+def test_go_depth(engine):
+    """Test search sends info for every iteration and a legal best move"""
+    output = run(engine, 'position startpos moves 22-18', 'go depth 4')
+    infos = [line.split() for line in output if line.startswith('info ')]
+    assert [int(info[2]) for info in infos] == [1, 2, 3, 4]
+    assert all(info[info.index('pv') + 1] == output[-1].split()[1] for info in infos[-1:])
+    assert output[-1].startswith('bestmove ')
+    assert run(engine, 'moves ' + output[-1].split()[1], 'fen')[0].startswith('fen W:')
+
+
+def test_score_from_side_to_move(engine):
+    """Test info score is positive for the side with more material"""
+    for fen in ('W:W18,22:B1', 'B:W18:B1,5'):
+        output = run(engine, f'position fen {fen}', 'go depth 2')
+        assert int(output[-2].split()[4]) > 0
+
+
+def test_no_legal_move(engine):
+    """Test side without pieces gets bestmove none"""
+    assert run(engine, 'position fen B:W18:B', 'go depth 3')[-1] == 'bestmove none'
+
+
+def test_stop_sends_best_move(engine):
+    """Test stop ends long search, which still sends a move of a completed iteration"""
+    engine.handle('go time 60')
+    assert engine.handle('go depth 2') and 'error' in engine.output.getvalue()
+    engine.handle('stop')
+    engine.wait()
+    output = engine.output.getvalue().splitlines()
+    assert output[-1].startswith('bestmove ')
+    assert any(line.startswith('info depth 1 ') for line in output)
+
+
+def test_search_state_survives_commands(engine):
+    """Test transposition table is kept between searches and cleared by newgame"""
+    run(engine, 'position startpos', 'go depth 5')
+    assert engine.ai.table.stores > 0
+    run(engine, 'position startpos moves 22-18 9-14', 'go depth 5')
+    assert engine.ai.table.hits > 0
+    run(engine, 'newgame')
+    assert not any(engine.ai.table.slots)
+
+
+def test_process():
+    """Test engine process answers commands on stdin until quit"""
+    app_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    env = dict(os.environ, PYTHONPATH=app_dir)
+    result = subprocess.run([sys.executable, '-m', 'game.engine'], check=True, text=True,
+                            capture_output=True, timeout=60, env=env,
+                            input='isready\nposition startpos\ngo depth 2\nquit\n')
+    lines = result.stdout.splitlines()
+    assert lines[0] == 'readyok'
+    assert lines[-1].startswith('bestmove ')
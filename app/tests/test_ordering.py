@@ -0,0 +1,48 @@
+"""Module for testing move ordering"""
+import math
+from game.ai import AI
+from game.board import Board
+from game.ordering import MoveOrderer
+from tests.test_board import GRID3
+
+QUIET1 = (1, 2, ())
+QUIET2 = (4, 8, ())
+QUIET3 = (16, 32, ())
+CAPTURE = (64, 128, (256,))
+KING_CAPTURE = (64, 512, (1024,))
+
+
+def test_order_categories():
+    """Test first moves, captures, killers and history order"""
+    orderer = MoveOrderer()
+    orderer.cutoff(QUIET3, 2, 3, 1)
+    orderer.history[(4, 8)] = 100
+    moves = [QUIET1, QUIET2, QUIET3, CAPTURE, KING_CAPTURE]
+    assert orderer.order(list(moves), 2, 3, 1024) == [KING_CAPTURE, CAPTURE, QUIET3, QUIET2, QUIET1]
+    assert orderer.order(list(moves), 5, 3, 0) == [CAPTURE, KING_CAPTURE, QUIET2, QUIET3, QUIET1]
+    assert orderer.order(moves, 2, 3, 0, (QUIET1, None))[0] == QUIET1
+
+
+def test_cutoff_stats():
+    """Test cutoff counters and first move cutoff rate"""
+    orderer = MoveOrderer()
+    orderer.order([QUIET1], 0, 4, 0)
+    orderer.cutoff(QUIET1, 0, 4, 0)
+    orderer.cutoff(CAPTURE, 0, 4, 2)
+    assert orderer.stats.first_move_cutoff_rate(4) == 0.5
+    assert orderer.stats.report() == {4: (1, 2, 0.5)}
+    assert orderer.killers[0] == [QUIET1]
+    orderer.new_search()
+    assert not orderer.killers
+    assert orderer.history[(1, 2)] == 8
+
+
+def test_ordering_keeps_search_result():
+    """Test heuristics change the cost of the search, not its result"""
+    board = Board(8, 8, 0, 0)
+    board.grid = GRID3
+    plain = AI(2, 0, MoveOrderer(killers=False, history=False))
+    ordered = AI(2, 0)
+    for depth in range(1, 6):
+        assert plain.minimax(board, depth, False, -math.inf, math.inf)[0] == \
+            ordered.minimax(board, depth, False, -math.inf, math.inf)[0]
@@ -0,0 +1,50 @@
+"""Module for testing parallel root search"""
+import math
+import pytest
+from game.ai import AI
+from game.board import board_from_rows
+from game.parallel import ParallelAI
+from game.playout import random_boards
+from tests.test_ai import LOSING_KING
+
+
+@pytest.fixture(scope="module", name="parallel_ai")
+def fixture_parallel_ai():
+    """Shared pool of two workers"""
+    with ParallelAI(1, 1, workers=2) as epic_ai:
+        yield epic_ai
+
+
+@pytest.mark.parametrize("depth", [1, 3, 4])
+def test_same_result_as_sequential(parallel_ai, depth):
+    """Test parallel search finds the same move and score as sequential one"""
+    for board in random_boards(3, 4):
+        for maximizing in (True, False):
+            if not board.get_moves(1 if maximizing else 2):
+                continue
+            color = 1 if maximizing else 2
+            expected = AI(color, 0).minimax(board, depth, maximizing, -math.inf, math.inf)
+            parallel_ai.pv = []
+            assert parallel_ai.search_root(board, depth, maximizing) == expected
+
+
+def test_time_budget(parallel_ai):
+    """Test parallel iterative deepening returns legal move"""
+    board = random_boards(4, 1)[0]
+    color = parallel_ai.color
+    move = parallel_ai.get_best_move(board, 0.3)
+    if move is not None:
+        assert move[0] in board.get_valid_moves_all_pieces(color)
+        assert 1 <= len(parallel_ai.pv) <= parallel_ai.depth_reached
+
+
+def test_same_result_with_history(parallel_ai):
+    """Test workers see the game history and score a repetition as draw like sequential search"""
+    board = board_from_rows(LOSING_KING)
+    for move in [(7, 6, 6, 7), (0, 1, 1, 2), (6, 7, 7, 6), (1, 2, 0, 1)]:
+        board.apply_move(*move, [])
+    epic_ai = AI(1, 1)
+    expected = epic_ai.get_best_move(board, None, depth=3)
+    assert epic_ai.stats.score == 0
+    assert parallel_ai.get_best_move(board, None, depth=3) == expected
+    assert parallel_ai.stats.score == epic_ai.stats.score
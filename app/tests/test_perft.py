@@ -0,0 +1,38 @@
+"""Module for testing move generation by perft node counts"""
+import pytest
+from game.board import Board
+from game.board import board_from_rows
+from game.perft import START_COUNTS
+from game.perft import TRICKY
+from game.perft import divide
+from game.perft import perft
+from tests.test_board import board_state
+
+
+@pytest.mark.parametrize("squares", [False, True])
+@pytest.mark.parametrize("depth", range(1, 6))
+def test_start_position(depth, squares):
+    """Test node counts of the initial position"""
+    board = Board(8, 8)
+    state = board_state(board)
+    assert perft(board, depth, 1, squares) == START_COUNTS[depth]
+    assert board_state(board) == state
+
+
+@pytest.mark.parametrize("squares", [False, True])
+@pytest.mark.parametrize("name", list(TRICKY))
+def test_tricky_positions(name, squares):
+    """Test node counts of capture chain positions"""
+    rows, color, counts = TRICKY[name]
+    board = board_from_rows(rows)
+    for depth in range(1, 7):
+        assert perft(board, depth, color, squares) == counts[depth]
+
+
+@pytest.mark.parametrize("depth", [1, 3, 4])
+def test_divide(depth):
+    """Test divide splits perft between root moves"""
+    board = Board(8, 8)
+    counts = divide(board, depth, 1)
+    assert len(counts) == START_COUNTS[1]
+    assert sum(counts.values()) == START_COUNTS[depth]
@@ -0,0 +1,57 @@
+"""Module for testing position value type"""
+from copy import deepcopy
+import pickle
+import random
+import pytest
+from game.board import Board
+from game.playout import random_game
+from game.position import Position
+from tests.test_board import board_state
+
+
+def random_positions(seed, count=40):
+    """Positions of one random game with their boards"""
+    return [(Position.from_board(board, color), board_state(board)[:6])
+            for board, color in random_game(random.Random(seed), count)]
+
+
+@pytest.mark.parametrize("seed", range(3))
+def test_board_round_trip(seed):
+    """Test converting to board and back keeps the position"""
+    for position, state in random_positions(seed):
+        board = position.to_board()
+        assert board_state(board)[:6] == state
+        assert Position.from_board(board, position.turn) == position
+
+
+@pytest.mark.parametrize("seed", range(3))
+def test_zobrist(seed):
+    """Test position hash equals incremental board hash with side key"""
+    for position, _ in random_positions(seed):
+        board = position.to_board()
+        key = board.zobrist
+        if position.turn == 2:
+            key ^= board.bitboard.geometry.side_key
+        assert position.zobrist() == key
+
+
+def test_value_semantics():
+    """Test positions compare and hash by value and can't be changed"""
+    board = Board(8, 8)
+    white, black = Position.from_board(board, 1), Position.from_board(board, 2)
+    assert white == Position.from_board(Board(8, 8), 1)
+    assert white != black
+    assert len({white, black, Position.from_board(board, 1)}) == 2
+    with pytest.raises(AttributeError):
+        white.turn = 2
+    with pytest.raises(AttributeError):
+        white.extra = 1
+    assert deepcopy(white) is white
+
+
+def test_pickle():
+    """Test pickled position is small and equal after loading"""
+    position = Position.from_board(Board(8, 8), 2)
+    data = pickle.dumps(position)
+    assert pickle.loads(data) == position
+    assert len(data) < 100
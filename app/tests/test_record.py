@@ -0,0 +1,176 @@
+"""Module for testing game records"""
+import random
+import re
+import pytest
+from game.ai import AI
+from game.board import board_from_rows
+from game.checkers import DRAW
+from game.checkers import Checkers
+from game.config import StoneEnum
+from game.record import GameRecord
+from game.record import GameRecorder
+from game.record import GameWriter
+from game.record import Verbosity
+from game.record import move_text
+from game.record import number_square
+from game.record import parse_fen
+from game.record import parse_move
+from game.record import position_fen
+from game.record import read_games
+from game.record import replay
+from game.record import square_number
+
+# black man on (2, 3) captures to (6, 3) over either side
+TWO_PATHS = (
+    '.b.....b',
+    'b.b...b.',
+    '.b.b.b..',
+    '..w.w...',
+    '...w....',
+    'w.w.w...',
+    '........',
+    'w.w.w...',
+)
+
+
+def play_random_game(recorder, seed: int, max_plies: int = 200) -> Checkers:
+    """Play game of AI against random moves, recording it"""
+    rng = random.Random(seed)
+    checkers = Checkers(recorder=recorder)
+    epic_ai = AI(StoneEnum.WHITE.value)
+    for _ in range(max_plies):
+        if checkers.get_winner() is not None:
+            break
+        if checkers.on_turn(StoneEnum.WHITE.value):
+            move = epic_ai.get_best_move(checkers.get_board(), None, depth=2)
+            checkers.ai_move(move, epic_ai.stats)
+        else:
+            piece = rng.choice(list(checkers.all_pieces_valid_moves))
+            dest, captured_pieces = rng.choice(checkers.all_pieces_valid_moves[piece])
+            checkers.ai_move((piece, dest, captured_pieces))
+    return checkers
+
+
+@pytest.mark.parametrize("rows, cols", [(8, 8), (10, 10), (6, 8)])
+def test_square_numbers(rows, cols):
+    """Test PDN numbers cover dark squares in order"""
+    squares = [(row, col) for row in range(rows) for col in range(cols) if (row + col) % 2]
+    assert [square_number(cols, *square) for square in squares] == \
+        list(range(1, len(squares) + 1))
+    assert [number_square(cols, number) for number in range(1, len(squares) + 1)] == squares
+
+
+def test_start_moves():
+    """Test notation of first moves"""
+    checkers = Checkers()
+    texts = sorted(move_text(8, (piece, dest, captured), checkers.all_pieces_valid_moves)
+                   for piece, moves in checkers.all_pieces_valid_moves.items()
+                   for dest, captured in moves)
+    assert texts == ['21-17', '22-17', '22-18', '23-18', '23-19', '24-19', '24-20']
+
+
+def test_ambiguous_capture():
+    """Test captures ending on the same square are written with landing squares"""
+    board = board_from_rows(TWO_PATHS)
+    valid_moves = board.get_valid_moves_all_pieces(StoneEnum.BLACK.value)
+    texts = []
+    for dest, captured in valid_moves[(2, 3)]:
+        text = move_text(8, ((2, 3), dest, captured), valid_moves)
+        assert parse_move(8, text, valid_moves) == ((2, 3), tuple(dest), captured)
+        texts.append(text)
+    assert sorted(texts) == ['10x17x26', '10x19x26']
+    with pytest.raises(ValueError):
+        parse_move(8, '10x26', {})
+
+
+@pytest.mark.parametrize("seed", [0, 1, 2])
+def test_record_replay(seed):
+    """Test written game reads back and replays to the same position"""
+    recorder = GameRecorder(verbosity=Verbosity.SEARCH, tags={'White': 'AI'})
+    checkers = play_random_game(recorder, seed)
+    record = checkers.finish_record()
+    assert record.tags['Result'] == {StoneEnum.WHITE.value: '1-0', StoneEnum.BLACK.value: '0-1',
+                                     DRAW: '1/2-1/2', None: '*'}[checkers.get_winner()]
+    games = read_games(record.to_pdn() * 2)
+    assert len(games) == 2
+    assert games[1].moves == record.moves
+    assert games[1].tags == record.tags
+    replayed = replay(games[1])
+    assert replayed.view is None
+    assert replayed.get_position() == checkers.get_position()
+    assert replayed.move_count == checkers.move_count
+
+
+@pytest.mark.parametrize("verbosity, comment", [(Verbosity.MOVES, r''),
+                                                (Verbosity.TIMING, r'\d+\.\d{3}s'),
+                                                (Verbosity.SEARCH, r'\d+\.\d{3}s search .* nodes=\d+')])
+def test_verbosity(verbosity, comment):
+    """Test comments follow verbosity level"""
+    recorder = GameRecorder(verbosity=verbosity)
+    play_random_game(recorder, 0, max_plies=4)
+    text, white_comment = recorder.record.moves[0]
+    assert text
+    assert re.fullmatch(comment, white_comment)
+    assert 'nodes=' not in recorder.record.moves[1][1]
+
+
+def test_recording_off():
+    """Test verbosity OFF records nothing"""
+    recorder = GameRecorder(verbosity=Verbosity.OFF)
+    checkers = play_random_game(recorder, 0, max_plies=4)
+    assert recorder.record.moves == []
+    assert checkers.move_count == 2
+
+
+def test_no_output(capsys):
+    """Test game and search print nothing"""
+    play_random_game(None, 0, max_plies=6)
+    assert capsys.readouterr().out == ''
+
+
+def test_writer_buffers(tmp_path):
+    """Test games reach the file when buffer is full or writer closed"""
+    path = tmp_path / 'games.pdn'
+    record = GameRecord(8, 8)
+    record.add('22-18', '0.100s')
+    with GameWriter(str(path), buffer_games=2) as writer:
+        writer.write(record)
+        assert not path.exists()
+        writer.write(record)
+        assert len(read_games(path.read_text())) == 2
+        writer.write(record)
+    assert [game.moves for game in read_games(path.read_text())] == [record.moves] * 3
+
+
+@pytest.mark.parametrize("seed", range(3))
+def test_fen_round_trip(seed):
+    """Test FEN keeps pieces, kings and side to move of random game positions"""
+    rng = random.Random(seed)
+    checkers = Checkers()
+    for _ in range(rng.randint(20, 60)):
+        if not checkers.all_pieces_valid_moves or checkers.get_winner() is not None:
+            break
+        piece = rng.choice(list(checkers.all_pieces_valid_moves))
+        dest, captured_pieces = rng.choice(checkers.all_pieces_valid_moves[piece])
+        checkers.ai_move((piece, dest, captured_pieces))
+    position = checkers.get_position()
+    assert parse_fen(position_fen(position)) == position
+
+
+def test_start_fen():
+    """Test FEN of the initial position and of kings"""
+    assert position_fen(Checkers().get_position()) == \
+        'W:W21,22,23,24,25,26,27,28,29,30,31,32:B1,2,3,4,5,6,7,8,9,10,11,12'
+    position = parse_fen('B:WK5:B1,K32')
+    assert position.turn == StoneEnum.BLACK.value
+    board = position.to_board()
+    assert board.get_piece(*number_square(8, 5)) == StoneEnum.WHITE_KING.value
+    assert board.get_piece(*number_square(8, 32)) == StoneEnum.BLACK_KING.value
+    assert board.get_piece(*number_square(8, 1)) == StoneEnum.BLACK.value
+
+
+@pytest.mark.parametrize("text", ['X:W1:B2', 'W:W1', 'W:W33:B1', 'W:W1,2:B2', 'W:Wa:B1'])
+def test_malformed_fen(text):
+    """Test FEN errors are reported as ValueError"""
+    with pytest.raises(ValueError):
+        parse_fen(text)
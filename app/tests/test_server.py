@@ -0,0 +1,232 @@
+"""Module for testing the game server"""
+import asyncio
+import json
+import os
+import random
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+import pytest
+from game.server import GameServer
+from game.server import Overloaded
+from game.server import Scheduler
+from game.server import percentile
+
+
+@pytest.mark.parametrize("samples, fraction, expected",
+                         [([], 0.5, 0.0),
+                          ([3, 1, 2], 0.5, 2),
+                          (list(range(1, 101)), 0.9, 90),
+                          (list(range(1, 101)), 0.99, 99),
+                          ([5, 1], 1.0, 5)
+                          ])
+def test_percentile(samples, fraction, expected):
+    """Test nearest rank percentiles"""
+    assert percentile(samples, fraction) == expected
+
+
+def test_scheduler_takes_clients_in_turn():
+    """Test queued jobs of a busy client do not delay other clients"""
+    started = []
+
+    async def scenario():
+        with ThreadPoolExecutor(1) as executor:
+            scheduler = Scheduler(executor, workers=1)
+            futures = [scheduler.submit('a', started.append, f'a{index}') for index in range(4)]
+            futures += [scheduler.submit('b', started.append, f'b{index}') for index in range(2)]
+            assert scheduler.queued == 5
+            await asyncio.gather(*futures)
+            assert scheduler.metrics.moves == 6
+    asyncio.run(scenario())
+    assert started == ['a0', 'a1', 'b0', 'a2', 'b1', 'a3']
+
+
+def test_scheduler_limit():
+    """Test full queue refuses jobs and jobs of a dropped client are cancelled"""
+    release = threading.Event()
+
+    async def scenario():
+        with ThreadPoolExecutor(1) as executor:
+            scheduler = Scheduler(executor, workers=1, limit=2)
+            running = scheduler.submit('a', release.wait)
+            queued = [scheduler.submit('a', abs, -1), scheduler.submit('b', abs, -2)]
+            with pytest.raises(Overloaded):
+                scheduler.submit('c', abs, -3)
+            assert scheduler.metrics.rejected == 1
+            scheduler.drop('a')
+            assert queued[0].cancelled() and scheduler.queued == 1
+            release.set()
+            assert await running
+            assert await queued[1] == 2
+            assert scheduler.running == scheduler.queued == 0
+    asyncio.run(scenario())
+
+
+class Client:
+    """Test connection sending one request at a time"""
+
+    def __init__(self, reader, writer) -> None:
+        self.reader = reader
+        self.writer = writer
+
+    async def send(self, line: bytes) -> dict:
+        """Send raw line and read reply"""
+        self.writer.write(line + b'\n')
+        await self.writer.drain()
+        return json.loads(await self.reader.readline())
+
+    async def request(self, **request) -> dict:
+        """Send request and read its reply"""
+        return await self.send(json.dumps(request).encode())
+
+
+def serve(scenario, executor=None):
+    """Run scenario(game_server, connect) against a server with one worker process"""
+    async def main():
+        game_server = GameServer(workers=1, executor=executor)
+        server = await game_server.start('127.0.0.1', 0)
+        port = server.sockets[0].getsockname()[1]
+
+        async def connect():
+            return Client(*await asyncio.open_connection('127.0.0.1', port))
+        try:
+            await scenario(game_server, connect)
+        finally:
+            server.close()
+            game_server.close()
+    asyncio.run(main())
+
+
+def test_game_against_ai():
+    """Test random game against the AI is played to its result and counted"""
+    async def scenario(game_server, connect):
+        client = await connect()
+        state = await client.request(op='new', ai='white', time=0.01, depth=1, id=7)
+        assert state['ok'] and state['id'] == 7 and state['reply']
+        assert state['turn'] == 'black' and state['legal']
+        rng = random.Random(0)
+        while state['result'] is None:
+            move = rng.choice(state['legal'])
+            state = await client.request(op='move', session=state['session'], move=move)
+            assert state['ok']
+        assert state['result'] in ('1-0', '0-1', '1/2-1/2')
+        assert (await client.request(op='state', session=state['session']))['fen'] == \
+            state['fen']
+        metrics = (await client.request(op='metrics'))['metrics']
+        assert metrics['games'] == 1 and metrics['moves'] > 0
+        assert metrics['latency_ms']['p50'] <= metrics['latency_ms']['p99']
+        assert metrics['sessions'] == 1 and metrics['queued'] == 0
+        assert (await client.request(op='close', session=state['session']))['ok']
+        assert not game_server.sessions
+    serve(scenario)
+
+
+@pytest.mark.parametrize("request_line, error",
+                         [(b'not json', 'Expecting value'),
+                          (b'[1]', 'request must be an object'),
+                          (b'{"op": "fly"}', 'unknown op fly'),
+                          (b'{"op": "new", "ai": "red"}', 'ai must be white or black'),
+                          (b'{"op": "new", "time": NaN}', 'time must be a positive number'),
+                          (b'{"op": "new", "time": -1}', 'time must be a positive number'),
+                          (b'{"op": "new", "time": Infinity}', 'time must be a positive number'),
+                          (b'{"op": "move", "session": "s9", "move": "22-18"}', 'unknown session'),
+                          (b'{"op": "move", "session": "s1", "move": "22-10"}', 'illegal move')])
+def test_request_errors(request_line, error):
+    """Test invalid requests are answered with errors and leave the game as it was"""
+    async def scenario(game_server, connect):
+        client = await connect()
+        state = await client.request(op='new', ai='black')
+        reply = await client.send(request_line)
+        assert not reply['ok'] and error in reply['error']
+        assert (await client.request(op='state', session='s1'))['fen'] == state['fen']
+    serve(scenario)
+
+
+def test_sessions_belong_to_connection():
+    """Test other connections cannot use a session, which ends with its connection"""
+    async def scenario(game_server, connect):
+        owner, other = await connect(), await connect()
+        await owner.request(op='new', ai='black')
+        reply = await other.request(op='move', session='s1', move='22-18')
+        assert reply['error'] == 'unknown session s1'
+        owner.writer.close()
+        await owner.writer.wait_closed()
+        for _ in range(100):
+            if not game_server.sessions:
+                break
+            await asyncio.sleep(0.01)
+        assert not game_server.sessions
+    serve(scenario)
+
+
+def test_overloaded_move_is_not_played():
+    """Test move refused by a full queue leaves the game unchanged"""
+    async def scenario(game_server, connect):
+        client = await connect()
+        state = await client.request(op='new', ai='black')
+        game_server.scheduler.limit = 0
+        reply = await client.request(op='move', session='s1', move=state['legal'][0])
+        assert reply == {'ok': False, 'error': 'overloaded'}
+        assert (await client.request(op='state', session='s1'))['fen'] == state['fen']
+        assert game_server.metrics.rejected == 1
+    serve(scenario)
+
+
+def test_failed_search_is_answered(monkeypatch):
+    """Test worker failure is answered with an error and ends the game"""
+    def broken(*args):
+        raise BrokenProcessPool('worker died')
+    monkeypatch.setattr('game.server.search_move', broken)
+
+    async def scenario(game_server, connect):
+        client = await connect()
+        reply = await client.request(op='new', ai='white', id=1)
+        assert reply == {'ok': False, 'error': "search failed: BrokenProcessPool('worker died')",
+                         'id': 1}
+        assert not game_server.sessions
+        state = await client.request(op='new', ai='black')
+        reply = await client.request(op='move', session=state['session'], move=state['legal'][0])
+        assert not reply['ok'] and reply['error'].startswith('search failed')
+        assert not game_server.sessions
+        assert (await client.request(op='metrics'))['ok']
+    with ThreadPoolExecutor(1) as executor:
+        serve(scenario, executor)
+
+
+def test_failed_search_of_closed_session(monkeypatch):
+    """Test search failing after its session was closed is still answered as failed"""
+    release = threading.Event()
+
+    def failing(*args):
+        release.wait()
+        raise RuntimeError('worker died')
+    monkeypatch.setattr('game.server.search_move', failing)
+
+    async def scenario(game_server, connect):
+        client = await connect()
+        state = await client.request(op='new', ai='black')
+        move = {'op': 'move', 'session': state['session'], 'move': state['legal'][0], 'id': 1}
+        client.writer.write(json.dumps(move).encode() + b'\n')
+        assert (await client.request(op='close', session=state['session'], id=2))['ok']
+        release.set()
+        reply = json.loads(await client.reader.readline())
+        assert reply['id'] == 1 and reply['error'].startswith('search failed')
+    with ThreadPoolExecutor(1) as executor:
+        serve(scenario, executor)
+
+
+def test_broken_pool_is_replaced():
+    """Test moves are searched again after a worker process died"""
+    async def scenario(game_server, connect):
+        client = await connect()
+        state = await client.request(op='new', ai='black', time=0.01, depth=1)
+        with pytest.raises(BrokenProcessPool):
+            await game_server.scheduler.submit('killer', os._exit, 1)
+        state = await client.request(op='move', session=state['session'], move=state['legal'][0])
+        assert state['ok'] and state['reply']
+        with pytest.raises(BrokenProcessPool):
+            await asyncio.wrap_future(game_server.executor.submit(os._exit, 1))
+        state = await client.request(op='move', session=state['session'], move=state['legal'][0])
+        assert state['ok'] and state['reply']
+        assert game_server.scheduler.executor is game_server.executor
+    serve(scenario)
@@ -0,0 +1,77 @@
+"""Module for testing search statistics and sinks"""
+import json
+import logging
+import pytest
+from game.ai import AI
+from game.board import Board
+from game.config import StoneEnum
+from game.stats import JsonlSink
+from game.stats import LoggerSink
+from game.stats import MemorySink
+from game.stats import SearchStats
+
+
+def test_stats_without_sink():
+    """Test search fills stats without profiling when no sink is given"""
+    epic_ai = AI(StoneEnum.WHITE.value)
+    board = Board(8, 8)
+    move = epic_ai.get_best_move(board, None, depth=4)
+    stats = epic_ai.stats
+    assert stats.source == 'search'
+    assert stats.depth == 4
+    assert stats.pv[0] == move
+    assert stats.nodes == epic_ai.nodes
+    assert len(stats.iteration_nodes) == 4
+    assert 0 < stats.leaves < stats.nodes
+    assert stats.cutoffs > 0
+    assert stats.timings == {} and stats.evaluations == 0
+    assert 'get_moves' not in vars(board)
+
+
+@pytest.mark.parametrize("depth", [3, 5])
+def test_profiled_search_matches(depth):
+    """Test profiling changes neither the move nor the node count"""
+    sink = MemorySink()
+    plain, profiled = AI(StoneEnum.WHITE.value), AI(StoneEnum.WHITE.value, sink=sink)
+    board = Board(8, 8)
+    assert plain.get_best_move(board, None, depth=depth) == \
+        profiled.get_best_move(board, None, depth=depth)
+    assert sink.records == [profiled.stats]
+    stats = profiled.stats
+    assert stats.nodes == plain.stats.nodes
+    assert set(stats.timings) == {'movegen', 'make_unmake', 'evaluation'}
+    assert 0 < stats.evaluations <= stats.leaves
+    assert sum(stats.timings.values()) <= stats.seconds
+    assert profiled.evaluate == profiled.evaluate_position
+    assert not {'get_moves', 'make_move', 'unmake_move'} & set(vars(board))
+
+
+def test_branching_factor():
+    """Test effective branching factor is node growth of the last iteration"""
+    stats = SearchStats(StoneEnum.WHITE.value, 'search')
+    stats.iteration_nodes = [7, 30, 90]
+    assert stats.branching_factor == 3
+    stats.iteration_nodes, stats.nodes, stats.depth = [], 64, 3
+    assert stats.branching_factor == pytest.approx(4)
+
+
+def test_jsonl_sink(tmp_path):
+    """Test every search is written as one JSON line"""
+    path = tmp_path / 'stats.jsonl'
+    with JsonlSink(str(path)) as sink:
+        epic_ai = AI(StoneEnum.WHITE.value, sink=sink)
+        epic_ai.get_best_move(Board(8, 8), None, depth=2)
+        epic_ai.get_best_move(Board(8, 8), None, depth=3)
+    records = [json.loads(line) for line in path.read_text().splitlines()]
+    assert [record['depth'] for record in records] == [2, 3]
+    assert records[1]['nodes'] == sum(records[1]['iteration_nodes'])
+    assert 'other' in records[1]['timings']
+
+
+def test_logger_sink(caplog):
+    """Test logger sink logs one line per search"""
+    epic_ai = AI(StoneEnum.WHITE.value, sink=LoggerSink())
+    with caplog.at_level(logging.INFO, logger='game.search'):
+        epic_ai.get_best_move(Board(8, 8), None, depth=2)
+    assert len(caplog.records) == 1
+    assert json.loads(caplog.records[0].getMessage().split(' ', 1)[1])['depth'] == 2
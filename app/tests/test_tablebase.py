@@ -0,0 +1,141 @@
+"""Module for testing endgame tablebase"""
+import random
+import pytest
+from game.ai import AI
+from game.board import Board
+from game.board import board_from_rows
+from game.tablebase import Outcome
+from game.tablebase import Tablebase
+from game.tablebase import decode
+from game.tablebase import encode
+from game.tablebase import generate
+from game.tablebase import negate
+from game.tablebase import preference
+from game.tablebase import write
+
+TWO_KINGS = ('........',
+             '........',
+             '........',
+             '....W...',
+             '........',
+             '..W.....',
+             '........',
+             '......B.')
+
+
+@pytest.fixture(scope='module', name='tablebase')
+def fixture_tablebase(tmp_path_factory):
+    """Tablebase of all positions with up to 3 pieces"""
+    path = str(tmp_path_factory.mktemp('tablebase') / 'tb3.bin')
+    write(path, generate(3), 3)
+    tablebase = Tablebase(path)
+    yield tablebase
+    tablebase.close()
+
+
+@pytest.mark.parametrize("outcome, dtc", [(Outcome.WIN, 1), (Outcome.WIN, 127),
+                                          (Outcome.LOSS, 0), (Outcome.LOSS, 40),
+                                          (Outcome.DRAW, 0)])
+def test_encode_decode(outcome, dtc):
+    """Test value byte round trip"""
+    value = encode(outcome, dtc)
+    assert 0 <= value < 256
+    assert decode(value) == (outcome, dtc)
+
+
+def test_index_is_unique(tablebase):
+    """Test every legal position has its own slot"""
+    indexer = tablebase.indexer
+    seen = set()
+    for pieces in (2, 3):
+        for signature in indexer.signatures(pieces):
+            for index, white, black, kings in indexer.positions(signature):
+                assert index == indexer.index(white, black, kings)
+                assert 0 <= index < indexer.size
+                seen.add(index)
+    assert len(seen) > indexer.size // 2
+
+
+@pytest.mark.parametrize("rows, white, black", [
+    (TWO_KINGS, (Outcome.WIN, 21), (Outcome.LOSS, 22)),
+    (('........', '........', '........', '....W...',
+      '........', '........', '........', '......B.'), (Outcome.DRAW, 0), (Outcome.DRAW, 0)),
+    (('........', '........', '........', '........',
+      '........', '........', '.b......', 'w.w.....'), (Outcome.WIN, 1), (Outcome.LOSS, 0)),
+])
+def test_known_positions(tablebase, rows, white, black):
+    """Test results of hand checked endgames for both sides to move"""
+    board = board_from_rows(rows)
+    assert decode(tablebase.probe(board, 1)) == white
+    assert decode(tablebase.probe(board, 2)) == black
+
+
+@pytest.mark.parametrize("seed", range(3))
+def test_consistent_with_moves(tablebase, seed):
+    """Test value of random positions is the best value over their moves"""
+    rng = random.Random(seed)
+    indexer = tablebase.indexer
+    positions = [position for signature in indexer.signatures(3)
+                 for position in indexer.positions(signature)]
+    for _, white, black, kings in rng.sample(positions, 300):
+        board = Board(8, 8)
+        board.bitboard.white, board.bitboard.black, board.bitboard.kings = white, black, kings
+        board.sync()
+        for color in (1, 2):
+            moves = board.get_moves(color)
+            values = []
+            for move in moves:
+                undo = board.make_move(move)
+                values.append(negate(tablebase.probe(board, 3 - color)))
+                board.unmake_move(undo)
+            if not values:
+                expected = encode(Outcome.LOSS, 0)
+            else:
+                expected = max(values, key=preference)
+                if moves[0][2]:  # capture converts, distance starts again
+                    expected = encode(decode(expected)[0], 1)
+            assert tablebase.probe(board, color) == expected
+
+
+def test_not_covered(tablebase):
+    """Test positions with more pieces are not probed"""
+    board = Board(8, 8)
+    assert tablebase.probe(board, 1) is None
+    assert tablebase.score(board, 1) is None
+    assert tablebase.best_move(board, 1) is None
+
+
+def test_ai_plays_tablebase_win(tablebase):
+    """Test AI follows the tablebase to the win"""
+    board = board_from_rows(TWO_KINGS)
+    players = {1: AI(1, tablebase=tablebase), 2: AI(2, tablebase=tablebase)}
+    assert players[1].minimax(board, 3, True, -1e9, 1e9)[0] == tablebase.score(board, 1) > 0
+    color = 1
+    for _ in range(22):
+        move = players[color].get_best_move(board, None, depth=1)
+        if move is None:
+            break
+        piece, dest, captured_pieces = move
+        board.apply_move(*piece, *dest, captured_pieces)
+        color = 3 - color
+    assert board.get_winner() == 1 or not board.get_moves(2)
+
+
+def test_rejects_other_files(tmp_path):
+    """Test file without tablebase header is refused"""
+    path = tmp_path / 'other.bin'
+    path.write_bytes(b'x' * 64)
+    with pytest.raises(ValueError):
+        Tablebase(str(path))
+
+
+def test_batch_leaves_probe_tablebase(tablebase):
+    """Test batch scoring of depth 1 nodes probes the tablebase like the normal search"""
+    board = board_from_rows(('........', '........', '...b....', '....W...',
+                             '........', '..W.....', '........', '......B.'))
+    assert tablebase.score(board, 1) is None
+    for depth in (1, 2, 3):
+        expected = AI(1, 0, tablebase=tablebase)
+        batch_ai = AI(1, 0, tablebase=tablebase, batch_leaves=True)
+        assert batch_ai.minimax(board, depth, True, -1e9, 1e9) == \
+            expected.minimax(board, depth, True, -1e9, 1e9)
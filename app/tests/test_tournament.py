@@ -0,0 +1,99 @@
+"""Module for testing self-play tournament runner"""
+import math
+import pytest
+from game.board import Board
+from game.tournament import EngineConfig
+from game.tournament import MatchResult
+from game.tournament import elo_from_score
+from game.tournament import make_openings
+from game.tournament import play_game
+from game.tournament import run_match
+from game.tournament import score_from_elo
+
+FAST = EngineConfig('fast', depth=1, table_size_mb=1)
+
+
+@pytest.mark.parametrize("elo", [-300, -50, 0, 10, 200])
+def test_elo_score_roundtrip(elo):
+    """Test Elo and expected score conversions are inverse"""
+    assert elo_from_score(score_from_elo(elo)) == pytest.approx(elo)
+
+
+@pytest.mark.parametrize("wins, draws, losses, score, elo",
+                         [(10, 0, 10, 0.5, 0.0),
+                          (3, 2, 1, 2 / 3, 120.4),
+                          (0, 0, 5, 0.0, -math.inf),
+                          ])
+def test_match_result(wins, draws, losses, score, elo):
+    """Test score and Elo of match result"""
+    result = MatchResult(wins, draws, losses)
+    assert result.score() == pytest.approx(score)
+    assert result.elo()[0] == pytest.approx(elo, abs=0.1)
+
+
+def test_elo_interval():
+    """Test confidence interval contains estimate and shrinks with more games"""
+    small, large = MatchResult(30, 40, 20), MatchResult(300, 400, 200)
+    for result in (small, large):
+        elo, low, high = result.elo()
+        assert low < elo < high
+    assert large.elo()[2] - large.elo()[1] < small.elo()[2] - small.elo()[1]
+
+
+@pytest.mark.parametrize("wins, draws, losses, expected",
+                         [(600, 200, 200, True),
+                          (200, 200, 600, False),
+                          (10, 10, 10, None),
+                          (0, 0, 0, None),
+                          ])
+def test_sprt(wins, draws, losses, expected):
+    """Test SPRT accepts H1, H0 or continues"""
+    assert MatchResult(wins, draws, losses).sprt(0, 10) is expected
+
+
+def test_parse_engine():
+    """Test engine spec parsing"""
+    config = EngineConfig.parse('name=new,depth=5,time=0.5,eval=material,tt=8')
+    assert config == EngineConfig('new', 5, 0.5, 'material', 8.0)
+    config = EngineConfig.parse('name=sel,lmr=1,fut=1,razor=0')
+    assert (config.lmr, config.futility, config.razoring) == (True, True, False)
+    epic_ai = config.make_ai(1)
+    assert (epic_ai.lmr, epic_ai.futility, epic_ai.razoring) == (True, True, False)
+    with pytest.raises(ValueError):
+        EngineConfig.parse('depth=5,speed=3')
+    with pytest.raises(ValueError):
+        EngineConfig.parse('eval=magic')
+
+
+def test_openings_distinct_and_legal():
+    """Test openings are legal move sequences reaching distinct positions"""
+    openings = make_openings(10, plies=4, seed=1)
+    assert len(openings) == 10
+    positions = set()
+    for opening in openings:
+        board = Board(8, 8)
+        color = 1
+        for move in opening:
+            assert move in board.get_moves(color)
+            board.make_move(move)
+            color = 3 - color
+        positions.add(board.zobrist)
+    assert len(positions) == 10
+    assert make_openings(10, plies=4, seed=1) == openings
+
+
+def test_play_game():
+    """Test game between fixed depth engines finishes with a result"""
+    opening = make_openings(1, seed=3)[0]
+    result = play_game(FAST, FAST, opening, max_plies=60)
+    assert result in (-1, 0, 1)
+    assert play_game(FAST, FAST, opening, max_plies=60) == result
+    assert play_game(FAST, FAST, opening, max_plies=len(opening)) == 0
+
+
+def test_run_match():
+    """Test match counts every game and deeper search is not weaker"""
+    deeper = EngineConfig('deeper', depth=3, table_size_mb=1)
+    result = run_match(deeper, FAST, games=6, workers=1, max_plies=80)
+    assert result.games == 6
+    assert result.wins >= result.losses
@@ -0,0 +1,38 @@
+"""Module for testing transposition table"""
+from game.transposition import Bound
+from game.transposition import TranspositionTable
+
+
+def test_probe_and_counters():
+    """Test stored entry is found and counters are updated"""
+    table = TranspositionTable(1)
+    assert table.probe(42) is None
+    table.store(42, 3, Bound.EXACT, 10, None)
+    assert table.probe(42) == (42, 3, Bound.EXACT, 10, None)
+    assert table.probe(42 + table.buckets) is None
+    stats = table.stats()
+    assert (stats['hits'], stats['misses'], stats['collisions']) == (1, 2, 1)
+
+
+def test_replacement_policy():
+    """Test deep entries stay and shallow ones go to always-replace slot"""
+    table = TranspositionTable(1)
+    key, other, third = 1, 1 + table.buckets, 1 + 2*table.buckets
+    table.store(key, 5, Bound.EXACT, 1, None)
+    table.store(other, 2, Bound.LOWER, 2, None)
+    assert table.probe(key)[1] == 5
+    assert table.probe(other)[1] == 2
+    table.store(third, 1, Bound.UPPER, 3, None)
+    assert table.probe(key) is not None
+    assert table.probe(other) is None
+    table.store(other, 6, Bound.EXACT, 4, None)
+    assert table.probe(other)[1] == 6
+    assert table.probe(key) is None
+
+
+def test_memory_cap():
+    """Test number of slots follows configured size"""
+    small = TranspositionTable(1)
+    large = TranspositionTable(4)
+    assert abs(large.buckets - 4 * small.buckets) < 4
+    assert len(small.slots) * TranspositionTable.ENTRY_SIZE <= 2**20
@@ -0,0 +1,55 @@
+"""Module for testing dirty rectangle rendering"""
+import pygame
+import pytest
+from game.board import Board
+from game.config import SizeConstants as const
+from view.game_view import BoardView
+
+
+@pytest.fixture(name="view")
+def fixture_view():
+    """Board view drawing into off-screen surface"""
+    pygame.init()
+    return BoardView(pygame.Surface((const.WIDTH, const.HEIGHT)))
+
+
+def test_first_render_is_full(view):
+    """Test first render and render after invalidate cover the whole board"""
+    board = Board(8, 8)
+    assert view.render(board) == [pygame.Rect(0, 0, const.WIDTH, const.HEIGHT)]
+    assert view.render(board) == []
+    view.invalidate()
+    assert view.render(board) == [pygame.Rect(0, 0, const.WIDTH, const.HEIGHT)]
+
+
+def test_render_changed_squares(view):
+    """Test only squares of the move, highlights and marks are redrawn"""
+    board = Board(8, 8)
+    view.render(board)
+    board.apply_move(5, 0, 4, 1, [])
+    rects = view.render(board, [board.square, board.previous_square])
+    assert sorted(rects) == sorted([view.square_rect(5, 0), view.square_rect(4, 1)])
+    rects = view.render(board, [board.square, board.previous_square], [(3, 0)], [(0, 1)])
+    assert sorted(rects) == sorted([view.square_rect(3, 0), view.square_rect(0, 1)])
+    rects = view.render(board)
+    assert sorted(rects) == sorted([view.square_rect(3, 0), view.square_rect(5, 0),
+                                    view.square_rect(4, 1)])
+
+
+def test_rendered_pixels(view):
+    """Test partial renders give the same picture as a full one"""
+    board = Board(8, 8)
+    view.render(board)
+    for move in [(5, 0, 4, 1, []), (2, 1, 3, 2, [])]:
+        board.apply_move(*move)
+        view.render(board, [board.square, board.previous_square])
+    full = BoardView(pygame.Surface((const.WIDTH, const.HEIGHT)))
+    full.render(board, [board.square, board.previous_square])
+    assert pygame.image.tobytes(view.screen, 'RGB') == pygame.image.tobytes(full.screen, 'RGB')
+
+
+def test_squares_under(view):
+    """Test squares overlapped by a rectangle"""
+    size = const.CELL_SIZE
+    assert view.squares_under(pygame.Rect(10, 10, size, 5)) == [(0, 0), (0, 1)]
+    assert view.squares_under(pygame.Rect(0, 0, size, size)) == [(0, 0)]
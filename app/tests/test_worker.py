@@ -0,0 +1,39 @@
+"""Module for testing background AI worker"""
+import time
+from game.ai import AI
+from game.board import Board
+from game.worker import AIWorker
+
+
+def wait(worker, timeout=5.0):
+    """Wait until worker finishes or timeout"""
+    start = time.perf_counter()
+    while not worker.done() and time.perf_counter() - start < timeout:
+        time.sleep(0.01)
+
+
+def test_request_and_take():
+    """Test worker returns legal move without blocking the caller"""
+    board = Board(8, 8, 0, 0)
+    worker = AIWorker(AI(1))
+    worker.request(board)
+    wait(worker)
+    assert worker.done()
+    move = worker.take()
+    assert move[0] in board.get_valid_moves_all_pieces(1)
+    assert not worker.busy() and not worker.done()
+    worker.request(board, random_move=True)
+    wait(worker)
+    assert worker.take()[0] in board.get_valid_moves_all_pieces(1)
+    worker.close()
+
+
+def test_cancel():
+    """Test cancelled search stops and is forgotten"""
+    worker = AIWorker(AI(1))
+    worker.request(Board(8, 8, 0, 0))
+    stop_event = worker.stop_event
+    worker.cancel()
+    assert stop_event.is_set()
+    assert not worker.busy() and not worker.done()
+    worker.close()
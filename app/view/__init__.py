@@ -0,0 +1 @@
+"""Pygame view layer of the game, the engine in game package does not need it"""
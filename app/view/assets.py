@@ -0,0 +1,89 @@
+"""Fonts and images, loaded on first use"""
+import os
+from functools import lru_cache
+import pygame
+from game.config import SizeConstants
+from game.config import StoneEnum
+
+ASSETS_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'assets')
+
+
+def asset_path(name: str) -> str:
+    """Path of asset file independent of working directory"""
+    return os.path.join(ASSETS_DIR, name)
+
+
+@lru_cache(maxsize=None)
+def load_image(name: str, width: int, height: int):
+    """Load image scaled to given size"""
+    return pygame.transform.scale(pygame.image.load(asset_path(name)), (width, height))
+
+
+@lru_cache(maxsize=None)
+def load_font(name, size: int):
+    """Load font file from assets, None for pygame default font"""
+    pygame.font.init()
+    return pygame.font.Font(None if name is None else asset_path(name), size)
+
+
+@lru_cache(maxsize=None)
+def load_system_font(name: str, size: int):
+    """Load system font"""
+    pygame.font.init()
+    return pygame.font.SysFont(name, size)
+
+
+@lru_cache(maxsize=256)
+def render_text(font, text: str, color):
+    """Rendered antialiased text, kept for reuse"""
+    return font.render(text, True, color)
+
+
+class Fonts:
+    """Namespace class for fonts"""
+
+    @staticmethod
+    def winner():
+        """Font of the winner announcement"""
+        return load_system_font('comicsans', 100)
+
+    @staticmethod
+    def thinking():
+        """Font of the AI thinking indicator"""
+        return load_system_font('comicsans', 30)
+
+
+class Menu:
+    "Namespace class for Menu assets"
+
+    @staticmethod
+    def title_font():
+        """Font of menu title"""
+        return load_font('PressStart2P-Regular.ttf', 65)
+
+    @staticmethod
+    def menu_font():
+        """Font of menu items"""
+        return load_font(None, 50)
+
+    @staticmethod
+    def background():
+        """Menu background image"""
+        return load_image('Background.png', SizeConstants.WIDTH, SizeConstants.HEIGHT)
+
+
+class StoneImages:
+    "Namespace class for stone images"
+    # pylint: disable=too-few-public-methods
+    FILES = {
+        StoneEnum.WHITE.value: 'Stone_White.png',
+        StoneEnum.WHITE_KING.value: 'Stone_White_2.png',
+        StoneEnum.BLACK.value: 'Stone_Black.png',
+        StoneEnum.BLACK_KING.value: 'Stone_Black_2.png',
+    }
+
+    @classmethod
+    def get(cls, piece: int):
+        """Image of given piece"""
+        size = SizeConstants.STONE_SIZE
+        return load_image(cls.FILES[piece], size, size)
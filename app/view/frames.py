@@ -0,0 +1,63 @@
+"""Frame time statistics of the window loop"""
+import logging
+import time
+import pygame
+from game.config import ViewConstants
+
+
+class FrameTimer:
+    """Caps frame rate and measures how much of every frame is spent working
+
+    Work time is the frame time without the sleep of pygame.time.Clock,
+    render time the part of it spent in GameView.update. Statistics are
+    logged to `view.frames` every `report_seconds` and then reset.
+    """
+
+    def __init__(self, fps: int = ViewConstants.FPS,
+                 report_seconds: float = ViewConstants.FRAME_REPORT_SECONDS) -> None:
+        self.fps = fps
+        self.report_seconds = report_seconds
+        self.clock = pygame.time.Clock()
+        self.logger = logging.getLogger('view.frames')
+        self.reset()
+
+    def reset(self) -> None:
+        """Start new measuring period"""
+        self.started = time.perf_counter()
+        self.frames = 0
+        self.work = 0.0
+        self.render = 0.0
+        self.updates = 0  # frames that changed the display
+        self.rects = 0
+
+    def tick(self) -> None:
+        """Wait for the next frame and account the finished one"""
+        self.clock.tick(self.fps)
+        self.frames += 1
+        self.work += self.clock.get_rawtime() / 1000
+        if time.perf_counter() - self.started >= self.report_seconds:
+            self.report()
+
+    def add_render(self, seconds: float, rects: int) -> None:
+        """Account one render taking `seconds` and updating `rects` rectangles"""
+        self.render += seconds
+        if rects:
+            self.updates += 1
+            self.rects += rects
+
+    def summary(self) -> dict:
+        """Get frame statistics of the current period"""
+        elapsed = max(time.perf_counter() - self.started, 1e-9)
+        frames = max(self.frames, 1)
+        return {'fps': round(self.frames / elapsed, 1),
+                'work_ms': round(1000 * self.work / frames, 3),
+                'render_ms': round(1000 * self.render / frames, 3),
+                'cpu_share': round(self.work / elapsed, 3),
+                'updated_frames': self.updates,
+                'rects_per_update': round(self.rects / max(self.updates, 1), 1)}
+
+    def report(self) -> None:
+        """Log statistics of the current period and start a new one"""
+        if self.frames and self.logger.isEnabledFor(logging.INFO):
+            self.logger.info('frames %s', self.summary())
+        self.reset()
@@ -0,0 +1,168 @@
+"""Module drawing board and game state with pygame"""
+import time
+import pygame
+from game.config import Colors
+from game.config import SizeConstants as const
+from view.assets import Fonts
+from view.assets import StoneImages
+from view.assets import render_text
+from view.frames import FrameTimer
+
+
+class BoardView:
+    """Draws board, pieces and highlights on screen
+
+    The empty board is rendered once. render() compares what every square
+    should show with what it showed last time and redraws only squares
+    that changed.
+    """
+
+    def __init__(self, screen, cell_width: int = const.CELL_SIZE,
+                 radius: int = const.CIRCLE_RADIUS) -> None:
+        self.screen = screen
+        self.cell_width = cell_width
+        self.circle_radius = radius
+        self.background = None
+        self.shown = None  # {(row, col): (highlighted, dot, piece)} of squares not plain on screen
+
+    def invalidate(self) -> None:
+        """Redraw the whole board on the next render"""
+        self.shown = None
+
+    def square_rect(self, row: int, col: int) -> pygame.Rect:
+        """Screen rectangle of square"""
+        return pygame.Rect(col*self.cell_width, row*self.cell_width,
+                           self.cell_width, self.cell_width)
+
+    def squares_under(self, rect: pygame.Rect) -> list:
+        """Squares overlapping given screen rectangle"""
+        width = self.cell_width
+        return [(row, col) for row in range(rect.top // width, (rect.bottom - 1) // width + 1)
+                for col in range(rect.left // width, (rect.right - 1) // width + 1)]
+
+    def draw_grid(self, board) -> pygame.Surface:
+        """Render empty board into a new surface"""
+        surface = pygame.Surface((board.cols*self.cell_width, board.rows*self.cell_width))
+        for row in range(board.rows):
+            for col in range(board.cols):
+                color = Colors.BROWN if (row+col) % 2 else Colors.WHITE
+                surface.fill(color, self.square_rect(row, col))
+        return surface
+
+    def draw_piece(self, row, col, color) -> None:
+        """Draw given piece on screen"""
+        x_pos = col*self.cell_width
+        y_pos = row*self.cell_width
+        x_stone = x_pos + const.STONE_OFFSET
+        y_stone = y_pos + const.STONE_OFFSET
+        self.screen.blit(StoneImages.get(color), (x_stone, y_stone))
+
+    def highlight(self, row: int, col: int):
+        """Highlight given square"""
+        pygame.draw.rect(self.screen, Colors.YELLOW, self.square_rect(row, col))
+
+    def draw_valid_move(self, row: int, col: int):
+        """Draw mark of valid move destination"""
+        pygame.draw.circle(self.screen, Colors.BLUE,
+                           (col * self.cell_width + self.cell_width // 2,
+                            row * self.cell_width + self.cell_width//2), self.circle_radius)
+
+    def draw_square(self, row: int, col: int, state) -> pygame.Rect:
+        """Draw square from background with its highlight, mark and piece"""
+        rect = self.square_rect(row, col)
+        self.screen.blit(self.background, rect, rect)
+        if state is not None:
+            highlighted, dot, piece = state
+            if highlighted:
+                self.highlight(row, col)
+            if dot:
+                self.draw_valid_move(row, col)
+            if piece:
+                self.draw_piece(row, col, piece)
+        return rect
+
+    @staticmethod
+    def square_states(board, highlighted=(), dots=()) -> dict:
+        """Get {(row, col): (highlighted, dot, piece)} of squares that are not plain"""
+        grid = board.grid
+        squares = {(int(row), int(col)) for row, col in zip(*grid.nonzero())}
+        squares.update(highlighted)
+        squares.update(dots)
+        return {(row, col): ((row, col) in highlighted, (row, col) in dots, int(grid[row, col]))
+                for row, col in squares}
+
+    def render(self, board, highlighted=(), dots=(), dirty=()) -> list:
+        """Draw squares that changed since the last render, get their rectangles
+
+        `highlighted` squares get yellow background, `dots` valid move
+        marks, squares in `dirty` are redrawn anyway.
+        """
+        if self.background is None:
+            self.background = self.draw_grid(board)
+        states = self.square_states(board, set(highlighted), set(dots))
+        if self.shown is None:
+            self.screen.blit(self.background, (0, 0))
+            for (row, col), state in states.items():
+                self.draw_square(row, col, state)
+            self.shown = states
+            return [self.background.get_rect()]
+        changed = {square for square in states.keys() | self.shown.keys()
+                   if states.get(square) != self.shown.get(square)}
+        changed.update(dirty)
+        self.shown = states
+        return [self.draw_square(row, col, states.get((row, col))) for row, col in changed]
+
+
+class GameView:
+    """Draws game of checkers on screen, passed to Checkers as its view
+
+    Only changed squares and the thinking indicator are redrawn and
+    updated on the display, frame times are measured by `frames`.
+    """
+
+    def __init__(self, screen, frames: FrameTimer = None) -> None:
+        self.screen = screen
+        self.board_view = BoardView(screen)
+        self.frames = frames if frames is not None else FrameTimer()
+        self.overlay = None, None  # text and rectangle of thinking indicator on screen
+
+    def update(self, checkers) -> None:
+        """Update game on screen"""
+        start = time.perf_counter()
+        board = checkers.board
+        highlighted, dots = [], []
+        if board.square is not None:
+            highlighted += [board.square, board.previous_square]
+        if checkers.selected_piece is not None:
+            highlighted.append(checkers.selected_piece)
+            dots = [move for move, _ in checkers.valid_moves]
+        text = self.thinking_text() if checkers.thinking else None
+        shown_text, shown_rect = self.overlay
+        dirty = ()
+        if shown_rect is not None and text != shown_text:
+            dirty = self.board_view.squares_under(shown_rect)
+        rects = self.board_view.render(board, highlighted, dots, dirty)
+        if text is None:
+            self.overlay = None, None
+        elif text != shown_text or shown_rect.collidelist(rects) != -1:
+            rect = self.screen.blit(render_text(Fonts.thinking(), text, Colors.RED), (10, 10))
+            rects.append(rect)
+            self.overlay = text, rect
+        if rects:
+            pygame.display.update(rects)
+        self.frames.add_render(time.perf_counter() - start, len(rects))
+
+    @staticmethod
+    def thinking_text() -> str:
+        """Text of indicator that AI is searching"""
+        return 'Thinking' + '.' * (pygame.time.get_ticks() // 300 % 4)
+
+    def draw_winner(self, text):
+        """Draw Winner name on screen"""
+        text = text if text == 'DRAW' else 'WINNER: ' + text
+        draw_text = render_text(Fonts.winner(), text, Colors.BLACK)
+        rect = self.screen.blit(draw_text, (const.WIDTH/2 - draw_text.get_width() /
+                                            2, const.HEIGHT/2 - draw_text.get_height()/2))
+        pygame.display.update(rect)
+        self.board_view.invalidate()
+        pygame.time.delay(5000)